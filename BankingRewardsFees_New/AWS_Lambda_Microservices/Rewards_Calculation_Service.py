@@ -2,23 +2,111 @@
 import json
 import mysql.connector
 import os
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 import traceback
+from AWS_Lambda_Microservices.admission import Overloaded, admission_controller, overloaded_response
+from AWS_Lambda_Microservices.result_cache import CACHE_STATS_ACTION, result_cache
+from AWS_Lambda_Microservices.db import deadline_connection, is_timeout_error, timeout_response
+from AWS_Lambda_Microservices.warmup import WARMUP_KEY, is_warmup, warm_up
+
+GET_BALANCE_SQL = """
+    SELECT balance FROM Accounts WHERE account_id = %s
+"""
+
+# Single primary-key lookup on the snapshot maintained by Account_Service
+GET_REWARD_SNAPSHOT_SQL = """
+    SELECT monthly_reward, balance
+    FROM AccountCharges
+    WHERE account_id = %s
+"""
+
+# Bump whenever calculate_reward changes, so results of the old rule are never served
+REWARD_RULE_VERSION = 2
+
+# Survives between warm invocations of the same container
+reward_cache = result_cache('reward', REWARD_RULE_VERSION)
+
+def read_from_snapshot():
+    """Serve reads from AccountCharges once it has been backfilled (USE_ACCOUNT_CHARGES=true)"""
+    return os.environ.get('USE_ACCOUNT_CHARGES', 'false').lower() == 'true'
+
+def calculate_reward(balance):
+    """Monthly reward rule carried over from the CalculateRewards stored procedure"""
+    # Decimal arithmetic rounded half-up, exactly like ROUND() on the DECIMAL
+    # column in MONTHLY_REWARD_SQL; float round() is half-even on a binary value
+    balance = Decimal(str(balance))
+    if balance > 10000:
+        reward = balance * Decimal('0.02')  # 2%
+    else:
+        reward = balance * Decimal('0.01')  # 1%
+    return float(reward.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+def get_account_reward(body, get_connection):
+    account_id = body.get('account_id')
+    if not account_id:
+        return {'error': 'account_id is required'}
+    
+    # Validated recently: no database round trip and no calculation
+    cached = reward_cache.fresh(account_id)
+    if cached is not None:
+        return {**cached, 'account_id': account_id}
+    
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    
+    if read_from_snapshot():
+        cursor.execute(GET_REWARD_SNAPSHOT_SQL, (account_id,))
+        snapshot = cursor.fetchone()
+        if snapshot:
+            cursor.close()
+            conn.close()
+            return {
+                'account_id': account_id,
+                'calculated_reward': float(snapshot['monthly_reward']),
+                'balance': float(snapshot['balance'])
+            }
+        # Not in the snapshot yet: fall back to calculating on the fly
+    
+    cursor.execute(GET_BALANCE_SQL, (account_id,))
+    
+    account = cursor.fetchone()
+    if not account:
+        cursor.close()
+        conn.close()
+        return {'error': 'Account not found'}
+    
+    cursor.close()
+    conn.close()
+    
+    # The balance is the only input, so it versions the result
+    versions = (account['balance'],)
+    cached = reward_cache.validate(account_id, versions)
+    if cached is not None:
+        return {**cached, 'account_id': account_id}
+    
+    # Business logic
+    balance = float(account['balance'])
+    reward = calculate_reward(balance)
+    
+    result = {
+        'account_id': account_id,
+        'calculated_reward': reward,
+        'balance': balance
+    }
+    reward_cache.store(account_id, versions, result)
+    return result
+
+def warmup_statements():
+    """The lookups a first real request would run, keyed so they match no row"""
+    if read_from_snapshot():
+        return [(GET_REWARD_SNAPSHOT_SQL, (WARMUP_KEY,)), (GET_BALANCE_SQL, (WARMUP_KEY,))]
+    return [(GET_BALANCE_SQL, (WARMUP_KEY,))]
 
 def lambda_handler(event, context):
     """
     Rewards Calculation Service Lambda Function
     """
     
-    def get_connection():
-        return mysql.connector.connect(
-            host=os.environ.get('DB_HOST', 'database-2.crq7shsasjo0.us-west-2.rds.amazonaws.com'),
-            user=os.environ.get('DB_USER', 'admin'),
-            password=os.environ.get('DB_PASSWORD', 'demo1234!'),
-            database=os.environ.get('DB_NAME', 'BankingRewardsFees_New'),
-            autocommit=True
-        )
-    
     try:
         # Parse the event data
         if 'body' in event:
@@ -29,41 +117,25 @@ def lambda_handler(event, context):
         else:
             body = event
         
-        account_id = body.get('account_id')
-        if not account_id:
-            return {'error': 'account_id is required'}
-        
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT balance FROM Accounts WHERE account_id = %s
-        """, (account_id,))
+        # Scheduled keep-warm pings skip business logic entirely
+        if is_warmup(event, body):
+            return warm_up(deadline_connection(context), warmup_statements())
         
-        account = cursor.fetchone()
-        if not account:
-            cursor.close()
-            conn.close()
-            return {'error': 'Account not found'}
-        
-        # Business logic
-        balance = float(account['balance'])
-        
-        if balance > 10000:
-            reward = balance * 0.02  # 2%
-        else:
-            reward = balance * 0.01  # 1%
-        
-        cursor.close()
-        conn.close()
+        if body.get('action') == CACHE_STATS_ACTION:
+            return {'reward': reward_cache.stats()}
         
-        return {
-            'account_id': account_id,
-            'calculated_reward': round(reward, 2),
-            'balance': balance
-        }
+        # Refused requests never open a connection; connections and statements
+        # are bounded by the invocation's remaining time
+        with admission_controller().admit('calculate_reward'):
+            return get_account_reward(body, deadline_connection(context))
         
+    except Overloaded as e:
+        print(f"Rejected: {e}")
+        return overloaded_response(event, e)
     except Exception as e:
+        if is_timeout_error(e):
+            print(f"Timed out: {e}")
+            return timeout_response(e)
         print(f"Error: {e}")
         print(f"Traceback: {traceback.format_exc()}")
         return {'error': f'Internal server error: {str(e)}'}
@@ -0,0 +1,242 @@
+# account_charges.py - AccountCharges Read Model (fee/reward snapshot per account)
+import argparse
+import mysql.connector
+import os
+import time
+import traceback
+from decimal import Decimal
+
+from AWS_Lambda_Microservices.Fee_Calculation_Service import calculate_fee
+from AWS_Lambda_Microservices.Rewards_Calculation_Service import calculate_reward
+
+DEFAULT_CHUNK_SIZE = 5000
+
+CHARGE_INPUTS_SQL = """
+    SELECT a.account_id, a.balance, c.tier
+    FROM Accounts a
+    JOIN Customers c ON a.customer_id = c.customer_id
+"""
+
+CHARGE_INPUTS_BY_ACCOUNTS_SQL = CHARGE_INPUTS_SQL + " WHERE a.account_id IN ({placeholders})"
+CHARGE_INPUTS_BY_CUSTOMER_SQL = CHARGE_INPUTS_SQL + " WHERE a.customer_id = %s"
+CHARGE_INPUTS_BY_RANGE_SQL = CHARGE_INPUTS_SQL + " WHERE a.account_id BETWEEN %s AND %s"
+
+UPSERT_ACCOUNT_CHARGES_SQL = """
+    INSERT INTO AccountCharges (account_id, monthly_fee, monthly_reward, balance, customer_tier, calculated_at)
+    VALUES (%s, %s, %s, %s, %s, NOW())
+    ON DUPLICATE KEY UPDATE
+        monthly_fee = VALUES(monthly_fee),
+        monthly_reward = VALUES(monthly_reward),
+        balance = VALUES(balance),
+        customer_tier = VALUES(customer_tier),
+        calculated_at = VALUES(calculated_at)
+"""
+
+# Accounts changed directly, plus every account of a changed customer. Each
+# branch is a range scan on its updated_at index; UNION removes overlaps.
+CHANGED_SINCE_SQL = """
+    SELECT a.account_id, a.balance, c.tier
+    FROM Accounts a
+    JOIN Customers c ON a.customer_id = c.customer_id
+    WHERE a.updated_at >= %s
+    UNION
+    SELECT a.account_id, a.balance, c.tier
+    FROM Customers c
+    JOIN Accounts a ON a.customer_id = c.customer_id
+    WHERE c.updated_at >= %s
+"""
+
+DELETE_ACCOUNT_CHARGES_SQL = "DELETE FROM AccountCharges WHERE account_id IN ({placeholders})"
+
+GET_WATERMARK_SQL = "SELECT high_water_mark FROM RecalcWatermarks WHERE job_name = %s"
+
+SET_WATERMARK_SQL = """
+    INSERT INTO RecalcWatermarks (job_name, high_water_mark, updated_at)
+    VALUES (%s, %s, NOW())
+    ON DUPLICATE KEY UPDATE
+        high_water_mark = VALUES(high_water_mark),
+        updated_at = VALUES(updated_at)
+"""
+
+WATERMARK_JOB = 'account_charges'
+
+def compute_charges(rows):
+    """
+    Turn (account_id, balance, tier) rows into AccountCharges upsert
+    parameters using the same rules as the calculation services. Accounts
+    without a balance have no fee or reward (account_export leaves both NULL)
+    and are skipped.
+    """
+    charges = []
+    for account_id, balance, tier in rows:
+        if balance is None:
+            continue
+        balance = float(balance)
+        charges.append((account_id, calculate_fee(tier, balance), calculate_reward(balance), balance, tier))
+    return charges
+
+def _upsert(cursor, rows):
+    charges = compute_charges(rows)
+    if charges:
+        cursor.executemany(UPSERT_ACCOUNT_CHARGES_SQL, charges)
+    # A snapshot row left from before the balance was cleared would be stale
+    no_balance = [row[0] for row in rows if row[1] is None]
+    if no_balance:
+        placeholders = ', '.join(['%s'] * len(no_balance))
+        cursor.execute(DELETE_ACCOUNT_CHARGES_SQL.format(placeholders=placeholders), tuple(no_balance))
+    return len(charges)
+
+def refresh_account_charges(cursor, account_ids):
+    """Recompute the snapshot for specific accounts on the caller's transaction"""
+    if not account_ids:
+        return 0
+    placeholders = ', '.join(['%s'] * len(account_ids))
+    cursor.execute(CHARGE_INPUTS_BY_ACCOUNTS_SQL.format(placeholders=placeholders), tuple(account_ids))
+    return _upsert(cursor, cursor.fetchall())
+
+def refresh_customer_charges(cursor, customer_id):
+    """
+    Recompute the snapshot for every account of a customer (e.g. after a tier
+    change) and return the ids of those accounts
+    """
+    cursor.execute(CHARGE_INPUTS_BY_CUSTOMER_SQL, (customer_id,))
+    rows = cursor.fetchall()
+    _upsert(cursor, rows)
+    return [row[0] for row in rows]
+
+def _account_id_range(cursor):
+    cursor.execute("SELECT MIN(account_id), MAX(account_id) FROM Accounts")
+    return cursor.fetchone()
+
+def backfill(conn, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Populate AccountCharges for every account, one committed chunk at a time"""
+    cursor = conn.cursor()
+    min_id, max_id = _account_id_range(cursor)
+    written = 0
+    if min_id is not None:
+        for chunk_start in range(min_id, max_id + 1, chunk_size):
+            cursor.execute(CHARGE_INPUTS_BY_RANGE_SQL, (chunk_start, chunk_start + chunk_size - 1))
+            written += _upsert(cursor, cursor.fetchall())
+            conn.commit()
+    cursor.close()
+    return written
+
+def incremental_refresh(conn, chunk_size=DEFAULT_CHUNK_SIZE, job_name=WATERMARK_JOB):
+    """
+    Recompute AccountCharges only for accounts (or accounts of customers)
+    whose updated_at is at or after the stored high-water mark, then advance
+    the mark to the database time captured before the scan. The comparison is
+    inclusive so rows written in the same second as the previous mark are
+    picked up again; recomputation is idempotent. Without a stored mark this
+    falls back to a full backfill. Returns (mode, accounts_refreshed).
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT NOW()")
+    run_started = cursor.fetchone()[0]
+    cursor.execute(GET_WATERMARK_SQL, (job_name,))
+    row = cursor.fetchone()
+
+    if row is None:
+        cursor.close()
+        refreshed = backfill(conn, chunk_size)
+        mode = 'full'
+        cursor = conn.cursor()
+    else:
+        cursor.execute(CHANGED_SINCE_SQL, (row[0], row[0]))
+        changed = cursor.fetchall()
+        refreshed = 0
+        for start in range(0, len(changed), chunk_size):
+            refreshed += _upsert(cursor, changed[start:start + chunk_size])
+            conn.commit()
+        mode = 'incremental'
+
+    cursor.execute(SET_WATERMARK_SQL, (job_name, run_started))
+    conn.commit()
+    cursor.close()
+    return mode, refreshed
+
+def _as_money(value):
+    return None if value is None else Decimal(str(value)).quantize(Decimal('0.01'))
+
+def check_consistency(conn, chunk_size=DEFAULT_CHUNK_SIZE, sample_limit=20):
+    """
+    Compare AccountCharges with a fresh calculation, chunk by chunk. Returns
+    counts of missing, stale and orphaned snapshot rows plus a few samples.
+    Accounts without a balance have no snapshot row and are only counted
+    (no_balance); a stored row for one is orphaned.
+    """
+    report = {'accounts': 0, 'missing': 0, 'stale': 0, 'orphaned': 0, 'no_balance': 0, 'samples': []}
+    cursor = conn.cursor()
+    min_id, max_id = _account_id_range(cursor)
+    if min_id is not None:
+        for chunk_start in range(min_id, max_id + 1, chunk_size):
+            chunk_end = chunk_start + chunk_size - 1
+            cursor.execute(CHARGE_INPUTS_BY_RANGE_SQL, (chunk_start, chunk_end))
+            rows = cursor.fetchall()
+            report['no_balance'] += sum(1 for row in rows if row[1] is None)
+            expected = {row[0]: row[1:] for row in compute_charges(rows)}
+            cursor.execute("""
+                SELECT account_id, monthly_fee, monthly_reward, balance, customer_tier
+                FROM AccountCharges WHERE account_id BETWEEN %s AND %s
+            """, (chunk_start, chunk_end))
+            stored = {row[0]: row[1:] for row in cursor.fetchall()}
+
+            report['accounts'] += len(expected)
+            for account_id, values in expected.items():
+                snapshot = stored.get(account_id)
+                if snapshot is None:
+                    issue = 'missing'
+                elif [_as_money(v) for v in values[:3]] + [values[3]] != \
+                        [_as_money(v) for v in snapshot[:3]] + [snapshot[3]]:
+                    issue = 'stale'
+                else:
+                    continue
+                report[issue] += 1
+                if len(report['samples']) < sample_limit:
+                    report['samples'].append({'account_id': account_id, 'issue': issue})
+            report['orphaned'] += len(set(stored) - set(expected))
+    cursor.close()
+    report['consistent'] = not (report['missing'] or report['stale'] or report['orphaned'])
+    return report
+
+def get_connection():
+    return mysql.connector.connect(
+        host=os.environ.get('DB_HOST', 'database-2.crq7shsasjo0.us-west-2.rds.amazonaws.com'),
+        user=os.environ.get('DB_USER', 'admin'),
+        password=os.environ.get('DB_PASSWORD', 'demo1234!'),
+        database=os.environ.get('DB_NAME', 'BankingRewardsFees_New'),
+        autocommit=False
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain the AccountCharges read model')
+    parser.add_argument('command', choices=['backfill', 'incremental', 'check'])
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    try:
+        conn = get_connection()
+        started = time.perf_counter()
+        if args.command == 'backfill':
+            written = backfill(conn, args.chunk_size)
+            print(f"Backfilled {written} AccountCharges rows in {time.perf_counter() - started:.2f}s")
+        elif args.command == 'incremental':
+            mode, refreshed = incremental_refresh(conn, args.chunk_size)
+            print(f"Refreshed {refreshed} AccountCharges rows ({mode} run) in {time.perf_counter() - started:.2f}s")
+        else:
+            report = check_consistency(conn, args.chunk_size)
+            print(f"Checked {report['accounts']} accounts in {time.perf_counter() - started:.2f}s: "
+                  f"{report['missing']} missing, {report['stale']} stale, {report['orphaned']} orphaned, "
+                  f"{report['no_balance']} without a balance (skipped)")
+            for sample in report['samples']:
+                print(f"  account_id={sample['account_id']} {sample['issue']}")
+            if not report['consistent']:
+                raise SystemExit(1)
+        conn.close()
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        raise SystemExit(2)
+
+if __name__ == '__main__':
+    main()
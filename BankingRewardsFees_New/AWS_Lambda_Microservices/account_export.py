@@ -0,0 +1,240 @@
+# account_export.py - Streaming CSV/Parquet/Arrow Export of Accounts with Fees and Rewards
+import argparse
+import csv
+import mysql.connector
+import os
+import shutil
+import tempfile
+import time
+import traceback
+
+from AWS_Lambda_Microservices.db import get_connection
+from AWS_Lambda_Microservices.Fee_Calculation_Service import calculate_fee
+from AWS_Lambda_Microservices.Rewards_Calculation_Service import calculate_reward
+
+DEFAULT_CHUNK_SIZE = 50000
+
+EXPORT_COLUMNS = ('account_id', 'customer_id', 'customer_name', 'tier', 'balance', 'monthly_fee', 'monthly_reward')
+
+EXPORT_SQL = """
+    SELECT a.account_id, c.customer_id, c.name, c.tier, a.balance
+    FROM Accounts a
+    JOIN Customers c ON a.customer_id = c.customer_id
+"""
+
+# Keyset pagination on the primary key: every chunk is a short range scan
+# starting after the last exported account, however deep into the table
+EXPORT_FIRST_CHUNK_SQL = EXPORT_SQL + " ORDER BY a.account_id LIMIT %s"
+EXPORT_NEXT_CHUNK_SQL = EXPORT_SQL + " WHERE a.account_id > %s ORDER BY a.account_id LIMIT %s"
+
+def export_rows(rows):
+    """
+    Append the monthly fee and reward to (account_id, customer_id, name, tier,
+    balance) rows. Accounts without a balance get NULL for both.
+    """
+    exported = []
+    for row in rows:
+        if row[4] is None:
+            exported.append(row + (None, None))
+        else:
+            balance = float(row[4])
+            exported.append(row + (calculate_fee(row[3], balance), calculate_reward(balance)))
+    return exported
+
+def iter_export_chunks(cursor, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield export rows chunk by chunk; at most one chunk is held in memory"""
+    cursor.execute(EXPORT_FIRST_CHUNK_SQL, (chunk_size,))
+    while True:
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        yield export_rows(rows)
+        if len(rows) < chunk_size:
+            return
+        cursor.execute(EXPORT_NEXT_CHUNK_SQL, (rows[-1][0], chunk_size))
+
+class CsvExportWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def write_chunk(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+def export_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ('account_id', pa.int32()),
+        ('customer_id', pa.int32()),
+        ('customer_name', pa.string()),
+        ('tier', pa.string()),
+        ('balance', pa.decimal128(10, 2)),
+        ('monthly_fee', pa.float64()),
+        ('monthly_reward', pa.float64()),
+    ])
+
+def chunk_table(schema, rows):
+    import pyarrow as pa
+    columns = zip(*rows)
+    return pa.Table.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema
+    )
+
+class ParquetExportWriter:
+    """Writes one Parquet row group per chunk (needs pyarrow)"""
+
+    def __init__(self, path, compression='snappy'):
+        import pyarrow.parquet as pq
+
+        self._schema = export_schema()
+        self._writer = pq.ParquetWriter(path, self._schema, compression=compression)
+
+    def write_chunk(self, rows):
+        self._writer.write_table(chunk_table(self._schema, rows), row_group_size=len(rows))
+
+    def close(self):
+        self._writer.close()
+
+class ArrowExportWriter:
+    """
+    Uncompressed Arrow IPC file with one record batch per chunk (needs
+    pyarrow). Readers can memory-map it and use columns without copying or
+    deserializing them, which is what the app's snapshot mode does.
+    """
+
+    def __init__(self, path):
+        import pyarrow as pa
+
+        self._schema = export_schema()
+        self._writer = pa.ipc.new_file(path, self._schema)
+
+    def write_chunk(self, rows):
+        self._writer.write_table(chunk_table(self._schema, rows))
+
+    def close(self):
+        self._writer.close()
+
+WRITERS = {
+    'csv': CsvExportWriter,
+    'parquet': ParquetExportWriter,
+    'arrow': ArrowExportWriter,
+}
+
+def parse_s3_url(destination):
+    """Return (bucket, key) for s3://bucket/key destinations, (None, None) for local paths"""
+    if not destination.startswith('s3://'):
+        return None, None
+    bucket, _, key = destination[len('s3://'):].partition('/')
+    if not bucket or not key:
+        raise ValueError(f'Invalid S3 destination: {destination}')
+    return bucket, key
+
+def export_format(destination, fmt=None):
+    fmt = fmt or os.path.splitext(destination)[1].lstrip('.').lower()
+    if fmt not in WRITERS:
+        raise ValueError(f'Unsupported export format: {fmt or "(none)"}. Available formats: {", ".join(WRITERS)}')
+    return fmt
+
+class LocalObjectStore:
+    """
+    Stand-in for an S3 client when no bucket is at hand: upload_file keeps
+    objects under root/bucket/key with the same call signature as boto3
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def upload_file(self, filename, bucket, key):
+        target = os.path.join(self.root, bucket, *key.split('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(filename, target)
+
+def s3_client():
+    # Only needed for s3:// destinations; S3_ENDPOINT_URL points it at any
+    # S3-compatible store (MinIO, LocalStack, ...)
+    import boto3
+    return boto3.client('s3', endpoint_url=os.environ.get('S3_ENDPOINT_URL'))
+
+def export_accounts(conn, destination, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE, object_store=None):
+    """
+    Stream every account with its tier, fee and reward to destination (a
+    local path or s3://bucket/key) as CSV, Parquet or Arrow IPC, chunk by chunk from one
+    consistent read snapshot. The file is written locally first, under a
+    temporary name, and only appears at destination once it is complete;
+    S3 uploads go through upload_file (multipart, streamed from disk).
+    Returns rows, bytes and timing of the run.
+    """
+    fmt = export_format(destination, fmt)
+    bucket, key = parse_s3_url(destination)
+    if bucket is None:
+        local_path = f'{destination}.partial'
+    else:
+        handle, local_path = tempfile.mkstemp(suffix=f'.{fmt}')
+        os.close(handle)
+
+    started = time.perf_counter()
+    rows = chunks = 0
+    try:
+        writer = WRITERS[fmt](local_path)
+        try:
+            conn.start_transaction(consistent_snapshot=True, readonly=True)
+            cursor = conn.cursor()
+            for chunk in iter_export_chunks(cursor, chunk_size):
+                writer.write_chunk(chunk)
+                rows += len(chunk)
+                chunks += 1
+            cursor.close()
+            conn.commit()
+        finally:
+            writer.close()
+
+        size = os.path.getsize(local_path)
+        if bucket is None:
+            os.replace(local_path, destination)
+        else:
+            (object_store or s3_client()).upload_file(local_path, bucket, key)
+    finally:
+        if os.path.exists(local_path):
+            os.remove(local_path)
+
+    seconds = time.perf_counter() - started
+    return {
+        'destination': destination,
+        'format': fmt,
+        'rows': rows,
+        'chunks': chunks,
+        'bytes': size,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Export every account with its monthly fee and reward')
+    parser.add_argument('destination', help='local path or s3://bucket/key')
+    parser.add_argument('--format', choices=list(WRITERS), help='defaults to the destination extension')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--local-store', help='write s3:// destinations under this directory instead of S3')
+    args = parser.parse_args()
+
+    try:
+        conn = get_connection()
+        object_store = LocalObjectStore(args.local_store) if args.local_store else None
+        report = export_accounts(conn, args.destination, args.format, args.chunk_size, object_store)
+        print(f"Exported {report['rows']} accounts ({report['chunks']} chunks) to {report['destination']} "
+              f"in {report['seconds']:.2f}s: {report['rows_per_sec']:.0f} rows/s, {report['bytes']} bytes")
+        conn.close()
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        raise SystemExit(2)
+    except ValueError as e:
+        print(f"Export error: {e}")
+        raise SystemExit(2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# admission.py - Token-Bucket Rate Limiting and a Concurrency Cap per Container
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from AWS_Lambda_Microservices.result_cache import RESULT_CACHE_URL, redis_client
+from AWS_Lambda_Microservices.warmup import WARMUP_ACTION
+
+# Full-table reads and batch writes cost the database far more than a keyed
+# lookup, so they get their own (smaller) budget. Anything else is a read.
+ACTION_CLASSES = {
+    'get_accounts': 'bulk',
+    'get_customer_portfolio': 'bulk',
+    'get_balance_distribution': 'bulk',
+    'update_balances': 'bulk',
+    'update_balance': 'write',
+    'update_customer_tier': 'write',
+}
+DEFAULT_ACTION_CLASS = 'read'
+ACTION_CLASS_NAMES = ('read', 'write', 'bulk')
+
+# Requests in progress per container (0 = no cap); Lambda runs one invocation
+# per container, so this matters for the router/async handlers and local servers.
+# Across containers, the function's reserved concurrency is the cap.
+MAX_CONCURRENCY = int(os.environ.get('ADMISSION_MAX_CONCURRENCY', '0'))
+
+# Redis-protocol store that the rate limits are counted in, so they hold for
+# all containers together; without one each container has its own buckets
+ADMISSION_STORE_URL = os.environ.get('ADMISSION_STORE_URL', RESULT_CACHE_URL)
+
+# Retry-After sent when the concurrency cap, rather than a bucket, rejects
+CONCURRENCY_RETRY_AFTER_SECONDS = float(os.environ.get('ADMISSION_RETRY_AFTER_SECONDS', '1'))
+
+# Built from the environment on first use and kept for the life of the container
+_controller = None
+
+class Overloaded(Exception):
+    """The request was refused to protect the database; retry after `retry_after` seconds"""
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+def action_class(action):
+    return ACTION_CLASSES.get(action, DEFAULT_ACTION_CLASS)
+
+def class_limits():
+    """
+    (rate per second, burst) per action class from ADMISSION_<CLASS>_RATE and
+    ADMISSION_<CLASS>_BURST. A class without a rate is not limited.
+    """
+    limits = {}
+    for name in ACTION_CLASS_NAMES:
+        rate = float(os.environ.get(f'ADMISSION_{name.upper()}_RATE', '0'))
+        if rate > 0:
+            burst = float(os.environ.get(f'ADMISSION_{name.upper()}_BURST', str(max(1.0, rate))))
+            limits[name] = (rate, burst)
+    return limits
+
+class TokenBucket:
+    """Refills at `rate` tokens per second up to `burst`; one token per request"""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.clock = clock
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        """Take a token and return 0, or return the seconds until one is available"""
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+class SharedRateLimit:
+    """
+    Rate limit counted in a shared store, so every container draws from one
+    budget: at most `burst` requests per window of burst / rate seconds
+    (never shorter than a second), keyed by wall-clock window. If the store
+    fails, the container falls back to a local TokenBucket with the same
+    limits rather than refusing or admitting everything.
+    """
+
+    def __init__(self, name, rate, burst, store, clock=time.time):
+        self.name = name
+        self.window = max(1.0, burst / rate)
+        self.limit = max(1, int(rate * self.window))
+        self.store = store
+        self.clock = clock
+        self.fallback = TokenBucket(rate, burst)
+        self.errors = 0
+
+    def try_acquire(self):
+        """Take one of the window's requests and return 0, or return the seconds until the next window"""
+        now = self.clock()
+        window = int(now // self.window)
+        key = f'admission:{self.name}:{window}'
+        try:
+            count = self.store.incr(key)
+            if count == 1:
+                self.store.expire(key, math.ceil(self.window) + 1)
+        except Exception:
+            self.errors += 1
+            return self.fallback.try_acquire()
+        if count <= self.limit:
+            return 0.0
+        return (window + 1) * self.window - now
+
+class AdmissionController:
+    """
+    Decides, before any connection is opened, whether a request may run:
+    first the container's concurrency cap, then the token bucket of the
+    action's class. Refusals are immediate, never queued.
+    """
+
+    def __init__(self, limits=None, max_concurrency=0, clock=time.monotonic, store=None):
+        if store is None:
+            self.buckets = {name: TokenBucket(rate, burst, clock) for name, (rate, burst) in (limits or {}).items()}
+        else:
+            self.buckets = {name: SharedRateLimit(name, rate, burst, store) for name, (rate, burst) in (limits or {}).items()}
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.metrics = {'admitted': 0, 'rate_limited': 0, 'concurrency_limited': 0}
+
+    @contextmanager
+    def admit(self, action):
+        """Hold a slot for the body of the with-block, or raise Overloaded straight away"""
+        # Keep-warm pings must never be turned away
+        if action == WARMUP_ACTION:
+            yield
+            return
+
+        name = action_class(action)
+        bucket = self.buckets.get(name)
+        with self.lock:
+            if self.max_concurrency and self.in_flight >= self.max_concurrency:
+                self.metrics['concurrency_limited'] += 1
+                raise Overloaded(f'{self.in_flight} requests already in progress', CONCURRENCY_RETRY_AFTER_SECONDS)
+            # Hold the slot while the bucket decides
+            self.in_flight += 1
+        # Outside the lock: a shared limit is a round trip to the store, and
+        # every bucket locks itself
+        wait = bucket.try_acquire() if bucket else 0.0
+        with self.lock:
+            if wait:
+                self.in_flight -= 1
+                self.metrics['rate_limited'] += 1
+            else:
+                self.metrics['admitted'] += 1
+        if wait:
+            raise Overloaded(f'rate limit for {name} actions reached', wait)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+def admission_controller(pool_size=None):
+    """
+    The container's controller. Handlers that share a fixed-size connection
+    pool pass its size: it caps concurrency when ADMISSION_MAX_CONCURRENCY
+    is unset or larger, since more requests could not get a connection.
+    """
+    global _controller
+    if _controller is None:
+        max_concurrency = MAX_CONCURRENCY
+        if pool_size:
+            max_concurrency = min(max_concurrency, pool_size) if max_concurrency else pool_size
+        limits = class_limits()
+        store = redis_client(ADMISSION_STORE_URL) if limits and ADMISSION_STORE_URL else None
+        _controller = AdmissionController(limits, max_concurrency, store=store)
+    return _controller
+
+def overloaded_response(event, error):
+    """
+    429 with Retry-After for API Gateway proxy requests (they carry headers);
+    direct invocations get the usual error dict with retry_after in seconds
+    """
+    retry_after = max(1, math.ceil(error.retry_after))
+    result = {'error': f'Too many requests: {error}', 'retry_after': retry_after}
+    if 'headers' not in event:
+        return result
+    return {
+        'statusCode': 429,
+        'headers': {'Content-Type': 'application/json', 'Retry-After': str(retry_after)},
+        'body': json.dumps(result)
+    }
@@ -0,0 +1,255 @@
+# async_handlers.py - asyncio Variant of the Account Service Handler
+import asyncio
+import json
+import math
+import os
+import time
+import traceback
+from contextlib import asynccontextmanager
+import aiomysql
+import pymysql
+
+from AWS_Lambda_Microservices import Account_Service
+from AWS_Lambda_Microservices.Account_Service import (
+    ACCOUNTS_VERSION_SQL,
+    GET_ACCOUNTS_SQL,
+    GET_ACCOUNT_DETAILS_SQL,
+    GET_CUSTOMER_TOTALS_SQL,
+    accounts_version_etag,
+    convert_account_data
+)
+from AWS_Lambda_Microservices.admission import Overloaded, admission_controller, overloaded_response
+from AWS_Lambda_Microservices.compression import maybe_compress
+from AWS_Lambda_Microservices.conditional import (
+    etag_matches,
+    make_etag,
+    not_modified_response,
+    tagged_response,
+    with_if_none_match
+)
+from AWS_Lambda_Microservices.db import (
+    ER_UNKNOWN_SYSTEM_VARIABLE,
+    DeadlineExceeded,
+    remaining_budget_ms,
+    timeout_response
+)
+from AWS_Lambda_Microservices.warmup import WARMUP_ACTION, elapsed_ms, is_warmup
+
+POOL_MIN_SIZE = int(os.environ.get('ASYNC_POOL_MIN_SIZE', '1'))
+POOL_MAX_SIZE = int(os.environ.get('ASYNC_POOL_MAX_SIZE', '4'))
+
+# Opening a pool connection is not bounded by any one invocation's deadline
+CONNECT_TIMEOUT_SECONDS = int(os.environ.get('ASYNC_CONNECT_TIMEOUT_SECONDS', '5'))
+
+# Actions answered natively on the pool; anything else (the write paths,
+# columnar responses) is handed to the synchronous Account_Service handler
+# on a worker thread.
+ASYNC_ACTIONS = ('get_accounts', 'get_account_details', 'get_account_overview')
+
+# Both survive between warm invocations of the same container
+_pool = None
+_loop = None
+
+async def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = await aiomysql.create_pool(
+            host=os.environ.get('DB_HOST', 'database-2.crq7shsasjo0.us-west-2.rds.amazonaws.com'),
+            user=os.environ.get('DB_USER', 'admin'),
+            password=os.environ.get('DB_PASSWORD', 'demo1234!'),
+            db=os.environ.get('DB_NAME', 'BankingRewardsFees_New'),
+            minsize=POOL_MIN_SIZE,
+            maxsize=POOL_MAX_SIZE,
+            connect_timeout=CONNECT_TIMEOUT_SECONDS,
+            autocommit=True
+        )
+    return _pool
+
+async def set_statement_timeouts(conn, budget_ms):
+    """
+    db.set_statement_timeouts for an aiomysql connection. Cancelling a query
+    on the client only drops the socket, so the server must stop it itself.
+    """
+    lock_wait_seconds = max(1, math.ceil(budget_ms / 1000))
+    async with conn.cursor() as cursor:
+        try:
+            await cursor.execute("SET SESSION max_execution_time = %s, innodb_lock_wait_timeout = %s",
+                                 (budget_ms, lock_wait_seconds))
+        except pymysql.err.MySQLError as e:
+            if not e.args or e.args[0] != ER_UNKNOWN_SYSTEM_VARIABLE:
+                raise
+            # MariaDB spells it max_statement_time, in seconds
+            await cursor.execute("SET SESSION max_statement_time = %s, innodb_lock_wait_timeout = %s",
+                                 (budget_ms / 1000, lock_wait_seconds))
+    conn.deadline_bounded = True
+
+async def clear_statement_timeouts(conn):
+    """Back to the server defaults for a pooled connection a deadline-bounded request used"""
+    async with conn.cursor() as cursor:
+        try:
+            await cursor.execute("SET SESSION max_execution_time = DEFAULT, innodb_lock_wait_timeout = DEFAULT")
+        except pymysql.err.MySQLError as e:
+            if not e.args or e.args[0] != ER_UNKNOWN_SYSTEM_VARIABLE:
+                raise
+            await cursor.execute("SET SESSION max_statement_time = DEFAULT, innodb_lock_wait_timeout = DEFAULT")
+    conn.deadline_bounded = False
+
+@asynccontextmanager
+async def acquire(pool, context=None):
+    """
+    Borrow a pool connection whose statements and lock waits stop at the
+    invocation's deadline (like db.deadline_connection); without a Lambda
+    context, limits left by an earlier request are cleared
+    """
+    async with pool.acquire() as conn:
+        budget_ms = remaining_budget_ms(context)
+        if budget_ms is not None:
+            if budget_ms <= 0:
+                raise DeadlineExceeded('no time left for database work')
+            await set_statement_timeouts(conn, budget_ms)
+        elif getattr(conn, 'deadline_bounded', False):
+            await clear_statement_timeouts(conn)
+        yield conn
+
+async def fetch_one(pool, sql, params=(), context=None):
+    async with acquire(pool, context) as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(sql, params)
+            return await cursor.fetchone()
+
+async def fetch_all(pool, sql, params=(), context=None):
+    async with acquire(pool, context) as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(sql, params)
+            return await cursor.fetchall()
+
+async def warm_up_pool():
+    """Open the pool (POOL_MIN_SIZE connections) and run the hot statements concurrently on it"""
+    started = time.perf_counter()
+    pool = await get_pool()
+    connect_ms = elapsed_ms(started)
+
+    executing = time.perf_counter()
+    statements = Account_Service.warmup_statements()
+    await asyncio.gather(*(fetch_all(pool, sql, params) for sql, params in statements))
+    return {
+        'warmed': True,
+        'connections': pool.size,
+        'statements': len(statements),
+        'connect_ms': connect_ms,
+        'statements_ms': elapsed_ms(executing),
+        'total_ms': elapsed_ms(started)
+    }
+
+async def handle_action(event, body, context=None):
+    """Dispatch one parsed request body; independent queries run concurrently on the pool"""
+    action = body.get('action')
+
+    if action == WARMUP_ACTION:
+        return await warm_up_pool()
+
+    if action not in ASYNC_ACTIONS or body.get('format', 'rows') != 'rows':
+        # The sync handler gets the original event (headers included) and
+        # applies the invocation deadline to its own connection
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, Account_Service.lambda_handler, event, context)
+
+    # Delegated actions are admitted (and compressed) by the sync handler itself
+    with admission_controller().admit(action):
+        return maybe_compress(event, await handle_native_action(action, with_if_none_match(event, body), context))
+
+async def handle_native_action(action, body, context=None):
+    """Same responses as the sync operations, including ETags and 304s for API Gateway requests"""
+    pool = await get_pool()
+
+    if action == 'get_accounts':
+        conditional = 'if_none_match' in body
+        etag = None
+        if conditional:
+            etag = accounts_version_etag(await fetch_one(pool, ACCOUNTS_VERSION_SQL, context=context))
+            if etag_matches(body['if_none_match'], etag):
+                return not_modified_response(etag)
+        accounts = [convert_account_data(account) for account in await fetch_all(pool, GET_ACCOUNTS_SQL, context=context)]
+        return tagged_response(accounts, etag) if conditional else accounts
+
+    account_id = body.get('account_id')
+    if not account_id:
+        return {'error': 'account_id is required'}
+
+    if action == 'get_account_details':
+        account = await fetch_one(pool, GET_ACCOUNT_DETAILS_SQL, (account_id,), context)
+        if not account:
+            return {'error': 'Account not found'}
+        if 'if_none_match' in body:
+            etag = make_etag(*account.values())
+            if etag_matches(body['if_none_match'], etag):
+                return not_modified_response(etag)
+            return tagged_response(convert_account_data(account), etag)
+        return convert_account_data(account)
+
+    account, totals = await asyncio.gather(
+        fetch_one(pool, GET_ACCOUNT_DETAILS_SQL, (account_id,), context),
+        fetch_one(pool, GET_CUSTOMER_TOTALS_SQL, (account_id,), context)
+    )
+    if not account:
+        return {'error': 'Account not found'}
+    return {
+        'account': convert_account_data(account),
+        'customer_totals': convert_account_data(totals)
+    }
+
+async def async_lambda_handler(event, context):
+    """
+    Account Service handler for asyncio runtimes; same event and response
+    format as Account_Service.lambda_handler
+    """
+    try:
+        # Parse the event data
+        if 'body' in event:
+            if isinstance(event['body'], str):
+                body = json.loads(event['body'])
+            else:
+                body = event['body']
+        else:
+            body = event
+
+        # Scheduled keep-warm pings skip business logic entirely
+        if is_warmup(event, body):
+            body = {'action': WARMUP_ACTION}
+
+        budget_ms = remaining_budget_ms(context)
+        if budget_ms is None:
+            return await handle_action(event, body, context)
+        if budget_ms <= 0:
+            raise DeadlineExceeded('no time left for database work')
+        # Cancelling a query closes its aiomysql connection instead of
+        # returning it to the pool mid-result; the session limits set on
+        # every acquired connection stop the statement on the server too
+        return await asyncio.wait_for(handle_action(event, body, context), timeout=budget_ms / 1000)
+
+    except Overloaded as e:
+        print(f"Rejected: {e}")
+        return overloaded_response(event, e)
+    except (asyncio.TimeoutError, DeadlineExceeded) as e:
+        print(f"Deadline exceeded: {e!r}")
+        return timeout_response(str(e) or 'deadline exceeded before the query finished')
+    except pymysql.err.MySQLError as e:
+        print(f"Database error: {e}")
+        return {'error': f'Database error: {str(e)}'}
+    except json.JSONDecodeError as e:
+        print(f"JSON decode error: {e}")
+        return {'error': f'JSON decode error: {str(e)}'}
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return {'error': f'Internal server error: {str(e)}'}
+
+def lambda_handler(event, context):
+    """
+    Synchronous entry point for the Lambda runtime. Reuses one event loop per
+    container, since the pool is bound to the loop it was created on.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(async_lambda_handler(event, context))
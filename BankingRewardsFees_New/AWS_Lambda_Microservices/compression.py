@@ -0,0 +1,82 @@
+# compression.py - Negotiated gzip/deflate Compression for Large Responses
+import base64
+import gzip
+import json
+import os
+import zlib
+from AWS_Lambda_Microservices.conditional import request_header
+
+COMPRESSION_THRESHOLD_BYTES = int(os.environ.get('COMPRESSION_THRESHOLD_BYTES', '8192'))
+COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', '1'))
+
+# Preferred first when the client weights them equally
+SUPPORTED_ENCODINGS = ('gzip', 'deflate')
+
+def accepted_encoding(event):
+    """
+    Pick gzip or deflate from the Accept-Encoding header of an API Gateway
+    proxy event, honouring q-values. Returns None when the client did not
+    ask for either (including direct invocations without headers).
+    """
+    header = request_header(event, 'Accept-Encoding')
+    if not header:
+        return None
+
+    weights = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding == '*':
+            for encoding in SUPPORTED_ENCODINGS:
+                weights.setdefault(encoding, quality)
+        elif coding in SUPPORTED_ENCODINGS:
+            weights[coding] = quality
+
+    candidates = [encoding for encoding in SUPPORTED_ENCODINGS if weights.get(encoding, 0) > 0]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda encoding: weights[encoding])
+
+def compress_bytes(data, encoding, level=COMPRESSION_LEVEL):
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=level)
+    # HTTP "deflate" is the zlib-wrapped stream
+    return zlib.compress(data, level)
+
+def maybe_compress(event, result, threshold=COMPRESSION_THRESHOLD_BYTES, level=COMPRESSION_LEVEL):
+    """
+    Return result as a compressed proxy-integration response (base64 body,
+    Content-Encoding header) when the client accepts gzip/deflate and the
+    JSON is at least threshold bytes; otherwise return result unchanged.
+    result may already be a proxy response, whose headers are kept.
+    """
+    encoding = accepted_encoding(event)
+    if encoding is None:
+        return result
+
+    if isinstance(result, dict) and 'statusCode' in result:
+        if result['statusCode'] != 200 or result.get('isBase64Encoded'):
+            return result
+        data = result['body'].encode('utf-8')
+        headers = dict(result.get('headers') or {})
+    else:
+        data = json.dumps(result).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+    if len(data) < threshold:
+        return result
+
+    headers['Content-Encoding'] = encoding
+    headers['Vary'] = 'Accept-Encoding'
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'isBase64Encoded': True,
+        'body': base64.b64encode(compress_bytes(data, encoding, level)).decode('ascii')
+    }
@@ -0,0 +1,45 @@
+# conditional.py - ETag / If-None-Match Support for Read Actions
+import hashlib
+import json
+
+def request_header(event, name):
+    """Case-insensitive header lookup on an API Gateway proxy event"""
+    headers = event.get('headers') or {}
+    name = name.lower()
+    return next((value for key, value in headers.items() if key.lower() == name), None)
+
+def with_if_none_match(event, body):
+    """
+    Copy If-None-Match into the parsed body for the read operations. Requests
+    that arrive through API Gateway (they carry headers) always get the key,
+    possibly None, so the response includes an ETag to validate next time.
+    """
+    if 'headers' not in event:
+        return body
+    return {**body, 'if_none_match': request_header(event, 'If-None-Match')}
+
+def make_etag(*parts):
+    """Strong ETag from any repr-able values"""
+    digest = hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match or not etag:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    # If-None-Match uses weak comparison
+    return '*' in candidates or etag in [value[2:] if value.startswith('W/') else value for value in candidates]
+
+# The body may be compressed per Accept-Encoding (compression.py), so shared
+# caches must not hand one client's representation to another
+VARY = 'Accept-Encoding'
+
+def not_modified_response(etag):
+    return {'statusCode': 304, 'headers': {'ETag': etag, 'Vary': VARY}, 'body': ''}
+
+def tagged_response(result, etag):
+    """Proxy-integration response carrying the ETag (if any) of a read result"""
+    headers = {'Content-Type': 'application/json', 'Vary': VARY}
+    if etag:
+        headers['ETag'] = etag
+    return {'statusCode': 200, 'headers': headers, 'body': json.dumps(result)}
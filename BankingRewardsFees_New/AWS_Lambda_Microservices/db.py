@@ -0,0 +1,135 @@
+# db.py - Shared Database Connections for the Lambda Handlers
+import math
+import mysql.connector
+import os
+import time
+from mysql.connector import pooling
+
+POOL_NAME = 'banking_rewards_fees'
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '1'))
+
+# How long a request waits for a connection when every pooled one is in use
+POOL_WAIT_MS = int(os.environ.get('DB_POOL_WAIT_MS', '1000'))
+POOL_RETRY_INTERVAL_SECONDS = 0.005
+
+# Kept back from the invocation's remaining time, so a timeout error can
+# still be returned before the Lambda runtime kills the request
+DEADLINE_MARGIN_MS = int(os.environ.get('DEADLINE_MARGIN_MS', '500'))
+
+# ER_QUERY_TIMEOUT (MySQL max_execution_time), ER_STATEMENT_TIMEOUT (MariaDB
+# max_statement_time), ER_LOCK_WAIT_TIMEOUT and CR_SERVER_LOST (socket timeout)
+TIMEOUT_ERRNOS = (3024, 1969, 1205, 2013)
+ER_UNKNOWN_SYSTEM_VARIABLE = 1193
+
+# Created on first use and kept for the life of the container
+_pool = None
+
+class DeadlineExceeded(Exception):
+    """The invocation has no time left for (more) database work"""
+
+def connection_settings():
+    return {
+        'host': os.environ.get('DB_HOST', 'database-2.crq7shsasjo0.us-west-2.rds.amazonaws.com'),
+        'user': os.environ.get('DB_USER', 'admin'),
+        'password': os.environ.get('DB_PASSWORD', 'demo1234!'),
+        'database': os.environ.get('DB_NAME', 'BankingRewardsFees_New'),
+        'autocommit': True
+    }
+
+def get_connection(**overrides):
+    """Open a new connection; the per-service handlers close it after every request"""
+    return mysql.connector.connect(**{**connection_settings(), **overrides})
+
+def get_pooled_connection(wait_ms=None):
+    """
+    Borrow a connection from the container-wide pool. close() hands it back
+    instead of disconnecting, and the pool reconnects it if the server
+    dropped it while the container was frozen. When every connection is in
+    use, keep trying for up to wait_ms (POOL_WAIT_MS by default) before
+    raising the pool's PoolError.
+    """
+    global _pool
+    if _pool is None:
+        _pool = pooling.MySQLConnectionPool(pool_name=POOL_NAME, pool_size=POOL_SIZE, **connection_settings())
+    give_up_at = time.monotonic() + (POOL_WAIT_MS if wait_ms is None else wait_ms) / 1000
+    while True:
+        try:
+            return _pool.get_connection()
+        except mysql.connector.errors.PoolError:
+            if time.monotonic() >= give_up_at:
+                raise
+            time.sleep(POOL_RETRY_INTERVAL_SECONDS)
+
+class BorrowedConnection:
+    """
+    A pooled connection that goes back to the pool exactly once: closing it
+    again (the operation on success, then the router's cleanup) does nothing
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.returned = False
+
+    def close(self):
+        if not self.returned:
+            self.returned = True
+            self.conn.close()
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+def remaining_budget_ms(context):
+    """Milliseconds left for database work, or None when there is no Lambda context"""
+    get_remaining_time = getattr(context, 'get_remaining_time_in_millis', None)
+    if get_remaining_time is None:
+        return None
+    return get_remaining_time() - DEADLINE_MARGIN_MS
+
+def set_statement_timeouts(conn, budget_ms):
+    """Stop statements and lock waits of this session once budget_ms has passed"""
+    lock_wait_seconds = max(1, math.ceil(budget_ms / 1000))
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET SESSION max_execution_time = %s, innodb_lock_wait_timeout = %s",
+                       (budget_ms, lock_wait_seconds))
+    except mysql.connector.Error as e:
+        if e.errno != ER_UNKNOWN_SYSTEM_VARIABLE:
+            raise
+        # MariaDB spells it max_statement_time, in seconds
+        cursor.execute("SET SESSION max_statement_time = %s, innodb_lock_wait_timeout = %s",
+                       (budget_ms / 1000, lock_wait_seconds))
+    finally:
+        cursor.close()
+
+def deadline_connection(context, connect=None):
+    """
+    Wrap a connection factory so every connection it hands out is bounded by
+    the invocation's remaining time: socket timeouts on new connections
+    (connect=None opens them with get_connection) and max_execution_time /
+    innodb_lock_wait_timeout on the session. Raises DeadlineExceeded when
+    the budget is already spent. Without a Lambda context the factory is
+    returned unchanged.
+    """
+    if remaining_budget_ms(context) is None:
+        return connect or get_connection
+
+    def get_deadline_connection():
+        budget_ms = remaining_budget_ms(context)
+        if budget_ms <= 0:
+            raise DeadlineExceeded('no time left for database work')
+        if connect is None:
+            conn = get_connection(connection_timeout=max(1, math.ceil(budget_ms / 1000)))
+        else:
+            conn = connect()
+        set_statement_timeouts(conn, budget_ms)
+        return conn
+
+    return get_deadline_connection
+
+def is_timeout_error(error):
+    return isinstance(error, DeadlineExceeded) or (
+        isinstance(error, mysql.connector.Error) and error.errno in TIMEOUT_ERRNOS
+    )
+
+def timeout_response(error):
+    return {'error': f'Request timed out: {error}'}
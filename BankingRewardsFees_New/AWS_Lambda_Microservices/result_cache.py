@@ -0,0 +1,215 @@
+# result_cache.py - Versioned Fee/Reward Results in an In-Process LRU and an Optional Shared Store
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Entries kept per container; 0 (the default) disables the cache
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', '0'))
+
+# How long a validated entry is served without asking the database
+RESULT_CACHE_TTL_SECONDS = float(os.environ.get('RESULT_CACHE_TTL_SECONDS', '30'))
+
+# Answered by the fee/reward handlers and the router with the caches' hit ratios
+CACHE_STATS_ACTION = 'cache_stats'
+
+# Optional shared store speaking the Redis protocol, e.g. redis://cache:6379/0
+RESULT_CACHE_URL = os.environ.get('RESULT_CACHE_URL')
+
+class LocalRedis:
+    """
+    In-memory stand-in for a Redis server in tests and benchmarks: the few
+    commands used here, with the same call signatures (and expiry) as a
+    redis-py client
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.values = {}
+        self.clock = clock
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value, expires_at = self.values.get(key, (None, None))
+            if expires_at is not None and self.clock() >= expires_at:
+                del self.values[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        with self.lock:
+            self.values[key] = (value.encode('utf-8') if isinstance(value, str) else value,
+                                None if ex is None else self.clock() + ex)
+        return True
+
+    def incr(self, key):
+        with self.lock:
+            value, expires_at = self.values.get(key, (b'0', None))
+            if expires_at is not None and self.clock() >= expires_at:
+                value, expires_at = b'0', None
+            count = int(value) + 1
+            self.values[key] = (str(count).encode('utf-8'), expires_at)
+            return count
+
+    def expire(self, key, seconds):
+        with self.lock:
+            if key not in self.values:
+                return False
+            self.values[key] = (self.values[key][0], self.clock() + seconds)
+            return True
+
+    def delete(self, *keys):
+        with self.lock:
+            return sum(self.values.pop(key, None) is not None for key in keys)
+
+def redis_client(url):
+    # Only needed when RESULT_CACHE_URL is set; any Redis-protocol server
+    # (Redis, Valkey, ElastiCache, ...) will do
+    import redis
+    return redis.Redis.from_url(url, socket_timeout=0.05, socket_connect_timeout=0.05)
+
+class ResultCache:
+    """
+    Calculated results per account, valid for one set of versions: the
+    inputs the calculation read and the rule version of the calculation
+    itself. Two ways to hit:
+
+    - fresh(): the entry was validated against the database less than
+      ttl_seconds ago, so neither the database nor the rule is needed;
+    - validate(): the caller read the current versions and they match the
+      entry, so the calculation is skipped and the entry is fresh again.
+
+    The in-process LRU is checked first; the optional shared store lets
+    other containers reuse validated entries. Shared store errors are
+    counted and otherwise ignored.
+
+    Writers call forget() after committing, which drops the entry here and
+    in the shared store. Another container's LRU copy can still be served
+    until its ttl_seconds run out: that is the bound on staleness.
+    """
+
+    def __init__(self, name, rule_version, max_entries=RESULT_CACHE_SIZE, ttl_seconds=RESULT_CACHE_TTL_SECONDS,
+                 shared=None, clock=time.time):
+        self.name = name
+        self.rule_version = rule_version
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.metrics = {'fresh_hits': 0, 'validated_hits': 0, 'misses': 0, 'evictions': 0, 'shared_hits': 0, 'shared_errors': 0}
+
+    def shared_key(self, account_id):
+        # Results of another rule version live under other keys and are never read
+        return f'{self.name}:v{self.rule_version}:{account_id}'
+
+    def _local(self, account_id):
+        with self.lock:
+            entry = self.entries.get(account_id)
+            if entry is not None:
+                self.entries.move_to_end(account_id)
+            return entry
+
+    def _shared(self, account_id):
+        """(versions, result, validated_at) from the shared store, copied into the LRU"""
+        if self.shared is None:
+            return None
+        try:
+            value = self.shared.get(self.shared_key(account_id))
+        except Exception:
+            self.metrics['shared_errors'] += 1
+            return None
+        if value is None:
+            return None
+        stored = json.loads(value)
+        entry = (tuple(stored['versions']), stored['result'], stored['validated_at'])
+        self.metrics['shared_hits'] += 1
+        self._remember(account_id, entry, share=False)
+        return entry
+
+    def _remember(self, account_id, entry, share=True):
+        with self.lock:
+            self.entries[account_id] = entry
+            self.entries.move_to_end(account_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.metrics['evictions'] += 1
+        if share and self.shared is not None:
+            versions, result, validated_at = entry
+            value = json.dumps({'versions': list(versions), 'result': result, 'validated_at': validated_at})
+            try:
+                # Kept a little longer than the TTL so validate() can still reuse it
+                self.shared.set(self.shared_key(account_id), value, ex=max(1, int(self.ttl_seconds * 10)))
+            except Exception:
+                self.metrics['shared_errors'] += 1
+
+    def fresh(self, account_id):
+        """The cached result if it was validated less than ttl_seconds ago, else None"""
+        if not self.max_entries:
+            return None
+        account_id = str(account_id)
+        entry = self._local(account_id)
+        if not self._is_fresh(entry):
+            # Another container may have validated it since
+            entry = self._shared(account_id)
+        if not self._is_fresh(entry):
+            return None
+        self.metrics['fresh_hits'] += 1
+        return entry[1]
+
+    def _is_fresh(self, entry):
+        return entry is not None and self.clock() - entry[2] < self.ttl_seconds
+
+    def validate(self, account_id, versions):
+        """The cached result if it was calculated from these versions (now fresh again), else None"""
+        if not self.max_entries:
+            return None
+        account_id = str(account_id)
+        versions = tuple(str(version) for version in versions)
+        entry = self._local(account_id)
+        if entry is None or entry[0] != versions:
+            entry = self._shared(account_id)
+        if entry is None or entry[0] != versions:
+            self.metrics['misses'] += 1
+            return None
+        self.metrics['validated_hits'] += 1
+        self._remember(account_id, (versions, entry[1], self.clock()))
+        return entry[1]
+
+    def forget(self, account_ids):
+        """
+        Drop the entries of accounts whose inputs were just changed. The shared
+        store is cleared even without a local cache: the writer (the Account
+        Lambda) usually has none, but the readers share its store.
+        """
+        account_ids = [str(account_id) for account_id in account_ids]
+        with self.lock:
+            for account_id in account_ids:
+                self.entries.pop(account_id, None)
+        if self.shared is not None and account_ids:
+            try:
+                self.shared.delete(*[self.shared_key(account_id) for account_id in account_ids])
+            except Exception:
+                self.metrics['shared_errors'] += 1
+
+    def store(self, account_id, versions, result):
+        if self.max_entries:
+            self._remember(str(account_id), (tuple(str(version) for version in versions), result, self.clock()))
+
+    def stats(self):
+        """Hit ratios over all lookups: fresh hits skip the database, validated hits only the calculation"""
+        fresh, validated, misses = self.metrics['fresh_hits'], self.metrics['validated_hits'], self.metrics['misses']
+        lookups = fresh + validated + misses
+        return {
+            **self.metrics,
+            'entries': len(self.entries),
+            'hit_ratio': round((fresh + validated) / lookups, 4) if lookups else 0.0,
+            'fresh_hit_ratio': round(fresh / lookups, 4) if lookups else 0.0
+        }
+
+def result_cache(name, rule_version):
+    """A cache configured from the environment, shared across containers when RESULT_CACHE_URL is set"""
+    shared = redis_client(RESULT_CACHE_URL) if RESULT_CACHE_URL else None
+    return ResultCache(name, rule_version, shared=shared)
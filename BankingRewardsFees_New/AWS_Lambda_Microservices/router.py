@@ -0,0 +1,143 @@
+# router.py - Single-Deployment Router for Account, Fee and Rewards Operations
+import json
+import mysql.connector
+import os
+import traceback
+
+from AWS_Lambda_Microservices import Account_Service, Fee_Calculation_Service, Rewards_Calculation_Service, db
+from AWS_Lambda_Microservices.admission import Overloaded, admission_controller, overloaded_response
+from AWS_Lambda_Microservices.compression import maybe_compress
+from AWS_Lambda_Microservices.conditional import with_if_none_match
+from AWS_Lambda_Microservices.db import (
+    BorrowedConnection, DeadlineExceeded, POOL_WAIT_MS, deadline_connection, get_pooled_connection, is_timeout_error, remaining_budget_ms, timeout_response
+)
+from AWS_Lambda_Microservices.result_cache import CACHE_STATS_ACTION
+from AWS_Lambda_Microservices.singleflight import SingleFlight
+from AWS_Lambda_Microservices.warmup import WARMUP_ACTION, is_warmup, warm_up
+
+def warmup(body, get_connection):
+    """Fill the whole pool and run every service's hot statements once"""
+    statements = (Account_Service.warmup_statements()
+                  + Fee_Calculation_Service.warmup_statements()
+                  + Rewards_Calculation_Service.warmup_statements())
+    report = warm_up(get_connection, statements, connections=db.POOL_SIZE)
+    if Fee_Calculation_Service.use_tier_map():
+        report['tier_map_customers'] = Fee_Calculation_Service.warm_tier_map(get_connection)
+    return report
+
+def cache_stats(body, get_connection):
+    return {
+        'fee': Fee_Calculation_Service.fee_cache.stats(),
+        'reward': Rewards_Calculation_Service.reward_cache.stats()
+    }
+
+# One deployment serves every operation, so all of them share one warm
+# container pool and one DB connection pool per container. The per-service
+# handlers dispatch into the same functions with a fresh connection each.
+ROUTES = {
+    **Account_Service.ACTIONS,
+    'calculate_fee': Fee_Calculation_Service.get_account_fee,
+    'calculate_reward': Rewards_Calculation_Service.get_account_reward,
+    WARMUP_ACTION: warmup,
+    CACHE_STATS_ACTION: cache_stats,
+}
+
+# Keyed single-row reads: when a threaded server runs this handler, users
+# looking at the same account at the same moment share one query
+COALESCED_ACTIONS = ('get_account_details', 'calculate_fee', 'calculate_reward')
+COALESCING_ENABLED = os.environ.get('COALESCE_READS', 'true').lower() == 'true'
+
+# Shared by every thread of the container
+coalescer = SingleFlight()
+
+def coalescing_key(action, body):
+    """(action, account_id), plus If-None-Match when it shapes the response; None when not coalesced"""
+    if not COALESCING_ENABLED or action not in COALESCED_ACTIONS or not body.get('account_id'):
+        return None
+    key = (action, str(body['account_id']))
+    if 'if_none_match' in body:
+        key += (body['if_none_match'],)
+    return key
+
+def lambda_handler(event, context):
+    """
+    Router Lambda Function - expects {"action": ..., ...} with any action
+    from Account_Service plus calculate_fee and calculate_reward
+    """
+    try:
+        # Parse the event data
+        if 'body' in event:
+            if isinstance(event['body'], str):
+                body = json.loads(event['body'])
+            else:
+                body = event['body']
+        else:
+            body = event
+
+        # Scheduled keep-warm pings skip business logic entirely
+        if is_warmup(event, body):
+            body = {'action': WARMUP_ACTION}
+
+        action = body.get('action')
+        operation = ROUTES.get(action)
+
+        if operation is None:
+            return {'error': f'Invalid action: {action}. Available actions: {", ".join(ROUTES)}'}
+
+        borrowed = []
+
+        def borrow_connection():
+            # Wait for a free connection no longer than the invocation has left
+            budget_ms = remaining_budget_ms(context)
+            wait_ms = POOL_WAIT_MS if budget_ms is None else max(0, min(POOL_WAIT_MS, budget_ms))
+            conn = BorrowedConnection(get_pooled_connection(wait_ms))
+            borrowed.append(conn)
+            return conn
+
+        # Session timeouts follow the invocation's remaining time; the pool
+        # resets them when the connection is handed back
+        get_connection = deadline_connection(context, borrow_connection)
+
+        body = with_if_none_match(event, body)
+
+        def run_operation():
+            # Refused requests are answered before borrowing from the pool, and
+            # no more run at once than the pool has connections
+            with admission_controller(db.POOL_SIZE).admit(action):
+                try:
+                    return operation(body, get_connection)
+                finally:
+                    # Operations only close their connection on success; whatever
+                    # they left open goes back to the pool (which resets the session)
+                    for conn in borrowed:
+                        conn.close()
+
+        key = coalescing_key(action, body)
+        if key is None:
+            result = run_operation()
+        else:
+            # Requests that join one in flight wait at most their own remaining time
+            budget_ms = remaining_budget_ms(context)
+            result = coalescer.do(key, run_operation, None if budget_ms is None else max(0, budget_ms) / 1000)
+
+        return maybe_compress(event, result)
+
+    except Overloaded as e:
+        print(f"Rejected: {e}")
+        return overloaded_response(event, e)
+    except DeadlineExceeded as e:
+        print(f"Deadline exceeded: {e}")
+        return timeout_response(e)
+    except mysql.connector.Error as e:
+        if is_timeout_error(e):
+            print(f"Query timed out: {e}")
+            return timeout_response(e)
+        print(f"Database error: {e}")
+        return {'error': f'Database error: {str(e)}'}
+    except json.JSONDecodeError as e:
+        print(f"JSON decode error: {e}")
+        return {'error': f'JSON decode error: {str(e)}'}
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return {'error': f'Internal server error: {str(e)}'}
@@ -0,0 +1,51 @@
+# singleflight.py - Coalescing of Identical Concurrent Requests
+import threading
+from AWS_Lambda_Microservices.db import DeadlineExceeded
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers that arrive while a call
+    for their key is in flight wait for it and share its result (or its
+    exception) instead of running their own. Nothing is kept once the call
+    finishes, so this is not a cache.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.metrics = {'executed': 0, 'coalesced': 0}
+
+    def do(self, key, func, timeout=None):
+        """Return func() for the first caller of `key`; later concurrent callers wait up to `timeout` seconds"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.metrics['executed'] += 1
+            else:
+                self.metrics['coalesced'] += 1
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise DeadlineExceeded('gave up waiting for an identical request in flight')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
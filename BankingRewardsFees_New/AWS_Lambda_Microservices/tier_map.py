@@ -0,0 +1,133 @@
+# tier_map.py - Cached customer_id -> tier Map Kept Current by Customers.updated_at
+import os
+import threading
+import time
+from array import array
+from datetime import timedelta
+
+# How stale a tier may be: older maps catch up before the next lookup
+TIER_MAP_REFRESH_SECONDS = float(os.environ.get('TIER_MAP_REFRESH_SECONDS', '5'))
+
+# Rows per fetch while loading, so a bulk load never holds every row at once
+TIER_MAP_FETCH_SIZE = 10000
+
+# customer_ids below this are kept in a byte array indexed by id (one byte
+# per id); larger ids, if any, go to a dict
+DENSE_ID_LIMIT = 1 << 24
+
+# Each refresh reads this far back before the previous read, so a tier change
+# whose transaction commits after that read (its updated_at is older) is
+# still picked up
+TIER_MAP_OVERLAP_SECONDS = float(os.environ.get('TIER_MAP_OVERLAP_SECONDS', '5'))
+
+# Typecode that replaces a full one once there are more distinct tiers
+WIDER_TYPECODES = {'B': 'H', 'H': 'I', 'I': 'Q'}
+
+# read_at is the statement's start time (NOW() is fixed per statement): the
+# next refresh starts from it rather than from the newest updated_at read
+LOAD_TIERS_SQL = """
+    SELECT customer_id, tier, updated_at, NOW() AS read_at FROM Customers
+"""
+
+# >= rather than >: rows changed within the watermark's second are read again
+REFRESH_TIERS_SQL = """
+    SELECT customer_id, tier, updated_at, NOW() AS read_at FROM Customers
+    WHERE updated_at >= %s
+"""
+
+GET_TIER_SQL = """
+    SELECT customer_id, tier, updated_at FROM Customers WHERE customer_id = %s
+"""
+
+class TierMap:
+    """
+    Every customer's tier, loaded in bulk once per container and then kept
+    current by reading only the Customers rows whose updated_at is at or
+    after the previous read started, less TIER_MAP_OVERLAP_SECONDS
+    (idx_customers_updated_at). Tiers are stored as one-byte codes, widened
+    only past 255 distinct tiers; code 0 means unknown. A customer the map
+    has never seen (e.g. inserted without updated_at) is looked up by
+    primary key.
+    """
+
+    def __init__(self, refresh_seconds=TIER_MAP_REFRESH_SECONDS, clock=time.monotonic):
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock
+        self.tiers = [None]
+        self.tier_codes = {}
+        self.codes = array('B')
+        self.sparse = {}
+        self.customers = 0
+        self.watermark = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+        self.metrics = {'bulk_loads': 0, 'refreshes': 0, 'rows_refreshed': 0, 'misses': 0}
+
+    def __len__(self):
+        return self.customers
+
+    def _code(self, tier):
+        code = self.tier_codes.get(tier)
+        if code is None:
+            code = self.tier_codes[tier] = len(self.tiers)
+            self.tiers.append(tier)
+            while code >= 1 << (8 * self.codes.itemsize):
+                self.codes = array(WIDER_TYPECODES[self.codes.typecode], self.codes)
+        return code
+
+    def _apply(self, rows):
+        for row in rows:
+            customer_id, code = row['customer_id'], self._code(row['tier'])
+            if 0 <= customer_id < DENSE_ID_LIMIT:
+                if customer_id >= len(self.codes):
+                    self.codes.frombytes(bytes((customer_id + 1 - len(self.codes)) * self.codes.itemsize))
+                previous = self.codes[customer_id]
+                self.codes[customer_id] = code
+            else:
+                previous = self.sparse.get(customer_id, 0)
+                self.sparse[customer_id] = code
+            if not previous:
+                self.customers += 1
+
+    def ensure_current(self, cursor):
+        """Bulk load on first use, then refresh incrementally once the map is refresh_seconds old"""
+        with self.lock:
+            now = self.clock()
+            if self.checked_at is not None and now - self.checked_at < self.refresh_seconds:
+                return
+            refreshing = self.checked_at is not None and self.watermark is not None
+            if refreshing:
+                cursor.execute(REFRESH_TIERS_SQL, (self.watermark - timedelta(seconds=TIER_MAP_OVERLAP_SECONDS),))
+                self.metrics['refreshes'] += 1
+            else:
+                cursor.execute(LOAD_TIERS_SQL)
+                self.metrics['bulk_loads'] += 1
+            while True:
+                rows = cursor.fetchmany(TIER_MAP_FETCH_SIZE)
+                if not rows:
+                    break
+                # An empty result keeps the old watermark, which is still safe
+                self.watermark = rows[0]['read_at']
+                self._apply(rows)
+                if refreshing:
+                    self.metrics['rows_refreshed'] += len(rows)
+            self.checked_at = now
+
+    def tier(self, customer_id, cursor):
+        """The customer's tier (KeyError if there is no such customer); cursor must return dicts"""
+        self.ensure_current(cursor)
+        if 0 <= customer_id < len(self.codes):
+            code = self.codes[customer_id]
+        else:
+            code = self.sparse.get(customer_id, 0)
+        if code:
+            return self.tiers[code]
+
+        self.metrics['misses'] += 1
+        cursor.execute(GET_TIER_SQL, (customer_id,))
+        row = cursor.fetchone()
+        if not row:
+            raise KeyError(customer_id)
+        with self.lock:
+            self._apply([row])
+        return row['tier']
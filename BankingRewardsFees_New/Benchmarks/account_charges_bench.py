@@ -0,0 +1,42 @@
+# account_charges_bench.py - Snapshot reads vs on-the-fly fee/reward calculation
+import argparse
+from bench_utils import get_connection, sample_account_ids, time_calls, summarize, print_summaries
+
+from AWS_Lambda_Microservices.Fee_Calculation_Service import GET_FEE_INPUTS_SQL, GET_FEE_SNAPSHOT_SQL, calculate_fee
+from AWS_Lambda_Microservices.Rewards_Calculation_Service import GET_BALANCE_SQL, GET_REWARD_SNAPSHOT_SQL, calculate_reward
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare AccountCharges reads with on-the-fly calculation')
+    parser.add_argument('--reads', type=int, default=20000)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    account_ids = [(account_id,) for account_id in sample_account_ids(conn, args.reads)]
+    cursor = conn.cursor(dictionary=True)
+
+    def on_the_fly(account_id):
+        cursor.execute(GET_FEE_INPUTS_SQL, (account_id,))
+        row = cursor.fetchone()
+        calculate_fee(row['customer_tier'], float(row['balance']))
+        cursor.execute(GET_BALANCE_SQL, (account_id,))
+        calculate_reward(float(cursor.fetchone()['balance']))
+
+    def snapshot(account_id):
+        cursor.execute(GET_FEE_SNAPSHOT_SQL, (account_id,))
+        cursor.fetchone()
+        cursor.execute(GET_REWARD_SNAPSHOT_SQL, (account_id,))
+        cursor.fetchone()
+
+    # Warm the buffer pool for both paths before measuring
+    time_calls(on_the_fly, account_ids[:1000])
+    time_calls(snapshot, account_ids[:1000])
+
+    print_summaries([
+        ('fee+reward on the fly', summarize(time_calls(on_the_fly, account_ids))),
+        ('fee+reward from AccountCharges', summarize(time_calls(snapshot, account_ids))),
+    ])
+    cursor.close()
+    conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+# admission_bench.py - Goodput under overload with and without admission control
+import argparse
+import contextlib
+import io
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+
+import mysql.connector
+
+from bench_utils import summarize
+from load_generator import build_workload, run_load
+
+from AWS_Lambda_Microservices import admission, router
+from AWS_Lambda_Microservices.admission import AdmissionController
+
+class EmulatedDatabase:
+    """
+    Stand-in for RDS with a fixed CPU budget. Up to `cores` concurrent
+    queries run at full speed. Beyond that they share the cores and also
+    pay a contention penalty per extra query (lock and buffer-pool churn,
+    context switches), so total throughput falls as concurrency rises.
+    Connections beyond max_connections fail with errno 1040.
+    """
+
+    def __init__(self, cores, max_connections, query_ms, contention):
+        self.cores = cores
+        self.max_connections = max_connections
+        self.query_ms = query_ms
+        self.contention = contention
+        self.connections = 0
+        self.active = 0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        with self.lock:
+            if self.connections >= self.max_connections:
+                raise mysql.connector.Error(msg='Too many connections', errno=1040)
+            self.connections += 1
+        return EmulatedConnection(self)
+
+    def query(self):
+        with self.lock:
+            self.active += 1
+            running = self.active
+        overload = max(0, running - self.cores)
+        time.sleep(self.query_ms / 1000 * max(1.0, running / self.cores) * (1 + self.contention * overload))
+        with self.lock:
+            self.active -= 1
+
+class EmulatedCursor:
+    def __init__(self, database):
+        self.database = database
+
+    def execute(self, sql, params=()):
+        self.database.query()
+
+    def fetchone(self):
+        return {'account_id': 1, 'customer_id': 100, 'customer_name': 'John Doe',
+                'balance': Decimal('7500.00'), 'customer_tier': 'gold'}
+
+    def close(self):
+        pass
+
+class EmulatedConnection:
+    def __init__(self, database):
+        self.database = database
+
+    def cursor(self, dictionary=False):
+        return EmulatedCursor(self.database)
+
+    def close(self):
+        with self.database.lock:
+            self.database.connections -= 1
+
+def run_variant(workload, database, controller, concurrency, backoff_ms):
+    router.get_pooled_connection = lambda wait_ms=None: database.connect()
+    admission._controller = controller
+    outcomes = Counter()
+    served = []
+
+    def invoke(body):
+        started = time.perf_counter()
+        result = router.lambda_handler(body, None)
+        if 'retry_after' in result:
+            outcomes['rejected'] += 1
+            # Clients back off on 429; Retry-After is scaled down to keep the run short
+            time.sleep(backoff_ms / 1000)
+        elif 'error' in result:
+            outcomes['failed'] += 1
+        else:
+            outcomes['ok'] += 1
+            served.append((time.perf_counter() - started) * 1000)
+        return result
+
+    # The handlers log every rejection
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, _, elapsed = run_load(invoke, workload, concurrency)
+    return outcomes, served, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare goodput under overload with and without admission control')
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[4, 16, 64])
+    parser.add_argument('--cores', type=int, default=4)
+    parser.add_argument('--max-connections', type=int, default=40)
+    parser.add_argument('--query-ms', type=float, default=5.0)
+    parser.add_argument('--contention', type=float, default=0.15)
+    parser.add_argument('--backoff-ms', type=float, default=20.0, help='client pause after a rejection')
+    args = parser.parse_args()
+
+    workload = build_workload(list(range(1, 1001)), args.requests)
+    capacity = args.cores * 1000 / args.query_ms
+    print(f"emulated database: {args.cores} cores, {args.query_ms} ms/query, ~{capacity:.0f} queries/s at best")
+
+    print(f"{'clients':>7} {'variant':<20} {'ok/s':>8} {'ok':>6} {'rejected':>9} {'failed':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        variants = (
+            ('no admission control', AdmissionController()),
+            ('cap + token bucket', AdmissionController({'read': (capacity, args.cores)}, max_concurrency=args.cores)),
+        )
+        for label, controller in variants:
+            database = EmulatedDatabase(args.cores, args.max_connections, args.query_ms, args.contention)
+            outcomes, served, elapsed = run_variant(workload, database, controller, concurrency, args.backoff_ms)
+            s = summarize(served) if served else {'p50_ms': 0.0, 'p99_ms': 0.0}
+            print(f"{concurrency:>7} {label:<20} {outcomes['ok'] / elapsed:>8.0f} {outcomes['ok']:>6} "
+                  f"{outcomes['rejected']:>9} {outcomes['failed']:>7} {s['p50_ms']:>8.1f} {s['p99_ms']:>8.1f}")
+
+if __name__ == '__main__':
+    main()
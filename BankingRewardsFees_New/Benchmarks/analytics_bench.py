@@ -0,0 +1,45 @@
+# analytics_bench.py - Server-side balance distribution vs downloading every account
+import argparse
+import time
+from bench_utils import get_connection, time_calls, summarize, print_summaries
+
+from AWS_Lambda_Microservices.Account_Service import lambda_handler
+from AWS_Lambda_Microservices.Fee_Calculation_Service import calculate_fee
+from AWS_Lambda_Microservices.Rewards_Calculation_Service import calculate_reward
+
+def main():
+    parser = argparse.ArgumentParser(description='Time get_balance_distribution against a client-side computation')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM Accounts")
+    book_size = cursor.fetchone()[0]
+
+    def server_side():
+        result = lambda_handler({'action': 'get_balance_distribution'}, None)
+        if 'error' in result:
+            raise SystemExit(result['error'])
+
+    def client_side():
+        # What the app would have to do without the action: pull every row
+        cursor.execute("SELECT a.balance, c.tier FROM Accounts a JOIN Customers c ON a.customer_id = c.customer_id")
+        fees = rewards = 0.0
+        for balance, tier in cursor.fetchall():
+            fees += calculate_fee(tier, float(balance))
+            rewards += calculate_reward(float(balance))
+
+    print(f"book size: {book_size} accounts")
+    started = time.perf_counter()
+    server_side()
+    print(f"first (cold) get_balance_distribution: {time.perf_counter() - started:.2f}s")
+    print_summaries([
+        ('get_balance_distribution', summarize(time_calls(server_side, [()] * args.runs))),
+        ('download + compute client-side', summarize(time_calls(client_side, [()] * args.runs))),
+    ])
+    cursor.close()
+    conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# async_handler_bench.py - Serial sync handler vs asyncio handler for multi-query actions
+import argparse
+import asyncio
+import time
+from bench_utils import get_connection, sample_account_ids, time_calls, summarize, print_summaries
+
+from AWS_Lambda_Microservices import Account_Service, async_handlers
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the sync and asyncio Account Service handlers')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='in-flight invocations for the async throughput run')
+    args = parser.parse_args()
+
+    conn = get_connection()
+    account_ids = [(account_id,) for account_id in sample_account_ids(conn, args.requests)]
+    conn.close()
+
+    def sync_overview(account_id):
+        Account_Service.lambda_handler({'action': 'get_account_overview', 'account_id': account_id}, None)
+
+    def async_overview(account_id):
+        async_handlers.lambda_handler({'action': 'get_account_overview', 'account_id': account_id}, None)
+
+    # Warm both paths (the async pool is created on first use)
+    time_calls(sync_overview, account_ids[:200])
+    time_calls(async_overview, account_ids[:200])
+
+    print_summaries([
+        ('overview sync (serial queries)', summarize(time_calls(sync_overview, account_ids))),
+        ('overview async (gathered)', summarize(time_calls(async_overview, account_ids))),
+    ])
+
+    async def run_concurrently():
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(account_id):
+            async with semaphore:
+                await async_handlers.async_lambda_handler(
+                    {'action': 'get_account_overview', 'account_id': account_id}, None)
+
+        await asyncio.gather(*(one(account_id) for (account_id,) in account_ids))
+
+    started = time.perf_counter()
+    async_handlers._loop.run_until_complete(run_concurrently())
+    elapsed = time.perf_counter() - started
+    print(f"async, {args.concurrency} in flight: {len(account_ids) / elapsed:.0f} overviews/s")
+
+if __name__ == '__main__':
+    main()
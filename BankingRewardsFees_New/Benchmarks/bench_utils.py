@@ -0,0 +1,61 @@
+# bench_utils.py - Shared helpers for the benchmark scripts
+import os
+import random
+import statistics
+import sys
+import time
+import mysql.connector
+
+# Make the Lambda modules importable when a benchmark is run directly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the Lambda handlers at the same local database as get_connection()
+os.environ.setdefault('DB_HOST', 'localhost')
+os.environ.setdefault('DB_USER', 'root')
+os.environ.setdefault('DB_PASSWORD', '')
+
+def get_connection(autocommit=True):
+    # Benchmarks default to a local MySQL loaded with the new schema
+    return mysql.connector.connect(
+        host=os.environ.get('DB_HOST', 'localhost'),
+        user=os.environ.get('DB_USER', 'root'),
+        password=os.environ.get('DB_PASSWORD', ''),
+        database=os.environ.get('DB_NAME', 'BankingRewardsFees_New'),
+        autocommit=autocommit
+    )
+
+def sample_account_ids(conn, count, seed=42):
+    """Pick `count` existing account ids (with repetition) for a read workload"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT account_id FROM Accounts")
+    ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    rng = random.Random(seed)
+    return [rng.choice(ids) for _ in range(count)]
+
+def time_calls(func, args_list):
+    """Call func(*args) for every entry and return per-call latencies in ms"""
+    latencies = []
+    for args in args_list:
+        started = time.perf_counter()
+        func(*args)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+    return {
+        'calls': len(ordered),
+        'mean_ms': statistics.fmean(ordered),
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+    }
+
+def print_summaries(rows):
+    """Print (label, summary) pairs as an aligned table"""
+    print(f"{'variant':<32} {'calls':>8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label, s in rows:
+        print(f"{label:<32} {s['calls']:>8} {s['mean_ms']:>9.3f} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['p99_ms']:>9.3f}")
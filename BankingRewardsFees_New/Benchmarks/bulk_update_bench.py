@@ -0,0 +1,40 @@
+# bulk_update_bench.py - Per-row update_balance calls vs one update_balances batch
+import argparse
+import random
+import time
+from bench_utils import get_connection, sample_account_ids
+
+import AWS_Lambda_Microservices.Account_Service as account_service
+from AWS_Lambda_Microservices.Account_Service import lambda_handler
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare update_balance in a loop with the bulk update_balances action')
+    parser.add_argument('--updates', type=int, default=5000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    account_ids = sample_account_ids(conn, args.updates)
+    conn.close()
+    rng = random.Random(7)
+    updates = [{'account_id': account_id, 'new_balance': rng.randint(0, 2000000) / 100}
+               for account_id in account_ids]
+
+    started = time.perf_counter()
+    for update in updates:
+        lambda_handler({'action': 'update_balance', **update}, None)
+    single_seconds = time.perf_counter() - started
+
+    account_service.BULK_UPDATE_CHUNK_SIZE = args.chunk_size
+    started = time.perf_counter()
+    result = lambda_handler({'action': 'update_balances', 'updates': updates}, None)
+    bulk_seconds = time.perf_counter() - started
+    if 'error' in result:
+        raise SystemExit(result['error'])
+
+    print(f"{'variant':<24} {'updates':>8} {'seconds':>9} {'updates/s':>10}")
+    print(f"{'update_balance loop':<24} {len(updates):>8} {single_seconds:>9.2f} {len(updates) / single_seconds:>10.0f}")
+    print(f"{'update_balances':<24} {len(updates):>8} {bulk_seconds:>9.2f} {len(updates) / bulk_seconds:>10.0f}")
+
+if __name__ == '__main__':
+    main()
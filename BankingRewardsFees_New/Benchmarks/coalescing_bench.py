@@ -0,0 +1,71 @@
+# coalescing_bench.py - Router throughput and database queries with and without single-flight coalescing
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from bench_utils import summarize, print_summaries
+from load_generator import build_workload, run_load
+from admission_bench import EmulatedDatabase
+
+from AWS_Lambda_Microservices import router
+from AWS_Lambda_Microservices.singleflight import SingleFlight
+
+class CountingDatabase(EmulatedDatabase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.queries = 0
+
+    def query(self):
+        with self.lock:
+            self.queries += 1
+        super().query()
+
+def skewed_account_ids(accounts, exponent, seed=42):
+    """
+    Account ids repeated in proportion to a Zipf law, so that choosing
+    uniformly from the list favours a few hot accounts (exponent 0 is uniform)
+    """
+    ids = []
+    for rank in range(1, accounts + 1):
+        ids.extend([rank] * max(1, round(1000 / rank ** exponent)))
+    random.Random(seed).shuffle(ids)
+    return ids
+
+def run_variant(workload, database, coalescing, concurrency):
+    router.get_pooled_connection = lambda wait_ms=None: database.connect()
+    router.COALESCING_ENABLED = coalescing
+    router.coalescer = SingleFlight()
+    with contextlib.redirect_stdout(io.StringIO()):
+        latencies, errors, elapsed = run_load(lambda body: router.lambda_handler(body, None), workload, concurrency)
+    return latencies, errors, elapsed, router.coalescer.metrics['coalesced']
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare router reads with and without single-flight coalescing')
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--exponents', type=float, nargs='+', default=[0.0, 1.2],
+                        help='Zipf exponents for account popularity (0 = uniform)')
+    parser.add_argument('--cores', type=int, default=8)
+    parser.add_argument('--query-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    rows = []
+    print(f"{'workload':<12} {'coalescing':<10} {'req/s':>8} {'db queries':>11} {'coalesced':>10} {'errors':>7}")
+    for exponent in args.exponents:
+        account_ids = skewed_account_ids(args.accounts, exponent)
+        workload = build_workload(account_ids, args.requests)
+        name = 'uniform' if exponent == 0 else f'zipf {exponent}'
+        for coalescing in (False, True):
+            # Generous connection limit: this measures query load, not connection exhaustion
+            database = CountingDatabase(args.cores, 10 * args.concurrency, args.query_ms, 0.05)
+            latencies, errors, elapsed, coalesced = run_variant(workload, database, coalescing, args.concurrency)
+            label = 'on' if coalescing else 'off'
+            print(f"{name:<12} {label:<10} {len(workload) / elapsed:>8.0f} {database.queries:>11} {coalesced:>10} {errors:>7}")
+            rows.append((f"{name}, coalescing {label}", summarize(latencies)))
+    print_summaries(rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# columnar_bench.py - End-to-end cost of the rows vs columns get_accounts formats
+import argparse
+import base64
+import json
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+import bench_utils  # noqa: F401 - puts AWS_Lambda_Microservices on sys.path
+from AWS_Lambda_Microservices.Account_Service import columns_result, convert_account_data
+
+COLUMN_NAMES = ('account_id', 'customer_name', 'customer_id')
+
+def synthetic_rows(count, seed=42):
+    """get_accounts result set as the driver returns it (tuples); no database needed"""
+    rng = random.Random(seed)
+    return [(i, f"Customer {rng.randint(1, count):07d}", rng.randint(1, count)) for i in range(1, count + 1)]
+
+def rows_format(rows):
+    # dictionary=True cursor, convert_account_data, JSON list of objects, DataFrame from records
+    accounts = [convert_account_data(dict(zip(COLUMN_NAMES, row))) for row in rows]
+    payload = json.dumps(accounts)
+    return pd.DataFrame(json.loads(payload)), len(payload)
+
+def columns_format(rows):
+    payload = json.dumps(columns_result(COLUMN_NAMES, rows))
+    return pd.DataFrame(json.loads(payload)['columns']), len(payload)
+
+def arrow_ipc_format(rows):
+    # Reference point only: Arrow IPC through a base64 proxy body
+    import pyarrow as pa
+    columns = columns_result(COLUMN_NAMES, rows)['columns']
+    sink = pa.BufferOutputStream()
+    table = pa.table(columns)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    payload = base64.b64encode(sink.getvalue().to_pybytes()).decode('ascii')
+    return pa.ipc.open_stream(base64.b64decode(payload)).read_all().to_pandas(), len(payload)
+
+VARIANTS = {
+    'rows': rows_format,
+    'columns': columns_format,
+    'arrow-ipc': arrow_ipc_format,
+}
+
+def measure(func, rows):
+    started = time.perf_counter()
+    frame, size = func(rows)
+    elapsed = time.perf_counter() - started
+    assert len(frame) == len(rows)
+    del frame
+    # Separate run: tracing slows the timed one down several times
+    tracemalloc.start()
+    func(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare get_accounts response formats from result set to DataFrame')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=list(VARIANTS))
+    args = parser.parse_args()
+
+    # tracemalloc only sees Python/NumPy allocations, not Arrow's own buffers
+    print(f"{'accounts':>9} {'format':<10} {'seconds':>8} {'peak MB':>8} {'payload MB':>11}")
+    for size in args.sizes:
+        rows = synthetic_rows(size)
+        for name in args.variants:
+            elapsed, peak, payload = measure(VARIANTS[name], rows)
+            print(f"{size:>9} {name:<10} {elapsed:>8.2f} {peak / 1_000_000:>8.1f} {payload / 1_000_000:>11.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# compression_bench.py - Size/latency trade-off of gzip/deflate for get_accounts payloads
+import argparse
+import base64
+import gzip
+import json
+import random
+import time
+import zlib
+
+import bench_utils  # noqa: F401 - puts AWS_Lambda_Microservices on sys.path
+from AWS_Lambda_Microservices.compression import compress_bytes
+
+def synthetic_accounts(count, seed=42):
+    """get_accounts-shaped rows; no database needed"""
+    rng = random.Random(seed)
+    first = ['John', 'Jane', 'Maria', 'Wei', 'Aisha', 'Carlos', 'Olga', 'Sam']
+    last = ['Doe', 'Smith', 'Garcia', 'Chen', 'Khan', 'Silva', 'Ivanova', 'Lee']
+    return [{'account_id': i, 'customer_name': f"{rng.choice(first)} {rng.choice(last)} {rng.randint(1, 99999)}",
+             'customer_id': rng.randint(1, count)} for i in range(1, count + 1)]
+
+def best_of(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure gzip/deflate size and latency for get_accounts payloads')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 6, 9])
+    parser.add_argument('--mbps', type=float, default=50.0, help='link speed used to estimate transfer time')
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    def transfer_ms(size):
+        return size * 8 / (args.mbps * 1_000_000) * 1000
+
+    print(f"{'accounts':>8} {'encoding':<10} {'level':>5} {'bytes':>10} {'ratio':>6} "
+          f"{'compress ms':>12} {'decompress ms':>14} {'transfer ms':>12} {'total ms':>9}")
+    for count in args.sizes:
+        raw = json.dumps(synthetic_accounts(count)).encode('utf-8')
+        print(f"{count:>8} {'identity':<10} {'-':>5} {len(raw):>10} {1.0:>6.2f} "
+              f"{0.0:>12.2f} {0.0:>14.2f} {transfer_ms(len(raw)):>12.2f} {transfer_ms(len(raw)):>9.2f}")
+        for encoding, decompress in (('gzip', gzip.decompress), ('deflate', zlib.decompress)):
+            for level in args.levels:
+                compressed = compress_bytes(raw, encoding, level)
+                # What travels in the proxy response: base64 of the compressed bytes
+                wire = len(base64.b64encode(compressed))
+                compress_ms = best_of(lambda: compress_bytes(raw, encoding, level), args.repeats)
+                decompress_ms = best_of(lambda: decompress(compressed), args.repeats)
+                total = compress_ms + decompress_ms + transfer_ms(wire)
+                print(f"{count:>8} {encoding:<10} {level:>5} {wire:>10} {len(raw) / wire:>6.2f} "
+                      f"{compress_ms:>12.2f} {decompress_ms:>14.2f} {transfer_ms(wire):>12.2f} {total:>9.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# export_bench.py - Throughput, file size and memory of the streaming account export
+import argparse
+import os
+import random
+import resource
+import tempfile
+from decimal import Decimal
+
+from bench_utils import get_connection
+from AWS_Lambda_Microservices.account_export import WRITERS, export_accounts
+
+class SyntheticCursor:
+    """Serves keyset-paginated export rows without a database"""
+
+    def __init__(self, count, seed=42):
+        self.count = count
+        self.rng = random.Random(seed)
+        self.tiers = ['basic', 'gold', 'premium']
+        self._next = []
+
+    def execute(self, sql, params):
+        after, limit = (0,) + params if len(params) == 1 else params
+        last = min(self.count, after + limit)
+        self._next = [(account_id, account_id // 3 + 1, f"Customer {account_id // 3 + 1:07d}",
+                       self.rng.choice(self.tiers), Decimal(self.rng.randint(0, 5000000)) / 100)
+                      for account_id in range(after + 1, last + 1)]
+
+    def fetchall(self):
+        return self._next
+
+    def close(self):
+        pass
+
+class SyntheticConnection:
+    def __init__(self, count):
+        self.count = count
+
+    def start_transaction(self, **kwargs):
+        pass
+
+    def cursor(self):
+        return SyntheticCursor(self.count)
+
+    def commit(self):
+        pass
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure rows/s, file size and peak memory of account_export')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--formats', nargs='+', choices=list(WRITERS), default=list(WRITERS))
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--database', action='store_true',
+                        help='export the local database (bench_utils.get_connection) instead of synthetic rows')
+    args = parser.parse_args()
+
+    print(f"{'accounts':>9} {'format':<8} {'seconds':>8} {'rows/s':>10} {'MB':>8} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in ([None] if args.database else args.sizes):
+            for fmt in args.formats:
+                conn = get_connection() if args.database else SyntheticConnection(size)
+                destination = os.path.join(tmp, f'accounts.{fmt}')
+                report = export_accounts(conn, destination, fmt, args.chunk_size)
+                print(f"{report['rows']:>9} {fmt:<8} {report['seconds']:>8.2f} {report['rows_per_sec']:>10.0f} "
+                      f"{report['bytes'] / 1_000_000:>8.1f} {peak_rss_mb():>12.1f}")
+                os.remove(destination)
+                if args.database:
+                    conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# hedging_bench.py - Tail latency with and without hedged reads against a local service emulator
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_utils import summarize, print_summaries
+
+class EmulatorState:
+    """Injected latency: mostly fast, with a slow tail (cold starts, RDS hiccups) and optional outage"""
+
+    def __init__(self, base_ms, slow_ms, slow_ratio, seed=42):
+        self.base_ms = base_ms
+        self.slow_ms = slow_ms
+        self.slow_ratio = slow_ratio
+        self.outage = False
+        self.requests = 0
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def next_delay(self):
+        with self.lock:
+            self.requests += 1
+            slow = self.rng.random() < self.slow_ratio
+            return (self.slow_ms if slow else self.rng.uniform(0.5, 1.5) * self.base_ms) / 1000
+
+def emulator(state):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(state.next_delay())
+            status, body = (503, {'error': 'Service unavailable'}) if state.outage else (200, {'account_id': 1})
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def timed_reads(client, count, idempotent):
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            client.post({'action': 'get_account_details', 'account_id': 1}, idempotent)
+        except Exception:
+            pass
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure hedged reads and circuit breaking against an emulated service')
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--base-ms', type=float, default=20.0)
+    parser.add_argument('--slow-ms', type=float, default=800.0)
+    parser.add_argument('--slow-ratio', type=float, default=0.05)
+    args = parser.parse_args()
+
+    # Imported late: app.py builds its Streamlit page (bare mode) on import
+    from app import CircuitBreaker, ServiceClient
+
+    executor = ThreadPoolExecutor(max_workers=16)
+    rows = []
+    for label, idempotent in (('no hedging', False), ('hedged after p95', True)):
+        state = EmulatorState(args.base_ms, args.slow_ms, args.slow_ratio)
+        server = emulator(state)
+        client = ServiceClient('Emulator', f'http://127.0.0.1:{server.server_port}/', executor)
+        rows.append((label, summarize(timed_reads(client, args.requests, idempotent))))
+        print(f"{label}: {state.requests} requests served, hedges issued {client.metrics['hedges_issued']}, "
+              f"won {client.metrics['hedges_won']}")
+        server.shutdown()
+    print_summaries(rows)
+
+    # Outage: the breaker opens after BREAKER_FAILURE_THRESHOLD failures and later calls fail fast
+    state = EmulatorState(args.base_ms, args.slow_ms, 0.0)
+    state.outage = True
+    server = emulator(state)
+    client = ServiceClient('Emulator', f'http://127.0.0.1:{server.server_port}/', executor,
+                           CircuitBreaker(failure_threshold=5, reset_seconds=60))
+    latencies = timed_reads(client, 50, True)
+    print(f"outage: {state.requests} of 50 calls reached the service, {client.metrics['rejected']} rejected "
+          f"by the open circuit, breaker {client.breaker.state}")
+    print_summaries([('during outage', summarize(latencies))])
+    server.shutdown()
+    executor.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# incremental_recalc_bench.py - Full vs watermark-driven AccountCharges recompute
+import argparse
+import time
+from bench_utils import get_connection
+
+from AWS_Lambda_Microservices.account_charges import backfill, incremental_refresh, WATERMARK_JOB
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare a full AccountCharges rebuild with an incremental run')
+    parser.add_argument('--changed-percent', type=int, default=1,
+                        help='percentage of accounts to touch between the runs')
+    args = parser.parse_args()
+
+    conn = get_connection(autocommit=False)
+    cursor = conn.cursor()
+
+    started = time.perf_counter()
+    full_rows = backfill(conn)
+    full_seconds = time.perf_counter() - started
+
+    # Establish a mark, wait past the DATETIME second, then touch a slice of the book
+    cursor.execute("DELETE FROM RecalcWatermarks WHERE job_name = %s", (WATERMARK_JOB,))
+    conn.commit()
+    incremental_refresh(conn)
+    time.sleep(1.1)
+    cursor.execute("UPDATE Accounts SET updated_at = NOW() WHERE MOD(account_id, 100) < %s",
+                   (args.changed_percent,))
+    touched = cursor.rowcount
+    conn.commit()
+
+    started = time.perf_counter()
+    _, incremental_rows = incremental_refresh(conn)
+    incremental_seconds = time.perf_counter() - started
+
+    print(f"{'run':<14} {'rows':>10} {'seconds':>9}")
+    print(f"{'full':<14} {full_rows:>10} {full_seconds:>9.2f}")
+    print(f"{'incremental':<14} {incremental_rows:>10} {incremental_seconds:>9.2f}")
+    print(f"touched {touched} accounts; incremental cost {incremental_seconds / full_seconds:.1%} of full")
+    cursor.close()
+    conn.close()
+
+if __name__ == '__main__':
+    main()
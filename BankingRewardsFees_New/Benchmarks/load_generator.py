@@ -0,0 +1,44 @@
+# load_generator.py - Mixed account/fee/reward traffic for the handler benchmarks
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MIX = {'get_account_details': 0.4, 'calculate_fee': 0.3, 'calculate_reward': 0.3}
+
+# Which of the three per-service Lambdas serves each action
+SERVICE_FOR_ACTION = {'calculate_fee': 'fee', 'calculate_reward': 'reward'}
+
+def service_for(body):
+    return SERVICE_FOR_ACTION.get(body['action'], 'account')
+
+def build_workload(account_ids, requests, mix=DEFAULT_MIX, rate_per_second=50.0, seed=42):
+    """
+    Return (arrival_offset_seconds, body) pairs: Poisson arrivals at
+    rate_per_second with actions drawn from mix
+    """
+    rng = random.Random(seed)
+    actions, weights = zip(*mix.items())
+    workload = []
+    offset = 0.0
+    for _ in range(requests):
+        offset += rng.expovariate(rate_per_second)
+        workload.append((offset, {'action': rng.choices(actions, weights)[0],
+                                  'account_id': rng.choice(account_ids)}))
+    return workload
+
+def run_load(invoke, workload, concurrency=8):
+    """
+    Send every body through invoke(body) from a thread pool as fast as
+    possible. Returns (latencies_ms, errors, elapsed_seconds).
+    """
+    def one(body):
+        started = time.perf_counter()
+        result = invoke(body)
+        failed = isinstance(result, dict) and 'error' in result
+        return (time.perf_counter() - started) * 1000, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one, [body for _, body in workload]))
+    elapsed = time.perf_counter() - started
+    return [latency for latency, _ in outcomes], sum(1 for _, failed in outcomes if failed), elapsed
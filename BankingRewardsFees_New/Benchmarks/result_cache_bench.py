@@ -0,0 +1,69 @@
+# result_cache_bench.py - Fee/reward calculations with and without the versioned result cache
+import argparse
+import itertools
+
+from bench_utils import summarize, print_summaries
+from load_generator import build_workload, run_load
+from coalescing_bench import CountingDatabase, skewed_account_ids
+
+from AWS_Lambda_Microservices import Fee_Calculation_Service, Rewards_Calculation_Service, db
+from AWS_Lambda_Microservices.result_cache import LocalRedis, ResultCache
+
+HANDLERS = {
+    'calculate_fee': Fee_Calculation_Service.lambda_handler,
+    'calculate_reward': Rewards_Calculation_Service.lambda_handler,
+}
+
+def containers(count, max_entries, ttl_seconds, shared):
+    """One (fee_cache, reward_cache) pair per emulated container"""
+    return [(ResultCache('fee', 1, max_entries, ttl_seconds, shared),
+             ResultCache('reward', 1, max_entries, ttl_seconds, shared)) for _ in range(count)]
+
+def run_variant(workload, database, caches, concurrency):
+    db.get_connection = database.connect
+    # Requests are spread round-robin over the containers; each request runs
+    # against its own container's caches
+    assignment = itertools.cycle(caches)
+
+    def invoke(body):
+        fee_cache, reward_cache = next(assignment)
+        Fee_Calculation_Service.fee_cache = fee_cache
+        Rewards_Calculation_Service.reward_cache = reward_cache
+        return HANDLERS[body['action']](body, None)
+
+    # Handlers read the module-level caches, so requests run one at a time
+    latencies, errors, elapsed = run_load(invoke, workload, concurrency)
+    fresh = sum(cache.metrics['fresh_hits'] for pair in caches for cache in pair)
+    validated = sum(cache.metrics['validated_hits'] for pair in caches for cache in pair)
+    return latencies, errors, elapsed, fresh, validated
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure repeated fee/reward calculations with the result cache')
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--accounts', type=int, default=2000)
+    parser.add_argument('--exponent', type=float, default=1.0, help='Zipf exponent for account popularity')
+    parser.add_argument('--containers', type=int, default=4)
+    parser.add_argument('--query-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    account_ids = skewed_account_ids(args.accounts, args.exponent)
+    workload = build_workload(account_ids, args.requests, mix={'calculate_fee': 0.5, 'calculate_reward': 0.5})
+    shared = LocalRedis()
+    variants = (
+        ('no cache', containers(args.containers, 0, 30, None)),
+        ('validate only (ttl 0)', containers(args.containers, 10000, 0, None)),
+        ('per-container LRU, ttl 30s', containers(args.containers, 10000, 30, None)),
+        ('LRU + shared store, ttl 30s', containers(args.containers, 10000, 30, shared)),
+    )
+
+    rows = []
+    print(f"{'variant':<30} {'req/s':>8} {'db queries':>11} {'fresh hits':>11} {'validated':>10} {'errors':>7}")
+    for label, caches in variants:
+        database = CountingDatabase(8, 1000, args.query_ms, 0.0)
+        latencies, errors, elapsed, fresh, validated = run_variant(workload, database, caches, 1)
+        print(f"{label:<30} {len(workload) / elapsed:>8.0f} {database.queries:>11} {fresh:>11} {validated:>10} {errors:>7}")
+        rows.append((label, summarize(latencies)))
+    print_summaries(rows)
+
+if __name__ == '__main__':
+    main()
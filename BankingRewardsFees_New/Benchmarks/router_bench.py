@@ -0,0 +1,81 @@
+# router_bench.py - Three per-service Lambdas vs one router deployment
+import argparse
+import heapq
+from collections import defaultdict
+from bench_utils import get_connection, sample_account_ids, summarize, print_summaries
+from load_generator import build_workload, run_load, service_for
+
+from AWS_Lambda_Microservices import db, router
+from AWS_Lambda_Microservices import Account_Service, Fee_Calculation_Service, Rewards_Calculation_Service
+
+PER_SERVICE_HANDLERS = {
+    'account': Account_Service.lambda_handler,
+    'fee': Fee_Calculation_Service.lambda_handler,
+    'reward': Rewards_Calculation_Service.lambda_handler,
+}
+
+def simulate_containers(workload, deployment_for, duration_ms, keep_warm_seconds):
+    """
+    Replay arrivals against a simple Lambda model: a request reuses an idle
+    container of its deployment if one went idle less than keep_warm_seconds
+    ago, otherwise it cold-starts a new one. Returns (cold_starts, containers
+    alive at the end).
+    """
+    idle = defaultdict(list)      # deployment -> times its idle containers went idle
+    busy = []                     # heap of (finishes_at, deployment)
+    cold_starts = 0
+    for arrival, body in workload:
+        while busy and busy[0][0] <= arrival:
+            finished_at, finished_deployment = heapq.heappop(busy)
+            idle[finished_deployment].append(finished_at)
+        deployment = deployment_for(body)
+        # Containers idle for too long have been reclaimed
+        warm = [went_idle for went_idle in idle[deployment] if arrival - went_idle <= keep_warm_seconds]
+        if warm:
+            warm.remove(max(warm))
+        else:
+            cold_starts += 1
+        idle[deployment] = warm
+        heapq.heappush(busy, (arrival + duration_ms / 1000, deployment))
+    return cold_starts, len(busy) + sum(len(containers) for containers in idle.values())
+
+def server_connections(conn):
+    cursor = conn.cursor()
+    cursor.execute("SHOW GLOBAL STATUS LIKE 'Connections'")
+    value = int(cursor.fetchone()[1])
+    cursor.close()
+    return value
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-service Lambdas with the single router deployment')
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--rate', type=float, default=5.0, help='arrivals per second for the cold-start model')
+    parser.add_argument('--keep-warm', type=float, default=300.0, help='seconds an idle container survives')
+    parser.add_argument('--duration-ms', type=float, default=30.0, help='modelled time per invocation')
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    account_ids = sample_account_ids(conn, 5000)
+    workload = build_workload(account_ids, args.requests, rate_per_second=args.rate)
+
+    print(f"{'deployment':<16} {'cold starts':>12} {'warm at end':>12}")
+    for label, deployment_for in (('per-service', service_for), ('router', lambda body: 'router')):
+        cold_starts, warm = simulate_containers(workload, deployment_for, args.duration_ms, args.keep_warm)
+        print(f"{label:<16} {cold_starts:>12} {warm:>12}")
+
+    # Real run: each thread stands in for one warm container, so size the pool to match
+    db.POOL_SIZE = args.concurrency
+    rows = []
+    for label, invoke in (('per-service handlers', lambda body: PER_SERVICE_HANDLERS[service_for(body)](body, None)),
+                          ('router + shared pool', lambda body: router.lambda_handler(body, None))):
+        before = server_connections(conn)
+        latencies, errors, elapsed = run_load(invoke, workload, args.concurrency)
+        opened = server_connections(conn) - before
+        rows.append((label, summarize(latencies)))
+        print(f"{label}: {opened} connections opened, {errors} errors, {len(workload) / elapsed:.0f} req/s")
+    print_summaries(rows)
+    conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# search_bench.py - Typeahead search vs loading the full account list
+import argparse
+import random
+from bench_utils import get_connection, time_calls, summarize, print_summaries
+
+from AWS_Lambda_Microservices.Account_Service import lambda_handler
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare search_accounts with get_accounts at the current book size')
+    parser.add_argument('--searches', type=int, default=2000)
+    parser.add_argument('--list-calls', type=int, default=20)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM Accounts")
+    book_size = cursor.fetchone()[0]
+    cursor.execute("SELECT name FROM Customers ORDER BY RAND() LIMIT 500")
+    names = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT account_id FROM Accounts ORDER BY RAND() LIMIT 500")
+    ids = [str(row[0]) for row in cursor.fetchall()]
+    cursor.close()
+    conn.close()
+
+    # What a user has typed so far: 1-4 leading characters of a real name, or an id
+    rng = random.Random(42)
+    name_queries = [(name[:rng.randint(1, 4)],) for name in rng.choices(names, k=args.searches)]
+    id_queries = [(account_id,) for account_id in rng.choices(ids, k=args.searches)]
+
+    def search(query):
+        lambda_handler({'action': 'search_accounts', 'query': query}, None)
+
+    def full_list():
+        lambda_handler({'action': 'get_accounts'}, None)
+
+    print(f"book size: {book_size} accounts")
+    print_summaries([
+        ('search_accounts (name prefix)', summarize(time_calls(search, name_queries))),
+        ('search_accounts (account id)', summarize(time_calls(search, id_queries))),
+        ('get_accounts (full list)', summarize(time_calls(full_list, [()] * args.list_calls))),
+    ])
+
+if __name__ == '__main__':
+    main()
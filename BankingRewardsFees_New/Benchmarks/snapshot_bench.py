@@ -0,0 +1,38 @@
+# snapshot_bench.py - Open and view latency of the memory-mapped app snapshot
+import argparse
+import os
+import tempfile
+import time
+
+from export_bench import SyntheticConnection
+from AWS_Lambda_Microservices.account_export import export_accounts
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Time snapshot-mode views of app.py over a synthetic snapshot')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    args = parser.parse_args()
+
+    # Imported late: app.py builds its Streamlit page (bare mode) on import
+    from app import open_snapshot, search_snapshot, snapshot_tier_summary
+
+    print(f"{'accounts':>9} {'file MB':>8} {'open ms':>8} {'tiers ms':>9} {'search ms':>10} {'id ms':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, 'accounts_snapshot.arrow')
+            export_accounts(SyntheticConnection(size), path, 'arrow')
+            table, open_ms = timed(open_snapshot, path)
+            _, tiers_ms = timed(snapshot_tier_summary, table)
+            _, search_ms = timed(search_snapshot, table, 'Customer 00012')
+            _, id_ms = timed(search_snapshot, table, str(size // 2))
+            print(f"{size:>9} {os.path.getsize(path) / 1_000_000:>8.1f} {open_ms:>8.2f} {tiers_ms:>9.2f} "
+                  f"{search_ms:>10.2f} {id_ms:>7.2f}")
+            del table
+            os.remove(path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# tier_map_bench.py - Fee inputs through the Customers JOIN vs the cached tier map
+import argparse
+import os
+import random
+import time
+import tracemalloc
+
+from bench_utils import get_connection, sample_account_ids, summarize, print_summaries, time_calls
+
+from AWS_Lambda_Microservices import Fee_Calculation_Service
+from AWS_Lambda_Microservices.tier_map import TierMap
+
+TIERS = ('basic', 'gold', 'premium')
+
+BATCH_JOIN_SQL = """
+    SELECT a.account_id, a.balance, c.tier
+    FROM Accounts a
+    JOIN Customers c ON a.customer_id = c.customer_id
+    WHERE a.account_id IN ({placeholders})
+"""
+
+BATCH_ACCOUNTS_SQL = """
+    SELECT account_id, balance, customer_id
+    FROM Accounts
+    WHERE account_id IN ({placeholders})
+"""
+
+class SyntheticCustomersCursor:
+    """Serves LOAD_TIERS_SQL rows in fetchmany batches without a database"""
+
+    def __init__(self, count, seed=42):
+        self.count = count
+        self.rng = random.Random(seed)
+        self.next_id = 1
+
+    def execute(self, sql, params=()):
+        self.next_id = 1
+
+    def fetchmany(self, size):
+        rows = [{'customer_id': customer_id, 'tier': self.rng.choice(TIERS), 'updated_at': None, 'read_at': None}
+                for customer_id in range(self.next_id, min(self.next_id + size, self.count + 1))]
+        self.next_id += len(rows)
+        return rows
+
+def synthetic(counts):
+    """Load time, memory and lookup rate of the map itself; no database needed"""
+    print(f"{'customers':>10} {'load s':>8} {'map MB':>8} {'dict MB':>8} {'lookups/s':>12}")
+    for count in counts:
+        tiers = TierMap(refresh_seconds=3600)
+        cursor = SyntheticCustomersCursor(count)
+        started = time.perf_counter()
+        tiers.ensure_current(cursor)
+        load_seconds = time.perf_counter() - started
+        map_bytes = tiers.codes.buffer_info()[1] * tiers.codes.itemsize
+
+        # Reference point: a plain {customer_id: tier} dict
+        tracemalloc.start()
+        plain = {customer_id: TIERS[customer_id % 3] for customer_id in range(1, count + 1)}
+        dict_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del plain
+
+        ids = [random.randint(1, count) for _ in range(200000)]
+        started = time.perf_counter()
+        for customer_id in ids:
+            tiers.tier(customer_id, cursor)
+        rate = len(ids) / (time.perf_counter() - started)
+        print(f"{count:>10} {load_seconds:>8.2f} {map_bytes / 1_000_000:>8.1f} {dict_bytes / 1_000_000:>8.1f} {rate:>12,.0f}")
+
+def batch_fees(conn, account_ids, tier_map):
+    placeholders = ', '.join(['%s'] * len(account_ids))
+    cursor = conn.cursor(dictionary=True)
+    if tier_map is None:
+        cursor.execute(BATCH_JOIN_SQL.format(placeholders=placeholders), account_ids)
+        fees = [Fee_Calculation_Service.calculate_fee(row['tier'], float(row['balance'])) for row in cursor.fetchall()]
+    else:
+        cursor.execute(BATCH_ACCOUNTS_SQL.format(placeholders=placeholders), account_ids)
+        rows = cursor.fetchall()
+        fees = [Fee_Calculation_Service.calculate_fee(tier_map.tier(row['customer_id'], cursor), float(row['balance']))
+                for row in rows]
+    cursor.close()
+    return fees
+
+def database(requests, batch_size):
+    conn = get_connection()
+    account_ids = sample_account_ids(conn, requests)
+    rows = []
+    for label, use_map in (('JOIN Customers', False), ('tier map', True)):
+        os.environ['USE_TIER_MAP'] = 'true' if use_map else 'false'
+        Fee_Calculation_Service.tier_map = TierMap(refresh_seconds=3600)
+        # First call pays the bulk load; measured separately
+        started = time.perf_counter()
+        Fee_Calculation_Service.lambda_handler({'account_id': account_ids[0]}, None)
+        print(f"{label}: first call {(time.perf_counter() - started) * 1000:.1f} ms")
+        rows.append((f"single, {label}", summarize(time_calls(
+            lambda account_id: Fee_Calculation_Service.lambda_handler({'account_id': account_id}, None),
+            [(account_id,) for account_id in account_ids]))))
+        batches = [(account_ids[i:i + batch_size],) for i in range(0, len(account_ids), batch_size)]
+        tier_map = Fee_Calculation_Service.tier_map if use_map else None
+        rows.append((f"batch of {batch_size}, {label}", summarize(time_calls(
+            lambda ids: batch_fees(conn, ids, tier_map), batches))))
+    conn.close()
+    print_summaries(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare fee inputs read through the Customers JOIN and through the tier map')
+    parser.add_argument('--customers', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--database', action='store_true',
+                        help='also time single and batch fee calculation against the local database')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    synthetic(args.customers)
+    if args.database:
+        database(args.requests, args.batch_size)
+
+if __name__ == '__main__':
+    main()
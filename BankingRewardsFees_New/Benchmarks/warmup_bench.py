@@ -0,0 +1,66 @@
+# warmup_bench.py - First real request in a cold container, with and without a warmup invocation
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from bench_utils import get_connection, sample_account_ids, summarize, print_summaries
+
+# Each trial runs in a fresh interpreter, which is what a new Lambda container
+# is: nothing imported, no pool, no connection. The child prints one JSON line.
+CONTAINER_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+from AWS_Lambda_Microservices import router
+import_ms = (time.perf_counter() - started) * 1000
+warmup = router.lambda_handler({{'action': 'warmup'}}, None) if {warm} else None
+timings = []
+for body in {requests!r}:
+    started = time.perf_counter()
+    router.lambda_handler(body, None)
+    timings.append((time.perf_counter() - started) * 1000)
+print(json.dumps({{'import_ms': import_ms, 'warmup': warmup, 'timings': timings}}))
+"""
+
+def requests_for(account_id):
+    # The first request after start-up is the one a keep-warm ping is meant to speed up
+    return [
+        {'action': 'get_account_details', 'account_id': account_id},
+        {'action': 'calculate_fee', 'account_id': account_id},
+        {'action': 'calculate_reward', 'account_id': account_id},
+    ]
+
+def run_container(warm, requests):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = CONTAINER_SCRIPT.format(root=root, warm=warm, requests=requests)
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True, env=os.environ)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure first-request latency after a warmup versus a cold container')
+    parser.add_argument('--containers', type=int, default=30, help='fresh interpreters per variant')
+    args = parser.parse_args()
+
+    conn = get_connection()
+    account_ids = sample_account_ids(conn, args.containers)
+    conn.close()
+
+    rows = []
+    for label, warm in (('cold container', False), ('after warmup', True)):
+        first, second, warmups = [], [], []
+        for account_id in account_ids:
+            result = run_container(warm, requests_for(account_id))
+            first.append(result['timings'][0])
+            second.append(sum(result['timings'][1:]) / len(result['timings'][1:]))
+            if result['warmup']:
+                warmups.append(result['warmup']['total_ms'])
+        rows.append((f"{label}: first request", summarize(first)))
+        rows.append((f"{label}: next requests", summarize(second)))
+        if warmups:
+            rows.append(('warmup invocation itself', summarize(warmups)))
+    print_summaries(rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+-- File: add_query_indexes.sql
+-- Brings an existing BankingRewardsFees_New schema up to the indexes declared
+-- in Tables/Accounts.sql and Tables/Customers.sql.
+ALTER TABLE Accounts
+    ADD KEY idx_accounts_customer_balance (customer_id, balance);
+
+ALTER TABLE Customers
+    ADD KEY idx_customers_tier (tier),
+    ADD KEY idx_customers_name (name);
\ No newline at end of file
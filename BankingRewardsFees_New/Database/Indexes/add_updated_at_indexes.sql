@@ -0,0 +1,8 @@
+-- File: add_updated_at_indexes.sql
+-- Indexes used by incremental recalculation to find rows changed since the
+-- last high-water mark.
+ALTER TABLE Accounts
+    ADD KEY idx_accounts_updated_at (updated_at);
+
+ALTER TABLE Customers
+    ADD KEY idx_customers_updated_at (updated_at);
\ No newline at end of file
@@ -0,0 +1,12 @@
+-- File: account_charges_table.sql
+-- Read model: fee/reward snapshot per account, maintained by Account_Service
+-- in the same transaction as balance and tier changes.
+CREATE TABLE AccountCharges (
+    account_id INT PRIMARY KEY,
+    monthly_fee DECIMAL(10,2) NOT NULL,
+    monthly_reward DECIMAL(10,2) NOT NULL,
+    balance DECIMAL(10,2),
+    customer_tier VARCHAR(50),
+    calculated_at DATETIME NOT NULL,
+    FOREIGN KEY (account_id) REFERENCES Accounts(account_id)
+);
\ No newline at end of file
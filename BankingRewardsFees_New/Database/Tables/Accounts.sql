@@ -5,5 +5,8 @@ CREATE TABLE Accounts (
     balance DECIMAL(10,2),
     created_at DATETIME,
     updated_at DATETIME,
+    -- Supports the customer_id JOIN/FK and covers per-customer balance reads
+    KEY idx_accounts_customer_balance (customer_id, balance),
+    KEY idx_accounts_updated_at (updated_at),
     FOREIGN KEY (customer_id) REFERENCES Customers(customer_id)
 );
\ No newline at end of file
@@ -4,5 +4,8 @@ CREATE TABLE Customers (
     name VARCHAR(255),
     tier VARCHAR(50),
     created_at DATETIME,
-    updated_at DATETIME
+    updated_at DATETIME,
+    KEY idx_customers_tier (tier),
+    KEY idx_customers_name (name),
+    KEY idx_customers_updated_at (updated_at)
 );
\ No newline at end of file
@@ -0,0 +1,7 @@
+-- File: recalc_watermarks_table.sql
+-- High-water marks for incremental recalculation jobs (updated_at based).
+CREATE TABLE RecalcWatermarks (
+    job_name VARCHAR(64) PRIMARY KEY,
+    high_water_mark DATETIME NOT NULL,
+    updated_at DATETIME
+);
\ No newline at end of file
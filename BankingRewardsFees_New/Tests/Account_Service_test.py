@@ -0,0 +1,729 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+import mysql.connector
+from datetime import datetime
+from decimal import Decimal
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import the lambda_handler directly from the correct path
+from AWS_Lambda_Microservices.Account_Service import lambda_handler
+
+class TestAccountService(unittest.TestCase):
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_accounts(self, mock_connect):
+        # Mock cursor and connection
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        # Mock fetchall result
+        mock_cursor.fetchall.return_value = [
+            {'account_id': 1, 'customer_name': 'John Doe', 'customer_id': 100},
+            {'account_id': 2, 'customer_name': 'Jane Doe', 'customer_id': 101}
+        ]
+
+        # Test with direct event structure (no body wrapper)
+        event = {'action': 'get_accounts'}
+        result = lambda_handler(event, None)
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]['customer_name'], 'John Doe')
+        mock_cursor.execute.assert_called()
+        mock_cursor.close.assert_called()
+        mock_conn.close.assert_called()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_accounts_with_body(self, mock_connect):
+        # Mock cursor and connection
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        # Mock fetchall result
+        mock_cursor.fetchall.return_value = [
+            {'account_id': 1, 'customer_name': 'John Doe', 'customer_id': 100}
+        ]
+
+        # Test with body wrapper (API Gateway style)
+        event = {
+            'body': json.dumps({'action': 'get_accounts'})
+        }
+        result = lambda_handler(event, None)
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]['customer_name'], 'John Doe')
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_accounts_columns_format(self, mock_connect):
+        """Test that the columnar format reads tuples and returns one list per column"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.column_names = ('account_id', 'customer_name', 'customer_id')
+        mock_cursor.fetchall.return_value = [(1, 'John Doe', 100), (2, 'Jane Doe', 101)]
+
+        result = lambda_handler({'action': 'get_accounts', 'format': 'columns'}, None)
+
+        self.assertEqual(result, {'row_count': 2, 'columns': {
+            'account_id': [1, 2], 'customer_name': ['John Doe', 'Jane Doe'], 'customer_id': [100, 101]
+        }})
+        mock_conn.cursor.assert_called_once_with(dictionary=False)
+        mock_conn.close.assert_called_once()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_accounts_columns_format_empty(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.column_names = ('account_id', 'customer_name', 'customer_id')
+        mock_cursor.fetchall.return_value = []
+
+        result = lambda_handler({'action': 'get_accounts', 'format': 'columns'}, None)
+
+        self.assertEqual(result, {'row_count': 0, 'columns': {'account_id': [], 'customer_name': [], 'customer_id': []}})
+
+    def test_get_accounts_invalid_format(self):
+        result = lambda_handler({'action': 'get_accounts', 'format': 'arrow'}, None)
+
+        self.assertEqual(result, {'error': 'format must be one of: rows, columns'})
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_account_details_success(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        # Mock fetchone result with datetime and decimal values
+        mock_cursor.fetchone.return_value = {
+            'account_id': 1,
+            'customer_id': 100,
+            'balance': Decimal('500.50'),
+            'created_at': datetime(2023, 1, 1, 12, 0, 0),
+            'updated_at': datetime(2023, 1, 2, 12, 0, 0),
+            'customer_name': 'John Doe',
+            'customer_tier': 'Gold'
+        }
+
+        event = {'action': 'get_account_details', 'account_id': 1}
+        result = lambda_handler(event, None)
+
+        self.assertIn('account_id', result)
+        self.assertEqual(result['customer_name'], 'John Doe')
+        self.assertEqual(result['balance'], 500.5)  # Should be converted to float
+        self.assertEqual(result['created_at'], '2023-01-01 12:00:00')  # Should be converted to string
+        mock_cursor.execute.assert_called()
+        mock_cursor.close.assert_called()
+        mock_conn.close.assert_called()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_account_overview(self, mock_connect):
+        """Test that overview combines account details with customer totals"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_cursor.fetchone.side_effect = [
+            {'account_id': 1, 'customer_id': 100, 'balance': Decimal('500.50'), 'customer_tier': 'gold'},
+            {'account_count': 2, 'total_balance': Decimal('1500.50')}
+        ]
+
+        result = lambda_handler({'action': 'get_account_overview', 'account_id': 1}, None)
+
+        self.assertEqual(result['account']['balance'], 500.5)
+        self.assertEqual(result['customer_totals'], {'account_count': 2, 'total_balance': 1500.5})
+        self.assertEqual(mock_cursor.execute.call_count, 2)
+        mock_conn.close.assert_called()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_search_accounts_by_name_prefix(self, mock_connect):
+        """Test that name search is an escaped prefix match with a limit"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [{'account_id': 7, 'customer_name': 'Jo_hn Doe', 'customer_id': 100}]
+
+        result = lambda_handler({'action': 'search_accounts', 'query': ' Jo_h ', 'limit': 5}, None)
+
+        self.assertEqual(result, [{'account_id': 7, 'customer_name': 'Jo_hn Doe', 'customer_id': 100}])
+        mock_cursor.execute.assert_called_once()
+        sql, params = mock_cursor.execute.call_args[0]
+        self.assertIn('c.name LIKE %s', sql)
+        self.assertEqual(params, ('Jo\\_h%', 5))
+        mock_conn.close.assert_called_once()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_search_accounts_exact_id_first(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.side_effect = [
+            [{'account_id': 42, 'customer_name': 'Jane Doe', 'customer_id': 101}],
+            [{'account_id': 42, 'customer_name': 'Jane Doe', 'customer_id': 101},
+             {'account_id': 43, 'customer_name': '42nd Street LLC', 'customer_id': 102}]
+        ]
+
+        result = lambda_handler({'action': 'search_accounts', 'query': '42'}, None)
+
+        self.assertEqual([r['account_id'] for r in result], [42, 43])
+        self.assertEqual(mock_cursor.execute.call_args_list[0][0][1], (42,))
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_search_accounts_unicode_digits_are_a_name_search(self, mock_connect):
+        """Test that '²' (isdigit() but not int()-able) is searched as a name"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = []
+
+        result = lambda_handler({'action': 'search_accounts', 'query': '²'}, None)
+
+        self.assertEqual(result, [])
+        mock_cursor.execute.assert_called_once()
+        self.assertEqual(mock_cursor.execute.call_args[0][1], ('²%', 20))
+
+    def test_search_accounts_validation(self):
+        self.assertEqual(lambda_handler({'action': 'search_accounts', 'query': '  '}, None),
+                         {'error': 'query is required'})
+        self.assertEqual(lambda_handler({'action': 'search_accounts', 'query': 'a', 'limit': 'x'}, None),
+                         {'error': 'limit must be an integer'})
+        self.assertIn('between 1 and', lambda_handler({'action': 'search_accounts', 'query': 'a', 'limit': 1000}, None)['error'])
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_customer_portfolio_single(self, mock_connect):
+        """Test that a customer's totals come from one aggregate query"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [{
+            'customer_id': 100, 'customer_name': 'John Doe', 'customer_tier': 'gold',
+            'account_count': 3, 'total_balance': Decimal('21000.00'),
+            'total_fees': Decimal('25.00'), 'total_rewards': Decimal('310.00')
+        }]
+
+        result = lambda_handler({'action': 'get_customer_portfolio', 'customer_id': 100}, None)
+
+        self.assertEqual(result['account_count'], 3)
+        self.assertEqual(result['total_balance'], 21000.0)
+        self.assertEqual(result['total_fees'], 25.0)
+        self.assertEqual(result['total_rewards'], 310.0)
+        mock_cursor.execute.assert_called_once()
+        sql, params = mock_cursor.execute.call_args[0]
+        self.assertIn('GROUP BY c.customer_id', sql)
+        # LEFT JOIN rows of customers without accounts must not be charged a fee
+        self.assertIn('WHEN a.account_id IS NULL THEN 0.00', sql)
+        self.assertEqual(params, (100,))
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_customer_portfolio_many(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [
+            {'customer_id': 100, 'account_count': 1, 'total_balance': Decimal('10.00')},
+            {'customer_id': 101, 'account_count': 0, 'total_balance': Decimal('0')}
+        ]
+
+        result = lambda_handler({'action': 'get_customer_portfolio', 'customer_ids': [100, 101, 100, 999]}, None)
+
+        self.assertEqual([p['customer_id'] for p in result['portfolios']], [100, 101])
+        self.assertEqual(result['not_found'], [999])
+        self.assertEqual(mock_cursor.execute.call_args[0][1], (100, 101, 999))
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_customer_portfolio_many_columns_format(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.column_names = ('customer_id', 'account_count', 'total_balance')
+        mock_cursor.fetchall.return_value = [(100, 1, Decimal('10.00')), (101, 0, Decimal('0'))]
+
+        result = lambda_handler({'action': 'get_customer_portfolio', 'customer_ids': [100, 101, 999], 'format': 'columns'}, None)
+
+        self.assertEqual(result, {
+            'portfolios': {'row_count': 2, 'columns': {
+                'customer_id': [100, 101], 'account_count': [1, 0], 'total_balance': [10.0, 0.0]
+            }},
+            'not_found': [999]
+        })
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_customer_portfolio_not_found(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = []
+
+        result = lambda_handler({'action': 'get_customer_portfolio', 'customer_id': 999}, None)
+
+        self.assertEqual(result, {'error': 'Customer not found'})
+
+    def test_get_customer_portfolio_validation(self):
+        self.assertIn('required', lambda_handler({'action': 'get_customer_portfolio'}, None)['error'])
+        self.assertIn('required', lambda_handler({'action': 'get_customer_portfolio', 'customer_ids': []}, None)['error'])
+        with patch('AWS_Lambda_Microservices.Account_Service.MAX_PORTFOLIO_CUSTOMERS', 1):
+            result = lambda_handler({'action': 'get_customer_portfolio', 'customer_ids': [1, 2]}, None)
+        self.assertIn('At most 1 customers', result['error'])
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_balance_distribution(self, mock_connect):
+        """Test that grouped rows become per-tier arrays indexed by bucket"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [
+            {'customer_tier': 'gold', 'bucket': 1, 'account_count': 2, 'total_balance': Decimal('1500.00'),
+             'total_fees': Decimal('30.00'), 'total_rewards': Decimal('15.00')},
+            {'customer_tier': 'gold', 'bucket': 3, 'account_count': 1, 'total_balance': Decimal('20000.00'),
+             'total_fees': Decimal('5.00'), 'total_rewards': Decimal('400.00')},
+            {'customer_tier': 'premium', 'bucket': 2, 'account_count': 1, 'total_balance': Decimal('7000.00'),
+             'total_fees': Decimal('0.00'), 'total_rewards': Decimal('70.00')}
+        ]
+
+        result = lambda_handler({'action': 'get_balance_distribution', 'bucket_edges': [0, 5000, 10000]}, None)
+
+        self.assertEqual(result['bucket_edges'], [0, 5000, 10000])
+        self.assertEqual(result['tiers']['gold']['account_count'], [0, 2, 0, 1])
+        self.assertEqual(result['tiers']['gold']['total_rewards'], [0, 15.0, 0, 400.0])
+        self.assertEqual(result['tiers']['gold']['totals']['total_fees'], 35.0)
+        self.assertEqual(result['tiers']['premium']['total_balance'], [0, 0, 7000.0, 0])
+        self.assertEqual(result['totals'], {'account_count': 4, 'total_balance': 28500.0,
+                                            'total_fees': 35.0, 'total_rewards': 485.0})
+        sql, params = mock_cursor.execute.call_args[0]
+        self.assertIn('INTERVAL(a.balance, %s, %s, %s)', sql)
+        self.assertEqual(params, (0, 5000, 10000))
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_balance_distribution_null_balance(self, mock_connect):
+        """Test that accounts without a balance are excluded and never land in the top bucket"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [
+            {'customer_tier': 'gold', 'bucket': 3, 'account_count': 1, 'total_balance': Decimal('20000.00'),
+             'total_fees': Decimal('5.00'), 'total_rewards': Decimal('400.00')},
+            # What INTERVAL(NULL, ...) groups to: bucket -1 with NULL sums
+            {'customer_tier': 'gold', 'bucket': -1, 'account_count': 2, 'total_balance': None,
+             'total_fees': Decimal('30.00'), 'total_rewards': None},
+            {'customer_tier': 'basic', 'bucket': 0, 'account_count': 1, 'total_balance': Decimal('-5.00'),
+             'total_fees': Decimal('15.00'), 'total_rewards': None}
+        ]
+
+        result = lambda_handler({'action': 'get_balance_distribution', 'bucket_edges': [0, 5000, 10000]}, None)
+
+        self.assertEqual(result['tiers']['gold']['account_count'], [0, 0, 0, 1])
+        self.assertEqual(result['tiers']['gold']['total_balance'], [0, 0, 0, 20000.0])
+        self.assertEqual(result['tiers']['basic']['total_rewards'], [0, 0, 0, 0])
+        self.assertEqual(result['totals'], {'account_count': 2, 'total_balance': 19995.0,
+                                            'total_fees': 20.0, 'total_rewards': 400.0})
+        sql = mock_cursor.execute.call_args[0][0]
+        self.assertIn('WHERE a.balance IS NOT NULL', sql)
+        self.assertIn('COALESCE(SUM(a.balance), 0)', sql)
+
+    def test_get_balance_distribution_validation(self):
+        for edges in ([], [100, 50], [1, 1], 'abc', [1, 'x'], [True]):
+            with self.subTest(edges=edges):
+                result = lambda_handler({'action': 'get_balance_distribution', 'bucket_edges': edges}, None)
+                self.assertIn('strictly increasing', result['error'])
+
+    def test_get_account_details_missing_id(self):
+        event = {'action': 'get_account_details'}
+        result = lambda_handler(event, None)
+
+        self.assertIn('error', result)
+        self.assertEqual(result['error'], 'account_id is required')
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_account_details_not_found(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_cursor.fetchone.return_value = None
+
+        event = {'action': 'get_account_details', 'account_id': 999}
+        result = lambda_handler(event, None)
+
+        self.assertIn('error', result)
+        self.assertEqual(result['error'], 'Account not found')
+        mock_cursor.close.assert_called()
+        mock_conn.close.assert_called()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_update_balance_success(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_cursor.rowcount = 1
+
+        event = {'action': 'update_balance', 'account_id': 1, 'new_balance': 1000.0}
+        result = lambda_handler(event, None)
+
+        self.assertIn('message', result)
+        self.assertEqual(result['message'], 'Balance updated successfully')
+        mock_cursor.execute.assert_called()
+        mock_cursor.close.assert_called()
+        mock_conn.close.assert_called()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_update_balance_refreshes_charges_in_transaction(self, mock_connect):
+        """Test that the AccountCharges snapshot is rewritten before the balance commit"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_cursor.rowcount = 1
+        mock_cursor.fetchall.return_value = [(1, Decimal('6000.00'), 'gold')]
+
+        event = {'action': 'update_balance', 'account_id': 1, 'new_balance': 6000.0}
+        result = lambda_handler(event, None)
+
+        self.assertEqual(result['message'], 'Balance updated successfully')
+        mock_conn.start_transaction.assert_called_once()
+        mock_cursor.executemany.assert_called_once()
+        upsert_sql, upsert_rows = mock_cursor.executemany.call_args[0]
+        self.assertIn('INSERT INTO AccountCharges', upsert_sql)
+        self.assertEqual(upsert_rows, [(1, 5.00, 60.00, 6000.0, 'gold')])
+        mock_conn.commit.assert_called_once()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_update_balance_not_found_rolls_back(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_cursor.rowcount = 0
+
+        event = {'action': 'update_balance', 'account_id': 999, 'new_balance': 10.0}
+        lambda_handler(event, None)
+
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+        mock_cursor.executemany.assert_not_called()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_update_balances_reports_per_row_outcomes(self, mock_connect):
+        """Test that bulk updates report updated/not_found in input order"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        # FOR UPDATE lookup finds accounts 1 and 3, then the charge refresh inputs
+        mock_cursor.fetchall.side_effect = [
+            [(1,), (3,)],
+            [(1, Decimal('100.00'), 'gold'), (3, Decimal('300.00'), 'gold')]
+        ]
+
+        event = {'action': 'update_balances', 'updates': [
+            {'account_id': 1, 'new_balance': 100.0},
+            {'account_id': 2, 'new_balance': 200.0},
+            {'account_id': 3, 'new_balance': 300.0}
+        ]}
+        result = lambda_handler(event, None)
+
+        self.assertEqual(result['updated'], 2)
+        self.assertEqual(result['not_found'], 1)
+        self.assertEqual(result['results'], [
+            {'account_id': 1, 'status': 'updated'},
+            {'account_id': 2, 'status': 'not_found'},
+            {'account_id': 3, 'status': 'updated'}
+        ])
+        update_sql, update_params = mock_cursor.execute.call_args_list[1][0]
+        self.assertIn('UPDATE Accounts a', update_sql)
+        self.assertIn('UNION ALL', update_sql)
+        self.assertEqual(update_params, (1, 100.0, 3, 300.0))
+        mock_conn.commit.assert_called_once()
+        mock_conn.close.assert_called_once()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_update_balances_accepts_string_ids(self, mock_connect):
+        """Test that "5" is matched against the int 5 MySQL returns, and an unmatched chunk runs no UPDATE"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.side_effect = [
+            [(5,)],
+            [(5, Decimal('50.00'), 'gold')]
+        ]
+
+        event = {'action': 'update_balances', 'updates': [
+            {'account_id': '5', 'new_balance': 50.0},
+            {'account_id': '6', 'new_balance': 60.0}
+        ]}
+        result = lambda_handler(event, None)
+
+        self.assertEqual(result['results'], [
+            {'account_id': 5, 'status': 'updated'},
+            {'account_id': 6, 'status': 'not_found'}
+        ])
+        lock_sql, lock_params = mock_cursor.execute.call_args_list[0][0]
+        self.assertEqual(lock_params, (5, 6))
+        self.assertEqual(mock_cursor.execute.call_args_list[1][0][1], (5, 50.0))
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_update_balances_chunk_without_matches_skips_update(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        # A found id that is not among the requested ones must not produce an empty JOIN
+        mock_cursor.fetchall.return_value = [(99,)]
+
+        result = lambda_handler({'action': 'update_balances', 'updates': [{'account_id': 7, 'new_balance': 1.0}]}, None)
+
+        self.assertEqual(result['not_found'], 1)
+        self.assertEqual(mock_cursor.execute.call_count, 1)
+        mock_conn.commit.assert_called_once()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.BULK_UPDATE_CHUNK_SIZE', 2)
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_update_balances_commits_per_chunk(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        # Nothing found: no UPDATE, but each chunk is still its own transaction
+        mock_cursor.fetchall.return_value = []
+
+        updates = [{'account_id': i, 'new_balance': 1.0} for i in range(1, 6)]
+        from AWS_Lambda_Microservices.Account_Service import bulk_update_balances
+        statuses = bulk_update_balances(mock_conn, [(u['account_id'], u['new_balance']) for u in updates], chunk_size=2)
+
+        self.assertEqual(statuses, ['not_found'] * 5)
+        self.assertEqual(mock_conn.start_transaction.call_count, 3)
+        self.assertEqual(mock_conn.commit.call_count, 3)
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_update_balances_rolls_back_failed_chunk(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.execute.side_effect = mysql.connector.Error("Deadlock found")
+
+        event = {'action': 'update_balances', 'updates': [{'account_id': 1, 'new_balance': 1.0}]}
+        result = lambda_handler(event, None)
+
+        self.assertEqual(result['error'], 'Database error: Deadlock found')
+        mock_conn.rollback.assert_called_once()
+
+    def test_update_balances_validation(self):
+        result = lambda_handler({'action': 'update_balances', 'updates': []}, None)
+        self.assertIn('non-empty list', result['error'])
+
+        result = lambda_handler({'action': 'update_balances', 'updates': [{'account_id': 1}]}, None)
+        self.assertEqual(result['error'], 'Each update requires account_id and new_balance')
+
+        for account_id in ('abc', '²', 1.5, True, -3):
+            with self.subTest(account_id=account_id):
+                result = lambda_handler({'action': 'update_balances',
+                                         'updates': [{'account_id': account_id, 'new_balance': 1.0}]}, None)
+                self.assertEqual(result['error'], 'Each account_id must be a positive integer')
+
+        with patch('AWS_Lambda_Microservices.Account_Service.MAX_BULK_UPDATES', 1):
+            result = lambda_handler({'action': 'update_balances', 'updates': [
+                {'account_id': 1, 'new_balance': 1.0}, {'account_id': 2, 'new_balance': 2.0}
+            ]}, None)
+        self.assertIn('At most 1 updates', result['error'])
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_update_customer_tier_refreshes_all_accounts(self, mock_connect):
+        """Test that a tier change recomputes the snapshot of every account of the customer"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_cursor.rowcount = 1
+        mock_cursor.fetchall.return_value = [
+            (1, Decimal('1000.00'), 'premium'),
+            (2, Decimal('20000.00'), 'premium')
+        ]
+
+        event = {'action': 'update_customer_tier', 'customer_id': 100, 'tier': 'premium'}
+        result = lambda_handler(event, None)
+
+        self.assertEqual(result, {'message': 'Tier updated successfully', 'accounts_refreshed': 2})
+        self.assertEqual(mock_cursor.execute.call_args_list[0][0][1], ('premium', 100))
+        self.assertEqual(mock_cursor.executemany.call_args[0][1], [
+            (1, 0.00, 10.00, 1000.0, 'premium'),
+            (2, 0.00, 400.00, 20000.0, 'premium')
+        ])
+        mock_conn.start_transaction.assert_called_once()
+        mock_conn.commit.assert_called_once()
+        mock_conn.close.assert_called()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_update_customer_tier_not_found(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_cursor.rowcount = 0
+
+        event = {'action': 'update_customer_tier', 'customer_id': 999, 'tier': 'gold'}
+        result = lambda_handler(event, None)
+
+        self.assertEqual(result['error'], 'Customer not found')
+        mock_conn.rollback.assert_called_once()
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_writes_roll_back_and_close_when_refresh_fails(self, mock_connect):
+        """Test that a failed snapshot refresh never leaves the transaction open on the connection"""
+        for event in ({'action': 'update_balance', 'account_id': 1, 'new_balance': 10.0},
+                      {'action': 'update_customer_tier', 'customer_id': 100, 'tier': 'gold'}):
+            with self.subTest(action=event['action']):
+                mock_conn = MagicMock()
+                mock_cursor = MagicMock()
+                mock_connect.return_value = mock_conn
+                mock_conn.cursor.return_value = mock_cursor
+                mock_cursor.rowcount = 1
+                mock_cursor.executemany.side_effect = mysql.connector.Error("Lock wait timeout exceeded")
+                mock_cursor.fetchall.return_value = [(1, Decimal('100.00'), 'gold')]
+
+                result = lambda_handler(event, None)
+
+                self.assertEqual(result['error'], 'Database error: Lock wait timeout exceeded')
+                mock_conn.commit.assert_not_called()
+                mock_conn.rollback.assert_called_once()
+                mock_cursor.close.assert_called_once()
+                mock_conn.close.assert_called_once()
+
+    def test_update_customer_tier_missing_fields(self):
+        result = lambda_handler({'action': 'update_customer_tier', 'customer_id': 1}, None)
+        self.assertEqual(result['error'], 'customer_id and tier are required')
+
+    def test_update_balance_missing_fields(self):
+        # Test missing account_id
+        event = {'action': 'update_balance', 'new_balance': 1000.0}
+        result = lambda_handler(event, None)
+        self.assertIn('error', result)
+        self.assertEqual(result['error'], 'account_id and new_balance are required')
+
+        # Test missing new_balance
+        event = {'action': 'update_balance', 'account_id': 1}
+        result = lambda_handler(event, None)
+        self.assertIn('error', result)
+        self.assertEqual(result['error'], 'account_id and new_balance are required')
+
+        # Test new_balance is None (explicitly)
+        event = {'action': 'update_balance', 'account_id': 1, 'new_balance': None}
+        result = lambda_handler(event, None)
+        self.assertIn('error', result)
+        self.assertEqual(result['error'], 'account_id and new_balance are required')
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_update_balance_account_not_found(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_cursor.rowcount = 0
+
+        event = {'action': 'update_balance', 'account_id': 999, 'new_balance': 1000.0}
+        result = lambda_handler(event, None)
+
+        self.assertIn('error', result)
+        self.assertEqual(result['error'], 'Account not found')
+        mock_cursor.close.assert_called()
+        mock_conn.close.assert_called()
+
+    def test_invalid_action(self):
+        event = {'action': 'non_existing_action'}
+        result = lambda_handler(event, None)
+
+        self.assertIn('error', result)
+        self.assertTrue('Invalid action' in result['error'])
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_database_error(self, mock_connect):
+        # Setup mock to raise a database error
+        mock_connect.side_effect = mysql.connector.Error("Test database error")
+
+        event = {'action': 'get_accounts'}
+        result = lambda_handler(event, None)
+
+        self.assertIn('error', result)
+        self.assertEqual(result['error'], 'Database error: Test database error')
+
+    def test_json_decode_error(self):
+        # Test with invalid JSON in body
+        event = {'body': '{invalid json}'}
+        result = lambda_handler(event, None)
+
+        self.assertIn('error', result)
+        self.assertTrue('JSON decode error' in result['error'])
+
+    def test_update_balance_with_zero(self):
+        # Test that zero balance is allowed (not treated as None/missing)
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        
+        with patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect', return_value=mock_conn):
+            mock_conn.cursor.return_value = mock_cursor
+            mock_cursor.rowcount = 1
+
+            event = {'action': 'update_balance', 'account_id': 1, 'new_balance': 0.0}
+            result = lambda_handler(event, None)
+
+            self.assertIn('message', result)
+            self.assertEqual(result['message'], 'Balance updated successfully')
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_datetime_decimal_serialization(self, mock_connect):
+        """Test that datetime and decimal objects are properly serialized"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        # Mock data with various types that need serialization
+        mock_cursor.fetchall.return_value = [
+            {
+                'account_id': 1, 
+                'customer_name': 'John Doe', 
+                'customer_id': 100,
+                'balance': Decimal('1500.75'),
+                'created_at': datetime(2023, 5, 15, 14, 30, 45)
+            }
+        ]
+
+        event = {'action': 'get_accounts'}
+        result = lambda_handler(event, None)
+
+        # Verify serialization worked correctly
+        self.assertEqual(result[0]['balance'], 1500.75)
+        self.assertEqual(result[0]['created_at'], '2023-05-15 14:30:45')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,7 +10,7 @@ from decimal import Decimal
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the lambda_handler directly from the correct path
-from AWS_Lambda_Microservices.Fee_Calculation_Service import lambda_handler
+from AWS_Lambda_Microservices.Fee_Calculation_Service import lambda_handler, calculate_fee
 
 class TestFeeCalculationService(unittest.TestCase):
 
@@ -410,5 +410,50 @@ class TestFeeCalculationService(unittest.TestCase):
         mock_cursor.close.assert_called_once()
         mock_conn.close.assert_called_once()
 
+    @patch.dict(os.environ, {'USE_ACCOUNT_CHARGES': 'true'})
+    @patch('AWS_Lambda_Microservices.Fee_Calculation_Service.mysql.connector.connect')
+    def test_snapshot_read_single_lookup(self, mock_connect):
+        """Test that the AccountCharges snapshot answers with one primary-key lookup"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_cursor.fetchone.return_value = {
+            'monthly_fee': Decimal('5.00'),
+            'customer_tier': 'gold',
+            'balance': Decimal('6000.00')
+        }
+
+        result = lambda_handler({'account_id': 2}, None)
+
+        self.assertEqual(result, {'account_id': 2, 'calculated_fee': 5.00, 'customer_tier': 'gold', 'balance': 6000.00})
+        mock_cursor.execute.assert_called_once()
+        self.assertIn('FROM AccountCharges', mock_cursor.execute.call_args[0][0])
+        mock_conn.close.assert_called_once()
+
+    @patch.dict(os.environ, {'USE_ACCOUNT_CHARGES': 'true'})
+    @patch('AWS_Lambda_Microservices.Fee_Calculation_Service.mysql.connector.connect')
+    def test_snapshot_miss_falls_back_to_calculation(self, mock_connect):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_cursor.fetchone.side_effect = [None, {'balance': Decimal('1000.00'), 'customer_tier': 'silver'}]
+
+        result = lambda_handler({'account_id': 3}, None)
+
+        self.assertEqual(result['calculated_fee'], 15.00)
+        self.assertEqual(mock_cursor.execute.call_count, 2)
+        mock_conn.close.assert_called_once()
+
+    def test_calculate_fee_rules(self):
+        """Test the fee rule directly at the tier and balance boundaries"""
+        self.assertEqual(calculate_fee('premium', 100.00), 0.00)
+        self.assertEqual(calculate_fee('gold', 5000.00), 15.00)
+        self.assertEqual(calculate_fee('gold', 5000.01), 5.00)
+        self.assertEqual(calculate_fee(None, 6000.00), 5.00)
+
 if __name__ == '__main__':
     unittest.main()
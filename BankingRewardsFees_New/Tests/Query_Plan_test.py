@@ -0,0 +1,177 @@
+import unittest
+import os
+import sys
+import json
+import random
+import mysql.connector
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices import Account_Service, Fee_Calculation_Service, Rewards_Calculation_Service, account_charges, account_export, tier_map
+
+TABLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Database', 'Tables')
+
+# The live suite needs a disposable local MySQL, e.g.
+#   MYSQL_TEST_HOST=127.0.0.1 MYSQL_TEST_USER=root python -m pytest Tests/Query_Plan_test.py
+MYSQL_TEST_HOST = os.environ.get('MYSQL_TEST_HOST')
+MYSQL_TEST_DB = os.environ.get('MYSQL_TEST_DB', 'BankingRewardsFees_PlanTest')
+SEED_CUSTOMERS = 20000
+SEED_ACCOUNTS = 60000
+
+# (name, sql, params, allow_full_scan). get_accounts, the balance
+# distribution and the tier map load read every row by design, so they may
+# traverse a whole index but must still avoid a filesort.
+HOT_QUERIES = [
+    ('get_accounts', Account_Service.GET_ACCOUNTS_SQL, (), True),
+    ('balance_distribution',
+     Account_Service.BALANCE_DISTRIBUTION_SQL.format(edges=', '.join(['%s'] * len(Account_Service.DEFAULT_BUCKET_EDGES))),
+     tuple(Account_Service.DEFAULT_BUCKET_EDGES), True),
+    ('tier_load', tier_map.LOAD_TIERS_SQL, (), True),
+    ('get_account_details', Account_Service.GET_ACCOUNT_DETAILS_SQL, (1234,), False),
+    ('accounts_version', Account_Service.ACCOUNTS_VERSION_SQL, (), False),
+    ('search_by_name', Account_Service.SEARCH_ACCOUNTS_BY_NAME_SQL, ('Customer 0012%', 20), False),
+    ('search_by_id', Account_Service.SEARCH_ACCOUNTS_BY_ID_SQL, (1234,), False),
+    ('customer_portfolios', Account_Service.GET_CUSTOMER_PORTFOLIOS_SQL.format(placeholders='%s, %s, %s'), (42, 43, 44), False),
+    ('customer_totals', Account_Service.GET_CUSTOMER_TOTALS_SQL, (1234,), False),
+    ('update_balance', Account_Service.UPDATE_BALANCE_SQL, (100.00, 1234), False),
+    ('update_customer_tier', Account_Service.UPDATE_CUSTOMER_TIER_SQL, ('gold', 1234), False),
+    ('fee_inputs', Fee_Calculation_Service.GET_FEE_INPUTS_SQL, (1234,), False),
+    ('fee_account', Fee_Calculation_Service.GET_FEE_ACCOUNT_SQL, (1234,), False),
+    ('tier_refresh', tier_map.REFRESH_TIERS_SQL, ('2999-01-01',), False),
+    ('tier_lookup', tier_map.GET_TIER_SQL, (1234,), False),
+    ('reward_balance', Rewards_Calculation_Service.GET_BALANCE_SQL, (1234,), False),
+    ('fee_snapshot', Fee_Calculation_Service.GET_FEE_SNAPSHOT_SQL, (1234,), False),
+    ('reward_snapshot', Rewards_Calculation_Service.GET_REWARD_SNAPSHOT_SQL, (1234,), False),
+    ('charges_by_customer', account_charges.CHARGE_INPUTS_BY_CUSTOMER_SQL, (42,), False),
+    ('charges_by_accounts', account_charges.CHARGE_INPUTS_BY_ACCOUNTS_SQL.format(placeholders='%s, %s, %s'), (42, 43, 44), False),
+    ('charges_by_range', account_charges.CHARGE_INPUTS_BY_RANGE_SQL, (1000, 1500), False),
+    ('changed_since_watermark', account_charges.CHANGED_SINCE_SQL, ('2999-01-01', '2999-01-01'), False),
+    ('get_watermark', account_charges.GET_WATERMARK_SQL, (account_charges.WATERMARK_JOB,), False),
+    ('export_first_chunk', account_export.EXPORT_FIRST_CHUNK_SQL, (500,), False),
+    ('export_chunk', account_export.EXPORT_NEXT_CHUNK_SQL, (1000, 500), False),
+]
+
+def find_plan_regressions(plan, allow_full_scan=False):
+    """
+    Walk an EXPLAIN FORMAT=JSON document and return a list of problems:
+    full table scans (access_type ALL) and filesorts. Handles both the MySQL
+    ("using_filesort": true) and MariaDB ("filesort": {...}) spellings.
+    """
+    problems = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if node.get('access_type') == 'ALL' and not allow_full_scan:
+                problems.append(f"full scan on {node.get('table_name', '?')}")
+            if node.get('using_filesort') is True or 'filesort' in node:
+                problems.append('filesort')
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(plan)
+    return problems
+
+class TestPlanChecker(unittest.TestCase):
+
+    def test_clean_primary_key_plan(self):
+        plan = {'query_block': {'table': {'table_name': 'a', 'access_type': 'const', 'key': 'PRIMARY'}}}
+        self.assertEqual(find_plan_regressions(plan), [])
+
+    def test_detects_full_scan_in_nested_loop(self):
+        plan = {'query_block': {'nested_loop': [
+            {'table': {'table_name': 'a', 'access_type': 'const'}},
+            {'table': {'table_name': 'c', 'access_type': 'ALL'}},
+        ]}}
+        self.assertEqual(find_plan_regressions(plan), ['full scan on c'])
+
+    def test_full_scan_allowed_but_filesort_is_not(self):
+        plan = {'query_block': {'ordering_operation': {
+            'using_filesort': True,
+            'table': {'table_name': 'a', 'access_type': 'ALL'}
+        }}}
+        self.assertEqual(find_plan_regressions(plan, allow_full_scan=True), ['filesort'])
+
+    def test_detects_mariadb_filesort(self):
+        plan = {'query_block': {'filesort': {'sort_key': 'a.account_id', 'table': {'access_type': 'index'}}}}
+        self.assertEqual(find_plan_regressions(plan), ['filesort'])
+
+@unittest.skipUnless(MYSQL_TEST_HOST, 'MYSQL_TEST_HOST not set; query plan suite needs a local MySQL')
+class TestQueryPlans(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.conn = mysql.connector.connect(
+            host=MYSQL_TEST_HOST,
+            user=os.environ.get('MYSQL_TEST_USER', 'root'),
+            password=os.environ.get('MYSQL_TEST_PASSWORD', ''),
+            autocommit=True
+        )
+        cursor = cls.conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS `{MYSQL_TEST_DB}`")
+        cursor.execute(f"CREATE DATABASE `{MYSQL_TEST_DB}`")
+        cursor.execute(f"USE `{MYSQL_TEST_DB}`")
+        for table_file in ('Customers.sql', 'Accounts.sql', 'AccountCharges.sql', 'RecalcWatermarks.sql'):
+            with open(os.path.join(TABLES_DIR, table_file), encoding='utf-8') as f:
+                cursor.execute(f.read())
+
+        rng = random.Random(42)
+        tiers = ['premium', 'gold', 'silver', 'basic']
+        cursor.executemany(
+            "INSERT INTO Customers (customer_id, name, tier, created_at, updated_at) VALUES (%s, %s, %s, NOW(), NOW())",
+            [(i, f"Customer {i:06d}", rng.choice(tiers)) for i in range(1, SEED_CUSTOMERS + 1)]
+        )
+        cursor.executemany(
+            "INSERT INTO Accounts (account_id, customer_id, balance, created_at, updated_at) VALUES (%s, %s, %s, NOW(), NOW())",
+            [(i, rng.randint(1, SEED_CUSTOMERS), rng.randint(0, 2000000) / 100) for i in range(1, SEED_ACCOUNTS + 1)]
+        )
+        cursor.execute("""
+            INSERT INTO AccountCharges (account_id, monthly_fee, monthly_reward, balance, customer_tier, calculated_at)
+            SELECT account_id, 15.00, 0.00, balance, 'basic', NOW() FROM Accounts
+        """)
+        cursor.execute("ANALYZE TABLE Customers, Accounts, AccountCharges")
+        cursor.fetchall()
+        cursor.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cursor = cls.conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS `{MYSQL_TEST_DB}`")
+        cursor.close()
+        cls.conn.close()
+
+    def explain(self, sql, params):
+        cursor = self.conn.cursor()
+        cursor.execute("EXPLAIN FORMAT=JSON " + sql, params)
+        plan = json.loads(cursor.fetchone()[0])
+        cursor.close()
+        return plan
+
+    def test_hot_query_plans(self):
+        """Test that no hot query regresses to a full scan or a filesort"""
+        for name, sql, params, allow_full_scan in HOT_QUERIES:
+            with self.subTest(query=name):
+                plan = self.explain(sql, params)
+                self.assertEqual(find_plan_regressions(plan, allow_full_scan), [],
+                                 f"{name} plan regressed:\n{json.dumps(plan, indent=2)}")
+
+    def test_declared_indexes_exist(self):
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT DISTINCT table_name, index_name FROM information_schema.statistics
+            WHERE table_schema = %s
+        """, (MYSQL_TEST_DB,))
+        indexes = {(row[0], row[1]) for row in cursor.fetchall()}
+        cursor.close()
+        for expected in [('Accounts', 'idx_accounts_customer_balance'),
+                         ('Customers', 'idx_customers_tier'),
+                         ('Customers', 'idx_customers_name'),
+                         ('Accounts', 'idx_accounts_updated_at'),
+                         ('Customers', 'idx_customers_updated_at')]:
+            self.assertIn(expected, indexes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,7 +10,7 @@ from decimal import Decimal
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the lambda_handler directly from the correct path
-from AWS_Lambda_Microservices.Rewards_Calculation_Service import lambda_handler
+from AWS_Lambda_Microservices.Rewards_Calculation_Service import lambda_handler, calculate_reward
 
 class TestRewardsCalculationService(unittest.TestCase):
 
@@ -465,5 +465,40 @@ class TestRewardsCalculationService(unittest.TestCase):
         self.assertEqual(result['calculated_reward'], 10.01)
         self.assertEqual(result['balance'], 1000.999)
 
+    @patch.dict(os.environ, {'USE_ACCOUNT_CHARGES': 'true'})
+    @patch('AWS_Lambda_Microservices.Rewards_Calculation_Service.mysql.connector.connect')
+    def test_snapshot_read_single_lookup(self, mock_connect):
+        """Test that the AccountCharges snapshot answers with one primary-key lookup"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_cursor.fetchone.return_value = {
+            'monthly_reward': Decimal('300.00'),
+            'balance': Decimal('15000.00')
+        }
+
+        result = lambda_handler({'account_id': 1}, None)
+
+        self.assertEqual(result, {'account_id': 1, 'calculated_reward': 300.00, 'balance': 15000.00})
+        mock_cursor.execute.assert_called_once()
+        self.assertIn('FROM AccountCharges', mock_cursor.execute.call_args[0][0])
+
+    def test_calculate_reward_rules(self):
+        """Test the reward rule directly at the balance boundary"""
+        self.assertEqual(calculate_reward(10000.00), 100.00)
+        self.assertEqual(calculate_reward(10000.01), 200.00)
+        self.assertEqual(calculate_reward(0.00), 0.00)
+
+    def test_calculate_reward_rounds_half_up(self):
+        """Test that .xx5 rewards round up, matching ROUND() in MONTHLY_REWARD_SQL"""
+        # float round() gives 0.12, 26.00 and 200.00 here
+        self.assertEqual(calculate_reward(12.50), 0.13)
+        self.assertEqual(calculate_reward(2600.50), 26.01)
+        self.assertEqual(calculate_reward(10000.25), 200.01)
+        self.assertEqual(calculate_reward(Decimal('10001.75')), 200.04)
+        self.assertEqual(calculate_reward(-12.50), -0.13)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,177 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+from decimal import Decimal
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices.account_charges import (
+    compute_charges,
+    refresh_account_charges,
+    backfill,
+    incremental_refresh,
+    check_consistency
+)
+from datetime import datetime
+
+class TestAccountCharges(unittest.TestCase):
+
+    def test_compute_charges_uses_service_rules(self):
+        rows = [
+            (1, Decimal('1000.00'), 'premium'),
+            (2, Decimal('5000.00'), 'gold'),
+            (3, Decimal('10000.01'), 'basic'),
+        ]
+
+        self.assertEqual(compute_charges(rows), [
+            (1, 0.00, 10.00, 1000.0, 'premium'),
+            (2, 15.00, 50.00, 5000.0, 'gold'),
+            (3, 5.00, 200.00, 10000.01, 'basic'),
+        ])
+
+    def test_compute_charges_skips_null_balance(self):
+        rows = [(1, None, 'gold'), (2, Decimal('100.00'), 'gold')]
+
+        self.assertEqual(compute_charges(rows), [(2, 15.00, 1.00, 100.0, 'gold')])
+
+    def test_refresh_account_charges_null_balance(self):
+        """Test that an account without a balance loses its snapshot row instead of failing"""
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(7, None, 'gold'), (8, Decimal('200.00'), 'gold')]
+
+        refreshed = refresh_account_charges(mock_cursor, [7, 8])
+
+        self.assertEqual(refreshed, 1)
+        self.assertEqual(mock_cursor.executemany.call_args[0][1], [(8, 15.00, 2.00, 200.0, 'gold')])
+        sql, params = mock_cursor.execute.call_args[0]
+        self.assertIn('DELETE FROM AccountCharges WHERE account_id IN (%s)', sql)
+        self.assertEqual(params, (7,))
+
+    def test_refresh_account_charges_parameterized(self):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(7, Decimal('100.00'), 'gold'), (8, Decimal('200.00'), 'gold')]
+
+        refreshed = refresh_account_charges(mock_cursor, [7, 8])
+
+        self.assertEqual(refreshed, 2)
+        sql, params = mock_cursor.execute.call_args[0]
+        self.assertIn('a.account_id IN (%s, %s)', sql)
+        self.assertEqual(params, (7, 8))
+        mock_cursor.executemany.assert_called_once()
+
+    def test_refresh_account_charges_empty(self):
+        mock_cursor = MagicMock()
+        self.assertEqual(refresh_account_charges(mock_cursor, []), 0)
+        mock_cursor.execute.assert_not_called()
+
+    def test_backfill_commits_per_chunk(self):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (1, 25)
+        mock_cursor.fetchall.side_effect = [
+            [(i, Decimal('100.00'), 'gold') for i in range(1, 11)],
+            [(i, Decimal('100.00'), 'gold') for i in range(11, 21)],
+            [(i, Decimal('100.00'), 'gold') for i in range(21, 26)],
+        ]
+
+        written = backfill(mock_conn, chunk_size=10)
+
+        self.assertEqual(written, 25)
+        self.assertEqual(mock_conn.commit.call_count, 3)
+        range_params = [c[0][1] for c in mock_cursor.execute.call_args_list[1:]]
+        self.assertEqual(range_params, [(1, 10), (11, 20), (21, 30)])
+
+    def test_backfill_empty_table(self):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (None, None)
+
+        self.assertEqual(backfill(mock_conn), 0)
+        mock_conn.commit.assert_not_called()
+
+    def test_incremental_refresh_uses_watermark(self):
+        """Test that only rows changed since the stored mark are recomputed"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        run_started = datetime(2024, 3, 2, 1, 0, 0)
+        last_mark = datetime(2024, 3, 1, 1, 0, 0)
+        mock_cursor.fetchone.side_effect = [(run_started,), (last_mark,)]
+        mock_cursor.fetchall.return_value = [(5, Decimal('7000.00'), 'gold'), (9, Decimal('50.00'), 'basic')]
+
+        mode, refreshed = incremental_refresh(mock_conn, chunk_size=1)
+
+        self.assertEqual((mode, refreshed), ('incremental', 2))
+        changed_sql, changed_params = mock_cursor.execute.call_args_list[2][0]
+        self.assertIn('a.updated_at >= %s', changed_sql)
+        self.assertIn('c.updated_at >= %s', changed_sql)
+        self.assertEqual(changed_params, (last_mark, last_mark))
+        self.assertEqual(mock_cursor.executemany.call_count, 2)
+        watermark_sql, watermark_params = mock_cursor.execute.call_args_list[-1][0]
+        self.assertIn('INSERT INTO RecalcWatermarks', watermark_sql)
+        self.assertEqual(watermark_params, ('account_charges', run_started))
+
+    @patch('AWS_Lambda_Microservices.account_charges.backfill')
+    def test_incremental_refresh_first_run_is_full(self, mock_backfill):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        run_started = datetime(2024, 3, 2, 1, 0, 0)
+        mock_cursor.fetchone.side_effect = [(run_started,), None]
+        mock_backfill.return_value = 42
+
+        mode, refreshed = incremental_refresh(mock_conn)
+
+        self.assertEqual((mode, refreshed), ('full', 42))
+        self.assertEqual(mock_cursor.execute.call_args[0][1], ('account_charges', run_started))
+        mock_conn.commit.assert_called()
+
+    def test_check_consistency_classifies_rows(self):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (1, 4)
+        mock_cursor.fetchall.side_effect = [
+            # Current inputs from Accounts JOIN Customers
+            [(1, Decimal('6000.00'), 'gold'), (2, Decimal('100.00'), 'gold'), (3, Decimal('100.00'), 'premium')],
+            # Stored snapshot rows
+            [
+                (1, Decimal('5.00'), Decimal('60.00'), Decimal('6000.00'), 'gold'),
+                (3, Decimal('15.00'), Decimal('1.00'), Decimal('100.00'), 'gold'),
+                (4, Decimal('15.00'), Decimal('1.00'), Decimal('100.00'), 'gold'),
+            ],
+        ]
+
+        report = check_consistency(mock_conn, chunk_size=10)
+
+        self.assertEqual(report['accounts'], 3)
+        self.assertEqual(report['missing'], 1)
+        self.assertEqual(report['stale'], 1)
+        self.assertEqual(report['orphaned'], 1)
+        self.assertFalse(report['consistent'])
+        self.assertEqual(report['samples'], [
+            {'account_id': 2, 'issue': 'missing'},
+            {'account_id': 3, 'issue': 'stale'},
+        ])
+
+    def test_check_consistency_counts_null_balances(self):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (1, 2)
+        mock_cursor.fetchall.side_effect = [
+            [(1, None, 'gold'), (2, Decimal('100.00'), 'gold')],
+            [(2, Decimal('15.00'), Decimal('1.00'), Decimal('100.00'), 'gold')],
+        ]
+
+        report = check_consistency(mock_conn, chunk_size=10)
+
+        self.assertEqual((report['accounts'], report['no_balance']), (1, 1))
+        self.assertTrue(report['consistent'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import unittest
+from unittest.mock import MagicMock
+import csv
+import os
+import sys
+import tempfile
+from decimal import Decimal
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices.account_export import (
+    EXPORT_FIRST_CHUNK_SQL,
+    EXPORT_NEXT_CHUNK_SQL,
+    LocalObjectStore,
+    export_accounts,
+    export_rows,
+    iter_export_chunks,
+    parse_s3_url
+)
+
+ROWS = [
+    (1, 100, 'John Doe', 'premium', Decimal('1000.00')),
+    (2, 100, 'John Doe', 'premium', Decimal('12000.00')),
+    (3, 200, 'Jane Smith', 'gold', Decimal('7500.00')),
+    (5, 300, 'Wei Chen', 'basic', Decimal('250.50')),
+    (8, 300, 'Wei Chen', 'basic', Decimal('5000.00')),
+]
+
+def mock_connection(rows, chunk_size):
+    """Connection whose cursor serves rows in keyset-paginated chunks"""
+    mock_conn = MagicMock()
+    mock_cursor = MagicMock()
+    mock_conn.cursor.return_value = mock_cursor
+    mock_cursor.fetchall.side_effect = [rows[start:start + chunk_size] for start in range(0, len(rows) + 1, chunk_size)]
+    return mock_conn, mock_cursor
+
+class TestAccountExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_export_rows_uses_service_rules(self):
+        self.assertEqual(export_rows(ROWS[:3]), [
+            (1, 100, 'John Doe', 'premium', Decimal('1000.00'), 0.00, 10.00),
+            (2, 100, 'John Doe', 'premium', Decimal('12000.00'), 0.00, 240.00),
+            (3, 200, 'Jane Smith', 'gold', Decimal('7500.00'), 5.00, 75.00),
+        ])
+
+    def test_null_balance_exports_null_charges(self):
+        """Test that an account without a balance is exported with NULL fee and reward"""
+        self.assertEqual(export_rows([(9, 300, 'Wei Chen', 'basic', None)]), [
+            (9, 300, 'Wei Chen', 'basic', None, None, None),
+        ])
+
+    def test_null_balance_in_parquet(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest('pyarrow is not installed')
+        mock_conn, _ = mock_connection(ROWS[:2] + [(9, 300, 'Wei Chen', 'basic', None)], 2)
+        destination = os.path.join(self.tmp.name, 'accounts.parquet')
+
+        export_accounts(mock_conn, destination, chunk_size=2)
+
+        table = pq.read_table(destination)
+        self.assertEqual(table.column('balance').to_pylist()[2], None)
+        self.assertEqual(table.column('monthly_fee').to_pylist(), [0.0, 0.0, None])
+        self.assertEqual(table.column('monthly_reward').to_pylist(), [10.0, 240.0, None])
+
+    def test_chunks_use_keyset_pagination(self):
+        """Test that each chunk starts after the last account of the previous one"""
+        _, mock_cursor = mock_connection(ROWS, 2)
+
+        chunks = list(iter_export_chunks(mock_cursor, 2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual([call.args for call in mock_cursor.execute.call_args_list], [
+            (EXPORT_FIRST_CHUNK_SQL, (2,)),
+            (EXPORT_NEXT_CHUNK_SQL, (2, 2)),
+            (EXPORT_NEXT_CHUNK_SQL, (5, 2)),
+        ])
+
+    def test_csv_export(self):
+        mock_conn, _ = mock_connection(ROWS, 2)
+        destination = os.path.join(self.tmp.name, 'accounts.csv')
+
+        report = export_accounts(mock_conn, destination, chunk_size=2)
+
+        with open(destination, newline='') as f:
+            lines = list(csv.reader(f))
+        self.assertEqual(lines[0], ['account_id', 'customer_id', 'customer_name', 'tier', 'balance', 'monthly_fee', 'monthly_reward'])
+        self.assertEqual(lines[3], ['3', '200', 'Jane Smith', 'gold', '7500.00', '5.0', '75.0'])
+        self.assertEqual(report['rows'], 5)
+        self.assertEqual(report['chunks'], 3)
+        self.assertEqual(report['bytes'], os.path.getsize(destination))
+        mock_conn.start_transaction.assert_called_once_with(consistent_snapshot=True, readonly=True)
+        self.assertFalse(os.path.exists(destination + '.partial'))
+
+    def test_parquet_export_writes_row_group_per_chunk(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest('pyarrow is not installed')
+        mock_conn, _ = mock_connection(ROWS, 2)
+        destination = os.path.join(self.tmp.name, 'accounts.parquet')
+
+        export_accounts(mock_conn, destination, chunk_size=2)
+
+        parquet_file = pq.ParquetFile(destination)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+        table = parquet_file.read()
+        self.assertEqual(table.column('account_id').to_pylist(), [1, 2, 3, 5, 8])
+        self.assertEqual(table.column('balance').to_pylist()[3], Decimal('250.50'))
+        self.assertEqual(table.column('monthly_fee').to_pylist(), [0.0, 0.0, 5.0, 15.0, 15.0])
+
+    def test_arrow_export_is_memory_mappable(self):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            self.skipTest('pyarrow is not installed')
+        mock_conn, _ = mock_connection(ROWS, 2)
+        destination = os.path.join(self.tmp.name, 'accounts.arrow')
+
+        export_accounts(mock_conn, destination, chunk_size=2)
+
+        reader = pa.ipc.open_file(pa.memory_map(destination, 'r'))
+        self.assertEqual(reader.num_record_batches, 3)
+        table = reader.read_all()
+        self.assertEqual(table.column('customer_name').to_pylist()[4], 'Wei Chen')
+        self.assertEqual(table.column('monthly_reward').to_pylist()[1], 240.0)
+
+    def test_s3_destination_uploads_to_object_store(self):
+        mock_conn, _ = mock_connection(ROWS, 10)
+        store = LocalObjectStore(self.tmp.name)
+
+        report = export_accounts(mock_conn, 's3://finance/exports/2026-10/accounts.csv', object_store=store)
+
+        uploaded = os.path.join(self.tmp.name, 'finance', 'exports', '2026-10', 'accounts.csv')
+        self.assertEqual(os.path.getsize(uploaded), report['bytes'])
+        self.assertEqual(report['rows'], 5)
+
+    def test_failed_export_leaves_no_file(self):
+        mock_conn, mock_cursor = mock_connection(ROWS, 2)
+        mock_cursor.fetchall.side_effect = [ROWS[:2], RuntimeError('Lost connection')]
+        destination = os.path.join(self.tmp.name, 'accounts.csv')
+
+        with self.assertRaises(RuntimeError):
+            export_accounts(mock_conn, destination, chunk_size=2)
+
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            export_accounts(MagicMock(), os.path.join(self.tmp.name, 'accounts.xlsx'))
+
+    def test_parse_s3_url(self):
+        self.assertEqual(parse_s3_url('s3://bucket/a/b.csv'), ('bucket', 'a/b.csv'))
+        self.assertEqual(parse_s3_url('/tmp/b.csv'), (None, None))
+        with self.assertRaises(ValueError):
+            parse_s3_url('s3://bucket')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,237 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import json
+import os
+import sys
+import threading
+from decimal import Decimal
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices import Account_Service, Fee_Calculation_Service, router
+from AWS_Lambda_Microservices import admission
+from AWS_Lambda_Microservices.admission import (
+    AdmissionController, Overloaded, SharedRateLimit, TokenBucket, action_class, admission_controller, class_limits
+)
+from AWS_Lambda_Microservices.result_cache import LocalRedis
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+class TestAdmission(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_conn.cursor.return_value = self.mock_cursor
+        patcher = patch('AWS_Lambda_Microservices.db.mysql.connector.connect', return_value=self.mock_conn)
+        self.mock_connect = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def use_controller(self, controller):
+        patcher = patch('AWS_Lambda_Microservices.admission._controller', controller)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return controller
+
+    def test_token_bucket_refills_at_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=3, clock=clock)
+
+        self.assertEqual([bucket.try_acquire() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.try_acquire(), 0.5)
+        clock.now += 0.5
+        self.assertEqual(bucket.try_acquire(), 0.0)
+        # A long idle period refills only up to the burst
+        clock.now += 10
+        self.assertEqual([bucket.try_acquire() for _ in range(4)], [0.0, 0.0, 0.0, 0.5])
+
+    def test_shared_rate_limit_spans_containers(self):
+        """Test that two containers draw from one budget in the shared store"""
+        clock = FakeClock()
+        store = LocalRedis(clock=clock)
+        first = SharedRateLimit('bulk', rate=1, burst=2, store=store, clock=clock)
+        second = SharedRateLimit('bulk', rate=1, burst=2, store=store, clock=clock)
+
+        self.assertEqual([first.try_acquire(), second.try_acquire()], [0.0, 0.0])
+        # A two-request burst at one per second: windows of two seconds
+        self.assertAlmostEqual(first.try_acquire(), 2.0)
+        clock.now += 2
+        self.assertEqual(second.try_acquire(), 0.0)
+
+    def test_controller_with_store_uses_shared_limits(self):
+        controller = AdmissionController({'bulk': (1, 2)}, store=LocalRedis())
+
+        self.assertIsInstance(controller.buckets['bulk'], SharedRateLimit)
+
+    def test_shared_rate_limit_falls_back_to_local_bucket(self):
+        store = MagicMock()
+        store.incr.side_effect = ConnectionError('store down')
+        limit = SharedRateLimit('read', rate=1, burst=1, store=store, clock=FakeClock())
+
+        self.assertEqual(limit.try_acquire(), 0.0)
+        self.assertGreater(limit.try_acquire(), 0.0)
+        self.assertEqual(limit.errors, 2)
+
+    def test_slow_store_does_not_block_other_admissions(self):
+        """Test that the shared limit's round trip happens outside the controller lock"""
+        entered, release = threading.Event(), threading.Event()
+
+        class SlowStore(LocalRedis):
+            def incr(self, key):
+                entered.set()
+                release.wait(5)
+                return super().incr(key)
+
+        controller = AdmissionController({'read': (100, 100)}, max_concurrency=2, store=SlowStore())
+
+        def admit_read():
+            with controller.admit('get_account_details'):
+                pass
+
+        admitted, done = threading.Event(), threading.Event()
+
+        def admit_write():
+            with controller.admit('update_balance'):
+                admitted.set()
+                done.wait(5)
+
+        reader = threading.Thread(target=admit_read)
+        writer = threading.Thread(target=admit_write)
+        reader.start()
+        self.assertTrue(entered.wait(5))
+        try:
+            # A write (no limit configured) must not wait behind the read's store call
+            writer.start()
+            self.assertTrue(admitted.wait(1))
+            # The read's reserved slot counts toward the cap meanwhile
+            with self.assertRaises(Overloaded):
+                with controller.admit('update_balance'):
+                    pass
+        finally:
+            release.set()
+            done.set()
+            reader.join(5)
+            writer.join(5)
+        self.assertEqual(controller.metrics['admitted'], 2)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_rate_limited_request_releases_its_slot(self):
+        controller = AdmissionController({'read': (1, 1)}, max_concurrency=1, clock=FakeClock())
+        with controller.admit('get_account_details'):
+            pass
+
+        with self.assertRaises(Overloaded):
+            with controller.admit('get_account_details'):
+                pass
+
+        self.assertEqual(controller.in_flight, 0)
+        with controller.admit('update_balance'):
+            pass
+
+    @patch.dict(os.environ, {'ADMISSION_READ_RATE': '50'})
+    def test_concurrency_cap_follows_pool_size(self):
+        """Test that the router's pool size caps concurrency unless a lower cap is configured"""
+        for configured, expected in ((0, 4), (2, 2), (10, 4)):
+            with patch.object(admission, '_controller', None), \
+                 patch.object(admission, 'MAX_CONCURRENCY', configured), \
+                 patch.object(admission, 'ADMISSION_STORE_URL', None):
+                controller = admission_controller(pool_size=4)
+            self.assertEqual(controller.max_concurrency, expected)
+            self.assertIsInstance(controller.buckets['read'], TokenBucket)
+
+    def test_action_classes(self):
+        self.assertEqual(action_class('get_account_details'), 'read')
+        self.assertEqual(action_class('calculate_fee'), 'read')
+        self.assertEqual(action_class('update_balance'), 'write')
+        self.assertEqual(action_class('get_accounts'), 'bulk')
+
+    @patch.dict(os.environ, {'ADMISSION_BULK_RATE': '0.5', 'ADMISSION_READ_RATE': '100', 'ADMISSION_READ_BURST': '20'})
+    def test_class_limits_from_environment(self):
+        self.assertEqual(class_limits(), {'read': (100.0, 20.0), 'bulk': (0.5, 1.0)})
+
+    def test_concurrency_cap(self):
+        controller = AdmissionController(max_concurrency=2)
+
+        with controller.admit('get_account_details'), controller.admit('calculate_fee'):
+            with self.assertRaises(Overloaded):
+                with controller.admit('calculate_reward'):
+                    pass
+        with controller.admit('calculate_reward'):
+            self.assertEqual(controller.in_flight, 1)
+
+        self.assertEqual(controller.in_flight, 0)
+        self.assertEqual(controller.metrics, {'admitted': 3, 'rate_limited': 0, 'concurrency_limited': 1})
+
+    def test_slot_released_when_operation_fails(self):
+        controller = AdmissionController(max_concurrency=1)
+
+        with self.assertRaises(RuntimeError):
+            with controller.admit('update_balance'):
+                raise RuntimeError('Lost connection')
+
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_classes_have_separate_buckets(self):
+        controller = AdmissionController({'bulk': (1, 1)}, clock=FakeClock())
+
+        with controller.admit('get_accounts'):
+            pass
+        with self.assertRaises(Overloaded) as raised:
+            with controller.admit('get_balance_distribution'):
+                pass
+        with controller.admit('get_account_details'):
+            pass
+
+        self.assertAlmostEqual(raised.exception.retry_after, 1.0)
+
+    def test_warmup_is_always_admitted(self):
+        controller = AdmissionController({'read': (1, 1)}, max_concurrency=1, clock=FakeClock())
+
+        with controller.admit('get_account_details'):
+            with controller.admit('warmup'):
+                pass
+
+    def test_proxy_request_gets_429_with_retry_after(self):
+        """Test that a rate-limited request is refused before a connection is opened"""
+        self.use_controller(AdmissionController({'bulk': (0.25, 1)}, clock=FakeClock()))
+        self.mock_cursor.fetchall.return_value = []
+        event = {'headers': {}, 'body': '{"action": "get_accounts"}'}
+
+        Account_Service.lambda_handler(event, None)
+        self.mock_connect.reset_mock()
+        result = Account_Service.lambda_handler(event, None)
+
+        self.assertEqual(result['statusCode'], 429)
+        self.assertEqual(result['headers']['Retry-After'], '4')
+        self.assertTrue(json.loads(result['body'])['error'].startswith('Too many requests'))
+        self.mock_connect.assert_not_called()
+
+    def test_direct_invocation_gets_error_with_retry_after(self):
+        self.use_controller(AdmissionController({'read': (10, 1)}, clock=FakeClock()))
+        self.mock_cursor.fetchone.return_value = {'balance': Decimal('100.00'), 'customer_tier': 'gold'}
+
+        first = Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+        second = Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+
+        self.assertEqual(first['calculated_fee'], 15.00)
+        self.assertEqual(second['retry_after'], 1)
+        self.assertIn('rate limit for read actions', second['error'])
+
+    @patch('AWS_Lambda_Microservices.router.get_pooled_connection')
+    def test_router_rejects_without_borrowing(self, mock_get_pooled):
+        controller = self.use_controller(AdmissionController(max_concurrency=1))
+
+        with controller.admit('get_account_details'):
+            result = router.lambda_handler({'action': 'calculate_reward', 'account_id': 2}, None)
+
+        self.assertIn('Too many requests', result['error'])
+        mock_get_pooled.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
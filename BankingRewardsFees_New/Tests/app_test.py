@@ -1,9 +1,16 @@
 import unittest
-from unittest.mock import patch, MagicMock, Mock
+from unittest.mock import patch, MagicMock, Mock, ANY
 import json
+import base64
+import gzip
+import zlib
 import requests
 import sys
 import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 
 # Add the parent directory to sys.path to allow importing the module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,6 +23,22 @@ from BankingRewardsFees_New.app import (
     get_accounts,
     get_account_details,
     update_account_balance,
+    update_account_balances,
+    search_accounts,
+    get_customer_portfolio,
+    get_accounts_frame,
+    get_customer_portfolios_frame,
+    bucket_labels,
+    current_snapshot,
+    open_snapshot,
+    refresh_snapshot,
+    search_snapshot,
+    snapshot_tier_summary,
+    get_response_cache,
+    get_service_clients,
+    CircuitBreaker,
+    CircuitOpenError,
+    ServiceClient,
     ACCOUNT_SERVICE_URL,
     FEE_CALCULATION_URL,
     REWARDS_CALCULATION_URL
@@ -25,6 +48,9 @@ class TestBankingApp(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures before each test method."""
+        # Fresh circuit breakers and latency windows for every test
+        get_service_clients.clear()
+        self.addCleanup(get_service_clients.clear)
         self.sample_account_data = [
             {
                 'account_id': 1,
@@ -88,7 +114,8 @@ class TestBankingApp(unittest.TestCase):
         self.assertEqual(result, self.sample_account_data)
         mock_post.assert_called_once_with(
             ACCOUNT_SERVICE_URL,
-            json={"action": "get_accounts"}
+            json={"action": "get_accounts"},
+            timeout=ANY
         )
 
     @patch('BankingRewardsFees_New.app.requests.post')
@@ -121,6 +148,70 @@ class TestBankingApp(unittest.TestCase):
 
         self.assertEqual(result, self.sample_account_data)
 
+    @patch('BankingRewardsFees_New.app.requests.post')
+    @patch('BankingRewardsFees_New.app.st')
+    def test_call_account_service_compressed_body(self, mock_st, mock_post):
+        """Test that base64 gzip and deflate bodies are decompressed"""
+        raw = json.dumps(self.sample_account_data).encode('utf-8')
+        for encoding, compressed in (('gzip', gzip.compress(raw)), ('deflate', zlib.compress(raw))):
+            with self.subTest(encoding=encoding):
+                mock_response = Mock()
+                mock_response.status_code = 200
+                mock_response.json.return_value = {
+                    'statusCode': 200,
+                    'headers': {'Content-Type': 'application/json', 'Content-Encoding': encoding},
+                    'isBase64Encoded': True,
+                    'body': base64.b64encode(compressed).decode('ascii')
+                }
+                mock_post.return_value = mock_response
+
+                result = call_account_service("get_accounts")
+
+                self.assertEqual(result, self.sample_account_data)
+
+    @patch('BankingRewardsFees_New.app.requests.post')
+    @patch('BankingRewardsFees_New.app.st')
+    def test_call_account_service_revalidates_with_etag(self, mock_st, mock_post):
+        """Test that a cached body is reused when the service answers 304"""
+        get_response_cache().clear()
+        self.addCleanup(get_response_cache().clear)
+        first = Mock()
+        first.status_code = 200
+        first.headers = {'ETag': '"v1"'}
+        first.json.return_value = self.sample_account_data
+        not_modified = Mock()
+        not_modified.status_code = 304
+        not_modified.headers = {'ETag': '"v1"'}
+        mock_post.side_effect = [first, not_modified]
+
+        self.assertEqual(call_account_service("get_accounts"), self.sample_account_data)
+        self.assertEqual(call_account_service("get_accounts"), self.sample_account_data)
+
+        mock_post.assert_called_with(
+            ACCOUNT_SERVICE_URL,
+            json={"action": "get_accounts"},
+            headers={"If-None-Match": '"v1"'},
+            timeout=ANY
+        )
+        not_modified.json.assert_not_called()
+
+    @patch('BankingRewardsFees_New.app.requests.post')
+    @patch('BankingRewardsFees_New.app.st')
+    def test_call_account_service_does_not_cache_writes(self, mock_st, mock_post):
+        get_response_cache().clear()
+        self.addCleanup(get_response_cache().clear)
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {'ETag': '"v1"'}
+        mock_response.json.return_value = {'message': 'Balance updated successfully'}
+        mock_post.return_value = mock_response
+
+        call_account_service("update_balance", account_id=1, new_balance=10.0)
+        call_account_service("update_balance", account_id=1, new_balance=10.0)
+
+        self.assertEqual(get_response_cache(), {})
+        mock_post.assert_called_with(ACCOUNT_SERVICE_URL, json={"action": "update_balance", "account_id": 1, "new_balance": 10.0}, timeout=ANY)
+
     @patch('BankingRewardsFees_New.app.requests.post')
     @patch('BankingRewardsFees_New.app.st')
     def test_call_account_service_with_kwargs(self, mock_st, mock_post):
@@ -135,7 +226,8 @@ class TestBankingApp(unittest.TestCase):
         self.assertEqual(result, self.sample_account_details)
         mock_post.assert_called_once_with(
             ACCOUNT_SERVICE_URL,
-            json={"action": "get_account_details", "account_id": 1}
+            json={"action": "get_account_details", "account_id": 1},
+            timeout=ANY
         )
 
     @patch('BankingRewardsFees_New.app.requests.post')
@@ -193,7 +285,8 @@ class TestBankingApp(unittest.TestCase):
         self.assertEqual(result, self.sample_fee_result)
         mock_post.assert_called_once_with(
             FEE_CALCULATION_URL,
-            json={"account_id": 1}
+            json={"account_id": 1},
+            timeout=ANY
         )
 
     @patch('BankingRewardsFees_New.app.requests.post')
@@ -239,7 +332,8 @@ class TestBankingApp(unittest.TestCase):
         self.assertEqual(result, self.sample_reward_result)
         mock_post.assert_called_once_with(
             REWARDS_CALCULATION_URL,
-            json={"account_id": 1}
+            json={"account_id": 1},
+            timeout=ANY
         )
 
     @patch('BankingRewardsFees_New.app.requests.post')
@@ -333,6 +427,70 @@ class TestBankingApp(unittest.TestCase):
         self.assertIsNone(result)
         mock_call_service.assert_called_once_with("update_balance", account_id=1, new_balance=6000.00)
 
+    @patch('BankingRewardsFees_New.app.call_account_service')
+    def test_search_accounts(self, mock_call_service):
+        mock_call_service.return_value = self.sample_account_data[:1]
+
+        result = search_accounts("John")
+
+        self.assertEqual(result, self.sample_account_data[:1])
+        mock_call_service.assert_called_once_with("search_accounts", query="John", limit=20)
+
+    @patch('BankingRewardsFees_New.app.call_account_service')
+    def test_get_customer_portfolio(self, mock_call_service):
+        mock_call_service.return_value = {'customer_id': 100, 'account_count': 2}
+
+        result = get_customer_portfolio(100)
+
+        self.assertEqual(result['account_count'], 2)
+        mock_call_service.assert_called_once_with("get_customer_portfolio", customer_id=100)
+
+    @patch('BankingRewardsFees_New.app.call_account_service')
+    def test_get_accounts_frame(self, mock_call_service):
+        """Test that the column-oriented format loads straight into a DataFrame"""
+        mock_call_service.return_value = {'row_count': 2, 'columns': {
+            'account_id': [1, 2], 'customer_name': ['John Doe', 'Jane Doe'], 'customer_id': [100, 101]
+        }}
+
+        frame = get_accounts_frame()
+
+        self.assertEqual(list(frame.columns), ['account_id', 'customer_name', 'customer_id'])
+        self.assertEqual(frame['customer_name'].tolist(), ['John Doe', 'Jane Doe'])
+        mock_call_service.assert_called_once_with("get_accounts", format="columns")
+
+    @patch('BankingRewardsFees_New.app.call_account_service')
+    def test_get_customer_portfolios_frame(self, mock_call_service):
+        mock_call_service.return_value = {
+            'portfolios': {'row_count': 1, 'columns': {'customer_id': [100], 'total_fees': [15.0]}},
+            'not_found': [999]
+        }
+
+        frame = get_customer_portfolios_frame([100, 999])
+
+        self.assertEqual(frame['total_fees'].tolist(), [15.0])
+        mock_call_service.assert_called_once_with("get_customer_portfolio", customer_ids=[100, 999], format="columns")
+
+        mock_call_service.return_value = {'error': 'Database error: Lost connection'}
+        self.assertIsNone(get_customer_portfolios_frame([100]))
+
+    def test_bucket_labels(self):
+        """Test that labels line up with the len(edges) + 1 buckets"""
+        self.assertEqual(bucket_labels([0, 5000, 10000]),
+                         ["< $0", "$0 - $5,000", "$5,000 - $10,000", ">= $10,000"])
+
+    @patch('BankingRewardsFees_New.app.call_account_service')
+    def test_update_account_balances_payload(self, mock_call_service):
+        """Test that bulk balance updates are sent as a list of account_id/new_balance objects"""
+        mock_call_service.return_value = {"updated": 2, "not_found": 0}
+
+        result = update_account_balances([(1, 100.0), (2, 250.5)])
+
+        self.assertEqual(result, {"updated": 2, "not_found": 0})
+        mock_call_service.assert_called_once_with("update_balances", updates=[
+            {"account_id": 1, "new_balance": 100.0},
+            {"account_id": 2, "new_balance": 250.5}
+        ])
+
     @patch('BankingRewardsFees_New.app.requests.post')
     @patch('BankingRewardsFees_New.app.st')
     def test_all_services_different_error_handling(self, mock_st, mock_post):
@@ -396,15 +554,15 @@ class TestBankingApp(unittest.TestCase):
             "new_balance": 5000.00,
             "extra_param": "test"
         }
-        mock_post.assert_called_with(ACCOUNT_SERVICE_URL, json=expected_payload)
+        mock_post.assert_called_with(ACCOUNT_SERVICE_URL, json=expected_payload, timeout=ANY)
 
         # Test fee calculation service
         call_fee_calculation_service(123)
-        mock_post.assert_called_with(FEE_CALCULATION_URL, json={"account_id": 123})
+        mock_post.assert_called_with(FEE_CALCULATION_URL, json={"account_id": 123}, timeout=ANY)
 
         # Test rewards calculation service
         call_rewards_calculation_service(456)
-        mock_post.assert_called_with(REWARDS_CALCULATION_URL, json={"account_id": 456})
+        mock_post.assert_called_with(REWARDS_CALCULATION_URL, json={"account_id": 456}, timeout=ANY)
 
     def test_helper_functions_parameter_passing(self):
         """Test that helper functions pass parameters correctly"""
@@ -463,5 +621,168 @@ class TestBankingApp(unittest.TestCase):
         result = call_account_service("get_accounts")
         self.assertEqual(result, "string_response")
 
+class TestResilientClient(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown)
+        self.client = ServiceClient("Account Service", ACCOUNT_SERVICE_URL, self.executor,
+                                    CircuitBreaker(failure_threshold=2, reset_seconds=60))
+
+    def response(self, status_code=200, delay=0.0):
+        def post(*args, **kwargs):
+            time.sleep(delay)
+            return Mock(status_code=status_code)
+        return post
+
+    @patch('BankingRewardsFees_New.app.requests.post')
+    def test_timeouts_are_bounded_by_deadline(self, mock_post):
+        mock_post.side_effect = self.response()
+
+        with patch('BankingRewardsFees_New.app.SERVICE_DEADLINE_SECONDS', 2.0):
+            self.client.post({"action": "update_balance"})
+
+        connect_timeout, read_timeout = mock_post.call_args.kwargs['timeout']
+        self.assertLessEqual(connect_timeout, 2.0)
+        self.assertLessEqual(read_timeout, 2.0)
+
+    @patch('BankingRewardsFees_New.app.requests.post')
+    def test_breaker_opens_and_fails_fast(self, mock_post):
+        mock_post.side_effect = requests.ConnectionError("Connection refused")
+
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                self.client.post({"action": "get_accounts"})
+        with self.assertRaises(CircuitOpenError):
+            self.client.post({"action": "get_accounts"})
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(self.client.breaker.state, "open")
+        self.assertEqual(self.client.metrics['rejected'], 1)
+
+    @patch('BankingRewardsFees_New.app.requests.post')
+    def test_breaker_half_open_trial(self, mock_post):
+        self.client.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+        mock_post.side_effect = self.response(status_code=503)
+        self.client.post({"action": "get_accounts"})
+        self.assertEqual(self.client.breaker.state, "open")
+
+        mock_post.side_effect = self.response()
+        self.client.post({"action": "get_accounts"})
+
+        self.assertEqual(self.client.breaker.state, "closed")
+
+    @patch('BankingRewardsFees_New.app.requests.post')
+    def test_slow_read_is_hedged(self, mock_post):
+        calls = []
+        def post(*args, **kwargs):
+            calls.append(time.monotonic())
+            time.sleep(0.5 if len(calls) == 1 else 0.0)
+            return Mock(status_code=200, name=f"response-{len(calls)}")
+        mock_post.side_effect = post
+
+        with patch('BankingRewardsFees_New.app.HEDGE_DEFAULT_DELAY_SECONDS', 0.05):
+            started = time.monotonic()
+            self.client.post({"action": "get_account_details", "account_id": 1}, idempotent=True)
+
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(self.client.metrics['hedges_issued'], 1)
+        self.assertEqual(self.client.metrics['hedges_won'], 1)
+
+    @patch('BankingRewardsFees_New.app.requests.post')
+    def test_writes_are_not_hedged(self, mock_post):
+        mock_post.side_effect = self.response(delay=0.1)
+
+        with patch('BankingRewardsFees_New.app.HEDGE_DEFAULT_DELAY_SECONDS', 0.01):
+            self.client.post({"action": "update_balance", "account_id": 1, "new_balance": 5.0})
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(self.client.metrics['hedges_issued'], 0)
+
+    def test_hedge_delay_tracks_p95(self):
+        self.assertEqual(self.client.hedge_delay(), 1.0)
+        self.client.latencies.extend([0.1] * 95 + [0.9] * 5)
+
+        self.assertEqual(self.client.hedge_delay(), 0.9)
+
+    @patch('BankingRewardsFees_New.app.st')
+    def test_call_account_service_reports_open_circuit(self, mock_st):
+        get_service_clients.clear()
+        self.addCleanup(get_service_clients.clear)
+        breaker = get_service_clients()["account"].breaker
+        breaker.state, breaker.opened_at = "open", time.monotonic()
+
+        with patch('BankingRewardsFees_New.app.requests.post') as mock_post:
+            self.assertIsNone(call_account_service("get_accounts"))
+
+        mock_post.assert_not_called()
+        self.assertIn("Account Service is unavailable", mock_st.error.call_args[0][0])
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        from AWS_Lambda_Microservices.account_export import ArrowExportWriter
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'accounts_snapshot.arrow')
+        writer = ArrowExportWriter(self.path)
+        writer.write_chunk([
+            (1, 100, 'John Doe', 'gold', Decimal('5000.00'), 15.0, 50.0),
+            (2, 101, 'Jane Smith', 'premium', Decimal('15000.00'), 0.0, 300.0),
+        ])
+        writer.write_chunk([
+            (3, 100, 'John Doe', 'gold', Decimal('6000.00'), 5.0, 60.0),
+            (12, 102, 'Joan Arc', 'basic', Decimal('10.50'), 15.0, 0.11),
+        ])
+        writer.close()
+
+    def test_open_snapshot_is_memory_mapped(self):
+        import pyarrow as pa
+        allocated = pa.total_allocated_bytes()
+
+        table = open_snapshot(self.path)
+
+        # Columns reference the mapping instead of a deserialized copy
+        self.assertEqual(pa.total_allocated_bytes(), allocated)
+        self.assertEqual(table.num_rows, 4)
+        self.assertEqual(table['account_id'].to_pylist(), [1, 2, 3, 12])
+
+    def test_snapshot_tier_summary(self):
+        summary = snapshot_tier_summary(open_snapshot(self.path))
+
+        self.assertEqual(summary['Tier'].tolist(), ['basic', 'gold', 'premium'])
+        self.assertEqual(summary['Accounts'].tolist(), [1, 2, 1])
+        self.assertEqual(summary['Total Balance'].tolist(), [10.5, 11000.0, 15000.0])
+        self.assertEqual(summary['Monthly Fees'].tolist(), [15.0, 20.0, 0.0])
+
+    def test_search_snapshot(self):
+        table = open_snapshot(self.path)
+
+        self.assertEqual(search_snapshot(table, 'Jo')['account_id'].tolist(), [12, 1, 3])
+        self.assertEqual(search_snapshot(table, '1')['account_id'].tolist(), [1])
+        self.assertEqual(search_snapshot(table, 'Jo', limit=1)['account_id'].tolist(), [12])
+        self.assertTrue(search_snapshot(table, 'Nobody').empty)
+
+    def test_search_snapshot_ignores_case(self):
+        table = open_snapshot(self.path)
+
+        self.assertEqual(search_snapshot(table, 'jo')['account_id'].tolist(), [12, 1, 3])
+        self.assertEqual(search_snapshot(table, 'JOHN')['account_id'].tolist(), [1, 3])
+        self.assertTrue(search_snapshot(table, '²').empty)
+
+    def test_current_snapshot_without_file(self):
+        self.assertEqual(current_snapshot(os.path.join(self.tmp.name, 'missing.arrow')), (None, None))
+
+    @patch('AWS_Lambda_Microservices.account_export.export_accounts')
+    @patch('AWS_Lambda_Microservices.db.get_connection')
+    def test_refresh_snapshot_writes_arrow_file(self, mock_get_connection, mock_export):
+        mock_export.return_value = {'rows': 4}
+
+        self.assertEqual(refresh_snapshot(self.path), {'rows': 4})
+
+        mock_export.assert_called_once_with(mock_get_connection.return_value, self.path, 'arrow')
+        mock_get_connection.return_value.close.assert_called_once()
+
 if __name__ == '__main__':
     unittest.main()
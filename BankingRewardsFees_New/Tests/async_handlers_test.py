@@ -0,0 +1,305 @@
+import unittest
+from unittest.mock import patch, AsyncMock
+import asyncio
+import base64
+import gzip
+import json
+import math
+import os
+import sys
+import time
+import pymysql
+from datetime import datetime
+from decimal import Decimal
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices import Account_Service, async_handlers
+from AWS_Lambda_Microservices.Account_Service import (
+    ACCOUNTS_VERSION_SQL,
+    GET_ACCOUNTS_SQL,
+    GET_ACCOUNT_DETAILS_SQL,
+    GET_CUSTOMER_TOTALS_SQL
+)
+from AWS_Lambda_Microservices.async_handlers import lambda_handler
+from AWS_Lambda_Microservices.db import DEADLINE_MARGIN_MS
+
+QUERY_DELAY = 0.05
+
+class FakeContext:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+VERSION_ROW = {
+    'max_account_id': 2,
+    'accounts_updated_at': datetime(2024, 1, 1, 9, 0, 0),
+    'customers_updated_at': datetime(2024, 1, 1, 8, 0, 0),
+    'checked_at': datetime(2024, 1, 1, 10, 0, 0)
+}
+
+ACCOUNT_ROW = {
+    'account_id': 1, 'customer_id': 100, 'balance': Decimal('1000.50'),
+    'created_at': datetime(2023, 1, 1, 12, 0, 0), 'updated_at': datetime(2023, 1, 2, 12, 0, 0),
+    'customer_name': 'John Doe', 'customer_tier': 'gold'
+}
+
+class FakeCursor:
+    def __init__(self, pool):
+        self.pool = pool
+        self.result = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params=()):
+        self.pool.executed.append((sql, params))
+        self.pool.in_flight += 1
+        self.pool.max_in_flight = max(self.pool.max_in_flight, self.pool.in_flight)
+        await asyncio.sleep(QUERY_DELAY)
+        self.pool.in_flight -= 1
+        if isinstance(self.pool.results, Exception):
+            raise self.pool.results
+        self.result = self.pool.results.get(sql)
+
+    async def fetchone(self):
+        return self.result
+
+    async def fetchall(self):
+        return self.result
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self, cursor_class=None):
+        return FakeCursor(self.pool)
+
+class FakeAcquire:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def __aenter__(self):
+        return self.pool.connection
+
+    async def __aexit__(self, *exc):
+        return False
+
+class FakePool:
+    """Stands in for an aiomysql pool; every query takes QUERY_DELAY seconds"""
+    def __init__(self, results):
+        self.results = results
+        self.size = 1
+        self.executed = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # One connection, so session settings carry over like on a real pool
+        self.connection = FakeConnection(self)
+
+    def acquire(self):
+        return FakeAcquire(self)
+
+class TestAsyncHandlers(unittest.TestCase):
+
+    def setUp(self):
+        async_handlers._pool = None
+
+    def tearDown(self):
+        async_handlers._pool = None
+
+    def use_pool(self, results):
+        pool = FakePool(results)
+        patcher = patch('AWS_Lambda_Microservices.async_handlers.aiomysql.create_pool',
+                        new=AsyncMock(return_value=pool))
+        self.create_pool = patcher.start()
+        self.addCleanup(patcher.stop)
+        return pool
+
+    def test_account_overview_runs_queries_concurrently(self):
+        """Test that details and customer totals are fetched in parallel"""
+        pool = self.use_pool({
+            GET_ACCOUNT_DETAILS_SQL: {
+                'account_id': 1, 'customer_id': 100, 'balance': Decimal('1000.50'),
+                'created_at': datetime(2023, 1, 1, 12, 0, 0), 'updated_at': datetime(2023, 1, 2, 12, 0, 0),
+                'customer_name': 'John Doe', 'customer_tier': 'gold'
+            },
+            GET_CUSTOMER_TOTALS_SQL: {'account_count': 3, 'total_balance': Decimal('2500.00')}
+        })
+
+        started = time.perf_counter()
+        result = lambda_handler({'action': 'get_account_overview', 'account_id': 1}, None)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(result['account']['balance'], 1000.50)
+        self.assertEqual(result['account']['created_at'], '2023-01-01 12:00:00')
+        self.assertEqual(result['customer_totals'], {'account_count': 3, 'total_balance': 2500.0})
+        self.assertEqual(pool.max_in_flight, 2)
+        self.assertLess(elapsed, 2 * QUERY_DELAY)
+
+    def test_account_overview_not_found(self):
+        self.use_pool({GET_CUSTOMER_TOTALS_SQL: {'account_count': 0, 'total_balance': 0}})
+
+        result = lambda_handler({'body': '{"action": "get_account_overview", "account_id": 999}'}, None)
+
+        self.assertEqual(result, {'error': 'Account not found'})
+
+    def test_pool_is_reused_across_invocations(self):
+        """Test that warm invocations share one pool and one event loop"""
+        self.use_pool({GET_ACCOUNT_DETAILS_SQL: {'account_id': 1}})
+
+        lambda_handler({'action': 'get_account_details', 'account_id': 1}, None)
+        lambda_handler({'action': 'get_account_details', 'account_id': 1}, None)
+
+        self.create_pool.assert_awaited_once()
+
+    def test_missing_account_id(self):
+        self.use_pool({})
+
+        result = lambda_handler({'action': 'get_account_details'}, None)
+
+        self.assertEqual(result, {'error': 'account_id is required'})
+
+    def test_database_error(self):
+        self.use_pool(pymysql.err.OperationalError(2003, "Can't connect"))
+
+        result = lambda_handler({'action': 'get_accounts'}, None)
+
+        self.assertIn('Database error', result['error'])
+
+    def test_warmup_opens_pool_and_primes_statements(self):
+        pool = self.use_pool({})
+
+        result = lambda_handler({'action': 'warmup'}, None)
+
+        self.assertTrue(result['warmed'])
+        self.create_pool.assert_awaited_once()
+        self.assertEqual(pool.executed, Account_Service.warmup_statements())
+        self.assertLess(result['statements_ms'], len(pool.executed) * QUERY_DELAY * 1000)
+
+    @patch('AWS_Lambda_Microservices.async_handlers.Account_Service.lambda_handler')
+    def test_write_actions_delegate_to_sync_handler(self, mock_sync_handler):
+        """Test that actions without a native async path use the existing handler"""
+        mock_sync_handler.return_value = {'message': 'Balance updated successfully'}
+        body = {'action': 'update_balance', 'account_id': 1, 'new_balance': 10.0}
+
+        result = lambda_handler({'body': body}, None)
+
+        self.assertEqual(result, {'message': 'Balance updated successfully'})
+        mock_sync_handler.assert_called_once_with({'body': body}, None)
+
+    @patch('AWS_Lambda_Microservices.async_handlers.Account_Service.lambda_handler')
+    def test_columns_format_delegates_to_sync_handler(self, mock_sync_handler):
+        mock_sync_handler.return_value = {'row_count': 0, 'columns': {}}
+        body = {'action': 'get_accounts', 'format': 'columns'}
+
+        result = lambda_handler({'body': body}, None)
+
+        self.assertEqual(result, {'row_count': 0, 'columns': {}})
+        mock_sync_handler.assert_called_once_with({'body': body}, None)
+
+    @patch('AWS_Lambda_Microservices.async_handlers.Account_Service.lambda_handler')
+    def test_delegated_actions_keep_request_headers(self, mock_sync_handler):
+        """Test that If-None-Match and Accept-Encoding reach the sync handler"""
+        mock_sync_handler.return_value = {'statusCode': 304, 'headers': {'ETag': '"v1"'}, 'body': ''}
+        event = {'headers': {'If-None-Match': '"v1"', 'Accept-Encoding': 'gzip'},
+                 'body': json.dumps({'action': 'get_accounts', 'format': 'columns'})}
+
+        result = lambda_handler(event, None)
+
+        self.assertEqual(result['statusCode'], 304)
+        mock_sync_handler.assert_called_once_with(event, None)
+
+    def api_event(self, body, **headers):
+        return {'headers': {'Content-Type': 'application/json', **headers}, 'body': json.dumps(body)}
+
+    def test_get_accounts_conditional(self):
+        """Test that the native path issues an ETag and answers a match with 304 without reading the list"""
+        pool = self.use_pool({ACCOUNTS_VERSION_SQL: VERSION_ROW, GET_ACCOUNTS_SQL: [ACCOUNT_ROW]})
+
+        first = lambda_handler(self.api_event({'action': 'get_accounts'}), None)
+        pool.executed.clear()
+        second = lambda_handler(self.api_event({'action': 'get_accounts'}, **{'If-None-Match': first['headers']['ETag']}), None)
+
+        self.assertEqual(first['statusCode'], 200)
+        self.assertEqual(json.loads(first['body'])[0]['balance'], 1000.5)
+        self.assertEqual(second['statusCode'], 304)
+        self.assertEqual(pool.executed, [(ACCOUNTS_VERSION_SQL, ())])
+
+    def test_get_account_details_conditional(self):
+        self.use_pool({GET_ACCOUNT_DETAILS_SQL: ACCOUNT_ROW})
+        body = {'action': 'get_account_details', 'account_id': 1}
+
+        first = lambda_handler(self.api_event(body), None)
+        second = lambda_handler(self.api_event(body, **{'If-None-Match': first['headers']['ETag']}), None)
+
+        self.assertEqual(json.loads(first['body'])['customer_name'], 'John Doe')
+        self.assertEqual(second['statusCode'], 304)
+
+    def test_native_responses_are_compressed(self):
+        # Well above COMPRESSION_THRESHOLD_BYTES once serialized
+        self.use_pool({ACCOUNTS_VERSION_SQL: VERSION_ROW, GET_ACCOUNTS_SQL: [ACCOUNT_ROW] * 100})
+
+        response = lambda_handler(self.api_event({'action': 'get_accounts'}, **{'Accept-Encoding': 'gzip'}), None)
+
+        self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(response['headers']['Vary'], 'Accept-Encoding')
+        self.assertIn('ETag', response['headers'])
+        self.assertEqual(len(json.loads(gzip.decompress(base64.b64decode(response['body'])))), 100)
+
+    def test_pool_has_connect_timeout(self):
+        self.use_pool({})
+
+        lambda_handler({'action': 'get_accounts'}, None)
+
+        self.assertEqual(self.create_pool.await_args.kwargs['connect_timeout'], async_handlers.CONNECT_TIMEOUT_SECONDS)
+
+    def test_statements_are_bounded_on_the_server(self):
+        """Test that every acquired connection gets the remaining budget as session limits"""
+        pool = self.use_pool({GET_ACCOUNT_DETAILS_SQL: ACCOUNT_ROW})
+
+        lambda_handler({'action': 'get_account_details', 'account_id': 1}, FakeContext(2500))
+
+        (set_sql, set_params), query = pool.executed
+        self.assertIn('SET SESSION max_execution_time = %s, innodb_lock_wait_timeout = %s', set_sql)
+        self.assertEqual(set_params, (2500 - DEADLINE_MARGIN_MS, math.ceil((2500 - DEADLINE_MARGIN_MS) / 1000)))
+        self.assertEqual(query, (GET_ACCOUNT_DETAILS_SQL, (1,)))
+
+        # A later request without a deadline must not inherit the old limits
+        pool.executed.clear()
+        lambda_handler({'action': 'get_account_details', 'account_id': 1}, None)
+
+        self.assertIn('= DEFAULT', pool.executed[0][0])
+        self.assertEqual(pool.executed[1], (GET_ACCOUNT_DETAILS_SQL, (1,)))
+
+    def test_statement_timeouts_fall_back_to_mariadb(self):
+        executed = []
+
+        class Cursor:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, sql, params=()):
+                executed.append((sql, params))
+                if 'max_execution_time' in sql:
+                    raise pymysql.err.InternalError(1193, "Unknown system variable 'max_execution_time'")
+
+        class Connection:
+            def cursor(self):
+                return Cursor()
+
+        asyncio.run(async_handlers.set_statement_timeouts(Connection(), 1500))
+
+        self.assertEqual(executed[-1][1], (1.5, 2))
+        self.assertIn('max_statement_time', executed[-1][0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import base64
+import gzip
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices.compression import accepted_encoding, maybe_compress
+from AWS_Lambda_Microservices.Account_Service import lambda_handler
+
+LARGE_RESULT = [{'account_id': i, 'customer_name': f'Customer {i:06d}', 'customer_id': i} for i in range(1000)]
+
+class TestCompression(unittest.TestCase):
+
+    def test_accepted_encoding_negotiation(self):
+        cases = [
+            ({}, None),
+            ({'headers': None}, None),
+            ({'headers': {'accept-encoding': 'gzip, deflate, br'}}, 'gzip'),
+            ({'headers': {'Accept-Encoding': 'deflate'}}, 'deflate'),
+            ({'headers': {'Accept-Encoding': 'gzip;q=0.5, deflate'}}, 'deflate'),
+            ({'headers': {'Accept-Encoding': 'gzip;q=0, deflate;q=0'}}, None),
+            ({'headers': {'Accept-Encoding': 'br'}}, None),
+            ({'headers': {'Accept-Encoding': '*'}}, 'gzip'),
+            ({'headers': {'Accept-Encoding': 'identity'}}, None),
+        ]
+        for event, expected in cases:
+            with self.subTest(event=event):
+                self.assertEqual(accepted_encoding(event), expected)
+
+    def test_small_payload_left_uncompressed(self):
+        event = {'headers': {'Accept-Encoding': 'gzip'}}
+        result = {'message': 'Balance updated successfully'}
+
+        self.assertIs(maybe_compress(event, result, threshold=1024), result)
+
+    def test_no_accept_encoding_left_uncompressed(self):
+        self.assertIs(maybe_compress({}, LARGE_RESULT, threshold=1), LARGE_RESULT)
+
+    def test_large_payload_gzip_proxy_response(self):
+        event = {'headers': {'Accept-Encoding': 'gzip, deflate'}}
+
+        response = maybe_compress(event, LARGE_RESULT, threshold=1024)
+
+        self.assertTrue(response['isBase64Encoded'])
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+        body = gzip.decompress(base64.b64decode(response['body']))
+        self.assertEqual(json.loads(body), LARGE_RESULT)
+        self.assertLess(len(response['body']), len(json.dumps(LARGE_RESULT)))
+
+    def test_large_payload_deflate_proxy_response(self):
+        event = {'headers': {'Accept-Encoding': 'deflate'}}
+
+        response = maybe_compress(event, LARGE_RESULT, threshold=1024)
+
+        self.assertEqual(response['headers']['Content-Encoding'], 'deflate')
+        self.assertEqual(json.loads(zlib.decompress(base64.b64decode(response['body']))), LARGE_RESULT)
+
+    @patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+    def test_get_accounts_compressed_through_api_gateway(self, mock_connect):
+        """Test that get_accounts honours Accept-Encoding on proxy events"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = LARGE_RESULT
+        mock_cursor.fetchone.return_value = {
+            'max_account_id': 999,
+            'accounts_updated_at': datetime(2024, 1, 1, 9, 0, 0),
+            'customers_updated_at': datetime(2024, 1, 1, 9, 0, 0),
+            'checked_at': datetime(2024, 1, 2, 9, 0, 0)
+        }
+
+        event = {
+            'headers': {'Accept-Encoding': 'gzip, deflate'},
+            'body': json.dumps({'action': 'get_accounts'})
+        }
+        response = lambda_handler(event, None)
+
+        self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+        self.assertIn('ETag', response['headers'])
+        self.assertEqual(json.loads(gzip.decompress(base64.b64decode(response['body']))), LARGE_RESULT)
+
+    def test_not_modified_response_left_alone(self):
+        event = {'headers': {'Accept-Encoding': 'gzip'}}
+        response = {'statusCode': 304, 'headers': {'ETag': '"abc"'}, 'body': ''}
+
+        self.assertIs(maybe_compress(event, response, threshold=0), response)
+
+if __name__ == '__main__':
+    unittest.main()
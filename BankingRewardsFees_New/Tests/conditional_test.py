@@ -0,0 +1,151 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import json
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices.conditional import etag_matches, make_etag, with_if_none_match
+from AWS_Lambda_Microservices.Account_Service import lambda_handler, GET_ACCOUNTS_SQL
+
+VERSION_ROW = {
+    'max_account_id': 2,
+    'accounts_updated_at': datetime(2024, 1, 1, 9, 0, 0),
+    'customers_updated_at': datetime(2024, 1, 1, 8, 0, 0),
+    'checked_at': datetime(2024, 1, 1, 10, 0, 0)
+}
+
+ACCOUNTS = [
+    {'account_id': 1, 'customer_name': 'John Doe', 'customer_id': 100},
+    {'account_id': 2, 'customer_name': 'Jane Doe', 'customer_id': 101}
+]
+
+class TestConditionalHelpers(unittest.TestCase):
+
+    def test_etag_matching(self):
+        etag = make_etag(1, 'a')
+        self.assertTrue(etag_matches(etag, etag))
+        self.assertTrue(etag_matches(f'"other", W/{etag}', etag))
+        self.assertTrue(etag_matches('*', etag))
+        self.assertFalse(etag_matches('"other"', etag))
+        self.assertFalse(etag_matches(None, etag))
+        self.assertFalse(etag_matches(etag, None))
+
+    def test_etag_changes_with_content(self):
+        self.assertNotEqual(make_etag(1, Decimal('10.00')), make_etag(1, Decimal('10.01')))
+
+    def test_with_if_none_match(self):
+        self.assertEqual(with_if_none_match({'action': 'x'}, {'action': 'x'}), {'action': 'x'})
+        self.assertEqual(with_if_none_match({'headers': {}}, {'action': 'x'}),
+                         {'action': 'x', 'if_none_match': None})
+        self.assertEqual(with_if_none_match({'headers': {'if-none-match': '"v1"'}}, {'action': 'x'}),
+                         {'action': 'x', 'if_none_match': '"v1"'})
+
+class TestConditionalAccountReads(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('AWS_Lambda_Microservices.Account_Service.mysql.connector.connect')
+        mock_connect = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        mock_connect.return_value = self.mock_conn
+        self.mock_conn.cursor.return_value = self.mock_cursor
+
+    def api_event(self, body, if_none_match=None):
+        headers = {'Content-Type': 'application/json'}
+        if if_none_match:
+            headers['If-None-Match'] = if_none_match
+        return {'headers': headers, 'body': json.dumps(body)}
+
+    def executed_sql(self):
+        return [c[0][0] for c in self.mock_cursor.execute.call_args_list]
+
+    def test_get_accounts_returns_etag(self):
+        self.mock_cursor.fetchone.return_value = VERSION_ROW
+        self.mock_cursor.fetchall.return_value = ACCOUNTS
+
+        response = lambda_handler(self.api_event({'action': 'get_accounts'}), None)
+
+        self.assertEqual(response['statusCode'], 200)
+        self.assertTrue(response['headers']['ETag'].startswith('"'))
+        self.assertEqual(response['headers']['Vary'], 'Accept-Encoding')
+        self.assertEqual(json.loads(response['body']), ACCOUNTS)
+
+    def test_get_accounts_not_modified_skips_list_query(self):
+        """Test that a matching If-None-Match answers 304 without reading the rows"""
+        self.mock_cursor.fetchone.return_value = VERSION_ROW
+        self.mock_cursor.fetchall.return_value = ACCOUNTS
+        etag = lambda_handler(self.api_event({'action': 'get_accounts'}), None)['headers']['ETag']
+        self.mock_cursor.execute.reset_mock()
+
+        response = lambda_handler(self.api_event({'action': 'get_accounts'}, if_none_match=etag), None)
+
+        self.assertEqual(response, {'statusCode': 304, 'headers': {'ETag': etag, 'Vary': 'Accept-Encoding'}, 'body': ''})
+        self.assertNotIn(GET_ACCOUNTS_SQL, self.executed_sql())
+        self.mock_conn.close.assert_called()
+
+    def test_get_accounts_etag_changes_after_update(self):
+        self.mock_cursor.fetchone.return_value = VERSION_ROW
+        self.mock_cursor.fetchall.return_value = ACCOUNTS
+        etag = lambda_handler(self.api_event({'action': 'get_accounts'}), None)['headers']['ETag']
+
+        self.mock_cursor.fetchone.return_value = {**VERSION_ROW, 'customers_updated_at': datetime(2024, 1, 1, 9, 30, 0)}
+        response = lambda_handler(self.api_event({'action': 'get_accounts'}, if_none_match=etag), None)
+
+        self.assertEqual(response['statusCode'], 200)
+        self.assertNotEqual(response['headers']['ETag'], etag)
+
+    def test_get_accounts_etag_differs_per_format(self):
+        """Test that a rows ETag does not validate a columns response, or the reverse"""
+        self.mock_cursor.fetchone.return_value = VERSION_ROW
+        self.mock_cursor.fetchall.return_value = []
+        self.mock_cursor.column_names = ('account_id',)
+        rows_etag = lambda_handler(self.api_event({'action': 'get_accounts'}), None)['headers']['ETag']
+
+        response = lambda_handler(self.api_event({'action': 'get_accounts', 'format': 'columns'},
+                                                 if_none_match=rows_etag), None)
+
+        self.assertEqual(response['statusCode'], 200)
+        self.assertNotEqual(response['headers']['ETag'], rows_etag)
+
+    def test_get_accounts_no_etag_for_change_in_current_second(self):
+        """Test that no ETag is issued while updated_at cannot tell changes apart"""
+        self.mock_cursor.fetchone.return_value = {**VERSION_ROW, 'accounts_updated_at': VERSION_ROW['checked_at']}
+        self.mock_cursor.fetchall.return_value = ACCOUNTS
+
+        response = lambda_handler(self.api_event({'action': 'get_accounts'}, if_none_match='*'), None)
+
+        self.assertEqual(response['statusCode'], 200)
+        self.assertNotIn('ETag', response['headers'])
+
+    def test_get_account_details_conditional(self):
+        self.mock_cursor.fetchone.return_value = {
+            'account_id': 1, 'customer_id': 100, 'balance': Decimal('500.50'),
+            'created_at': datetime(2023, 1, 1, 12, 0, 0), 'updated_at': datetime(2023, 1, 2, 12, 0, 0),
+            'customer_name': 'John Doe', 'customer_tier': 'gold'
+        }
+        event = self.api_event({'action': 'get_account_details', 'account_id': 1})
+
+        first = lambda_handler(event, None)
+        second = lambda_handler(self.api_event({'action': 'get_account_details', 'account_id': 1},
+                                               if_none_match=first['headers']['ETag']), None)
+
+        self.assertEqual(json.loads(first['body'])['balance'], 500.5)
+        self.assertEqual(second['statusCode'], 304)
+
+    def test_direct_invocation_unchanged(self):
+        """Test that events without headers keep the plain response format"""
+        self.mock_cursor.fetchall.return_value = ACCOUNTS
+
+        result = lambda_handler({'action': 'get_accounts'}, None)
+
+        self.assertEqual(result, ACCOUNTS)
+        self.assertEqual(self.executed_sql(), [GET_ACCOUNTS_SQL])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import os
+import sys
+import time
+import mysql.connector
+from decimal import Decimal
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices import db, async_handlers
+from AWS_Lambda_Microservices import Account_Service, Fee_Calculation_Service, router
+
+# The slow-query test needs a disposable local MySQL, e.g.
+#   MYSQL_TEST_HOST=127.0.0.1 MYSQL_TEST_USER=root python -m pytest Tests/deadline_test.py
+MYSQL_TEST_HOST = os.environ.get('MYSQL_TEST_HOST')
+
+class FakeContext:
+    """Lambda context whose remaining time counts down in real time"""
+    def __init__(self, remaining_ms):
+        self.deadline = time.monotonic() + remaining_ms / 1000
+
+    def get_remaining_time_in_millis(self):
+        return int((self.deadline - time.monotonic()) * 1000)
+
+class TestDeadlines(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_conn.cursor.return_value = self.mock_cursor
+        patcher = patch('AWS_Lambda_Microservices.db.mysql.connector.connect', return_value=self.mock_conn)
+        self.mock_connect = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_remaining_budget(self):
+        self.assertIsNone(db.remaining_budget_ms(None))
+        budget = db.remaining_budget_ms(FakeContext(3000))
+        self.assertTrue(3000 - db.DEADLINE_MARGIN_MS - 50 <= budget <= 3000 - db.DEADLINE_MARGIN_MS)
+
+    def test_connection_and_statements_bounded_by_remaining_time(self):
+        self.mock_cursor.fetchone.return_value = {'balance': Decimal('100.00'), 'customer_tier': 'gold'}
+
+        result = Fee_Calculation_Service.lambda_handler({'account_id': 1}, FakeContext(3000))
+
+        self.assertEqual(result['calculated_fee'], 15.00)
+        self.assertEqual(self.mock_connect.call_args.kwargs['connection_timeout'], 3)
+        sql, (max_execution_ms, lock_wait_seconds) = self.mock_cursor.execute.call_args_list[0].args
+        self.assertIn('max_execution_time', sql)
+        self.assertTrue(2400 <= max_execution_ms <= 2500)
+        self.assertEqual(lock_wait_seconds, 3)
+
+    def test_no_context_keeps_plain_connection(self):
+        self.mock_cursor.fetchone.return_value = {'balance': Decimal('100.00'), 'customer_tier': 'gold'}
+
+        Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+
+        self.assertNotIn('connection_timeout', self.mock_connect.call_args.kwargs)
+        self.assertNotIn('max_execution_time', self.mock_cursor.execute.call_args_list[0].args[0])
+
+    def test_spent_budget_fails_fast_without_connecting(self):
+        result = Account_Service.lambda_handler({'action': 'get_account_details', 'account_id': 1}, FakeContext(300))
+
+        self.assertEqual(result, {'error': 'Request timed out: no time left for database work'})
+        self.mock_connect.assert_not_called()
+
+    def test_query_timeout_is_reported_as_timeout(self):
+        def execute(sql, params=()):
+            if 'max_execution_time' not in sql:
+                raise mysql.connector.Error(
+                    msg='Query execution was interrupted, maximum statement execution time exceeded', errno=3024)
+        self.mock_cursor.execute.side_effect = execute
+
+        account = Account_Service.lambda_handler({'action': 'get_accounts'}, FakeContext(3000))
+        fee = Fee_Calculation_Service.lambda_handler({'account_id': 1}, FakeContext(3000))
+
+        self.assertTrue(account['error'].startswith('Request timed out: 3024'))
+        self.assertTrue(fee['error'].startswith('Request timed out: 3024'))
+
+    def test_other_database_errors_unchanged(self):
+        self.mock_cursor.execute.side_effect = [None, mysql.connector.Error(msg='Table missing', errno=1146)]
+
+        result = Account_Service.lambda_handler({'action': 'get_accounts'}, FakeContext(3000))
+
+        self.assertTrue(result['error'].startswith('Database error:'))
+
+    def test_mariadb_statement_timeout_fallback(self):
+        self.mock_cursor.execute.side_effect = [
+            mysql.connector.Error(msg="Unknown system variable 'max_execution_time'", errno=1193), None
+        ]
+
+        db.set_statement_timeouts(self.mock_conn, 2500)
+
+        sql, params = self.mock_cursor.execute.call_args.args
+        self.assertIn('max_statement_time', sql)
+        self.assertEqual(params, (2.5, 3))
+        self.mock_cursor.close.assert_called_once()
+
+    @patch('AWS_Lambda_Microservices.router.get_pooled_connection')
+    def test_router_sets_session_timeouts_on_pooled_connections(self, mock_get_pooled):
+        mock_get_pooled.return_value = self.mock_conn
+        self.mock_cursor.fetchone.return_value = {'balance': Decimal('15000.00')}
+
+        result = router.lambda_handler({'action': 'calculate_reward', 'account_id': 2}, FakeContext(3000))
+
+        self.assertEqual(result['calculated_reward'], 300.00)
+        self.assertIn('max_execution_time', self.mock_cursor.execute.call_args_list[0].args[0])
+        self.mock_connect.assert_not_called()
+        self.mock_conn.close.assert_called_once()
+
+    def test_async_handler_gives_up_at_deadline(self):
+        async def slow_action(event, body, context=None):
+            await asyncio.sleep(2)
+
+        with patch('AWS_Lambda_Microservices.async_handlers.handle_action', new=slow_action):
+            started = time.monotonic()
+            result = async_handlers.lambda_handler({'action': 'get_accounts'}, FakeContext(db.DEADLINE_MARGIN_MS + 200))
+
+        self.assertTrue(result['error'].startswith('Request timed out'))
+        self.assertLess(time.monotonic() - started, 1.0)
+
+@unittest.skipUnless(MYSQL_TEST_HOST, 'set MYSQL_TEST_HOST to run against a local MySQL')
+class TestSlowQueryDeadline(unittest.TestCase):
+
+    def test_slow_query_stopped_before_deadline(self):
+        """A deliberately slow SELECT is interrupted by max_execution_time, not by the Lambda runtime"""
+        settings = {
+            'host': MYSQL_TEST_HOST,
+            'user': os.environ.get('MYSQL_TEST_USER', 'root'),
+            'password': os.environ.get('MYSQL_TEST_PASSWORD', ''),
+            'database': 'information_schema',
+            'autocommit': True
+        }
+        context = FakeContext(db.DEADLINE_MARGIN_MS + 1000)
+        get_connection = db.deadline_connection(context, lambda: mysql.connector.connect(**settings))
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        started = time.monotonic()
+        with self.assertRaises(mysql.connector.Error) as raised:
+            cursor.execute("""
+                SELECT COUNT(*) FROM information_schema.columns a
+                CROSS JOIN information_schema.columns b
+                CROSS JOIN information_schema.columns c
+            """)
+            cursor.fetchall()
+
+        self.assertTrue(db.is_timeout_error(raised.exception))
+        self.assertGreater(context.get_remaining_time_in_millis(), 0)
+        self.assertLess(time.monotonic() - started, 1.5)
+        conn.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,253 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices import Account_Service, Fee_Calculation_Service, Rewards_Calculation_Service, router
+from AWS_Lambda_Microservices.result_cache import LocalRedis, ResultCache
+
+VERSIONS = (datetime(2026, 10, 1, 9, 30), datetime(2026, 9, 1, 8, 0))
+RESULT = {'account_id': 1, 'calculated_fee': 5.0, 'customer_tier': 'gold', 'balance': 7500.0}
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make_cache(self, **kwargs):
+        return ResultCache('fee', 1, **{'max_entries': 100, 'ttl_seconds': 30, 'clock': self.clock, **kwargs})
+
+    def test_fresh_within_ttl(self):
+        cache = self.make_cache()
+        cache.store(1, VERSIONS, RESULT)
+
+        self.assertEqual(cache.fresh('1'), RESULT)
+        self.clock.now += 30
+        self.assertIsNone(cache.fresh(1))
+
+    def test_validate_requires_matching_versions(self):
+        cache = self.make_cache()
+        cache.store(1, VERSIONS, RESULT)
+        self.clock.now += 60
+
+        self.assertEqual(cache.validate(1, VERSIONS), RESULT)
+        # Validation makes the entry fresh again
+        self.assertEqual(cache.fresh(1), RESULT)
+        self.assertIsNone(cache.validate(1, (datetime(2026, 10, 2), VERSIONS[1])))
+        self.assertEqual(cache.stats()['validated_hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_lru_eviction(self):
+        cache = self.make_cache(max_entries=2)
+        cache.store(1, VERSIONS, RESULT)
+        cache.store(2, VERSIONS, RESULT)
+        cache.fresh(1)
+        cache.store(3, VERSIONS, RESULT)
+
+        self.assertEqual(list(cache.entries), ['1', '3'])
+        self.assertEqual(cache.metrics['evictions'], 1)
+
+    def test_disabled_cache(self):
+        cache = self.make_cache(max_entries=0)
+        cache.store(1, VERSIONS, RESULT)
+
+        self.assertIsNone(cache.fresh(1))
+        self.assertIsNone(cache.validate(1, VERSIONS))
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_shared_store_between_containers(self):
+        """Test that an entry validated in one container is fresh in another"""
+        shared = LocalRedis(clock=self.clock)
+        first = self.make_cache(shared=shared)
+        second = self.make_cache(shared=shared)
+
+        first.store(1, VERSIONS, RESULT)
+
+        self.assertEqual(second.fresh(1), RESULT)
+        self.assertEqual(second.metrics['shared_hits'], 1)
+        self.assertIn('1', second.entries)
+
+    def test_rule_version_isolates_shared_entries(self):
+        shared = LocalRedis(clock=self.clock)
+        self.make_cache(shared=shared).store(1, VERSIONS, RESULT)
+
+        newer_rule = ResultCache('fee', 2, max_entries=100, ttl_seconds=30, shared=shared, clock=self.clock)
+
+        self.assertIsNone(newer_rule.fresh(1))
+        self.assertIsNone(newer_rule.validate(1, VERSIONS))
+
+    def test_shared_store_errors_are_ignored(self):
+        shared = MagicMock()
+        shared.get.side_effect = ConnectionError('cache down')
+        shared.set.side_effect = ConnectionError('cache down')
+        cache = self.make_cache(shared=shared)
+
+        cache.store(1, VERSIONS, RESULT)
+        self.clock.now += 60
+
+        self.assertIsNone(cache.fresh(1))
+        self.assertEqual(cache.validate(1, VERSIONS), RESULT)
+        self.assertEqual(cache.metrics['shared_errors'], 3)
+
+    def test_forget_drops_local_and_shared_entries(self):
+        shared = LocalRedis(clock=self.clock)
+        first = self.make_cache(shared=shared)
+        second = self.make_cache(shared=shared)
+        first.store(1, VERSIONS, RESULT)
+        first.store(2, VERSIONS, RESULT)
+
+        second.forget([1])
+
+        self.assertIsNone(second.fresh(1))
+        self.assertIsNone(shared.get(first.shared_key(1)))
+        self.assertEqual(second.fresh(2), RESULT)
+        # The writer's own container drops its copy the same way
+        first.forget([1])
+        self.assertIsNone(first.fresh(1))
+
+    def test_forget_without_local_cache_clears_shared_store(self):
+        """Test that a writer with RESULT_CACHE_SIZE=0 (the Account Lambda) still invalidates readers"""
+        shared = LocalRedis(clock=self.clock)
+        reader = self.make_cache(shared=shared)
+        writer = self.make_cache(shared=shared, max_entries=0)
+        reader.store(1, VERSIONS, RESULT)
+
+        writer.forget([1])
+
+        self.assertIsNone(shared.get(reader.shared_key(1)))
+        reader.entries.clear()
+        self.assertIsNone(reader.fresh(1))
+
+    def test_hit_ratios(self):
+        cache = self.make_cache()
+        cache.validate(1, VERSIONS)
+        cache.store(1, VERSIONS, RESULT)
+        cache.fresh(1)
+        cache.fresh(1)
+
+        stats = cache.stats()
+        self.assertEqual(stats['hit_ratio'], round(2 / 3, 4))
+        self.assertEqual(stats['fresh_hit_ratio'], round(2 / 3, 4))
+
+class TestCachedCalculations(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_conn.cursor.return_value = self.mock_cursor
+        patcher = patch('AWS_Lambda_Microservices.db.mysql.connector.connect', return_value=self.mock_conn)
+        self.mock_connect = patcher.start()
+        self.addCleanup(patcher.stop)
+        for target, name in ((Fee_Calculation_Service, 'fee_cache'), (Rewards_Calculation_Service, 'reward_cache')):
+            cache_patcher = patch.object(target, name, ResultCache(name, 1, max_entries=100, ttl_seconds=30, clock=self.clock))
+            cache_patcher.start()
+            self.addCleanup(cache_patcher.stop)
+
+    def fee_inputs(self, balance, customer_tier='gold'):
+        return {'balance': Decimal(balance), 'customer_tier': customer_tier}
+
+    def test_repeated_fee_skips_database(self):
+        self.mock_cursor.fetchone.return_value = self.fee_inputs('7500.00')
+
+        first = Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+        second = Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+
+        self.assertEqual(first, second)
+        self.assertEqual(second['calculated_fee'], 5.00)
+        self.mock_connect.assert_called_once()
+
+    @patch('AWS_Lambda_Microservices.Fee_Calculation_Service.calculate_fee', wraps=Fee_Calculation_Service.calculate_fee)
+    def test_expired_entry_revalidated_without_calculation(self, mock_calculate):
+        self.mock_cursor.fetchone.return_value = self.fee_inputs('7500.00')
+
+        Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+        self.clock.now += 60
+        result = Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+
+        self.assertEqual(result['calculated_fee'], 5.00)
+        self.assertEqual(self.mock_connect.call_count, 2)
+        mock_calculate.assert_called_once()
+
+    def test_changed_account_is_recalculated(self):
+        self.mock_cursor.fetchone.side_effect = [
+            self.fee_inputs('7500.00'),
+            self.fee_inputs('1000.00')
+        ]
+
+        Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+        self.clock.now += 60
+        result = Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+
+        self.assertEqual(result['calculated_fee'], 15.00)
+        self.assertEqual(result['balance'], 1000.00)
+
+    def test_two_writes_in_the_same_second_are_not_confused(self):
+        """Test that results are versioned by their inputs, not by the one-second updated_at"""
+        # Both writes leave the same updated_at behind; only the balance tells them apart
+        self.mock_cursor.fetchone.side_effect = [
+            self.fee_inputs('7500.00'),
+            self.fee_inputs('1000.00'),
+            self.fee_inputs('1000.00', customer_tier='premium')
+        ]
+
+        Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+        self.clock.now += 60
+        after_first_write = Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+        self.clock.now += 60
+        after_second_write = Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+
+        self.assertEqual(after_first_write['calculated_fee'], 15.00)
+        self.assertEqual(after_second_write['calculated_fee'], 0.00)
+        self.assertEqual(Fee_Calculation_Service.fee_cache.metrics['validated_hits'], 0)
+
+    def test_reward_versioned_by_balance_only(self):
+        self.mock_cursor.fetchone.return_value = {'balance': Decimal('15000.00')}
+
+        Rewards_Calculation_Service.lambda_handler({'account_id': 2}, None)
+        result = Rewards_Calculation_Service.lambda_handler({'account_id': 2}, None)
+
+        self.assertEqual(result['calculated_reward'], 300.00)
+        self.mock_connect.assert_called_once()
+        self.assertEqual(Rewards_Calculation_Service.reward_cache.entries['2'][0], ('15000.00',))
+
+    def test_update_balance_forgets_cached_results(self):
+        """Test that a committed balance change is not followed by a fresh hit on the old result"""
+        self.mock_cursor.fetchone.side_effect = [{'balance': Decimal('15000.00')}, {'balance': Decimal('100.00')}]
+        Rewards_Calculation_Service.lambda_handler({'account_id': 2}, None)
+
+        write_conn = MagicMock()
+        write_conn.cursor.return_value.rowcount = 1
+        write_conn.cursor.return_value.fetchall.return_value = [(2, Decimal('100.00'), 'gold')]
+        Account_Service.update_balance({'account_id': 2, 'new_balance': 100.00}, lambda: write_conn)
+
+        result = Rewards_Calculation_Service.lambda_handler({'account_id': 2}, None)
+        self.assertEqual(result['calculated_reward'], 1.00)
+        self.assertEqual(self.mock_connect.call_count, 2)
+
+    def test_cache_stats_action(self):
+        self.mock_cursor.fetchone.return_value = self.fee_inputs('7500.00')
+        Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+        Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+
+        fee_stats = Fee_Calculation_Service.lambda_handler({'action': 'cache_stats'}, None)
+        router_stats = router.lambda_handler({'action': 'cache_stats'}, None)
+
+        self.assertEqual(fee_stats['fee']['hit_ratio'], 0.5)
+        self.assertEqual(router_stats['fee'], fee_stats['fee'])
+        self.assertEqual(router_stats['reward']['hit_ratio'], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
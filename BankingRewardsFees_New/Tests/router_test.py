@@ -0,0 +1,162 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import mysql.connector
+from decimal import Decimal
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices import db, router
+from AWS_Lambda_Microservices.router import lambda_handler, coalescing_key, ROUTES
+
+class TestRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_conn.cursor.return_value = self.mock_cursor
+        patcher = patch('AWS_Lambda_Microservices.router.get_pooled_connection', return_value=self.mock_conn)
+        self.mock_get_pooled = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_routes_cover_all_services(self):
+        """Test that one dispatch table serves account, fee and reward operations"""
+        for action in ('get_accounts', 'get_account_details', 'update_balance', 'calculate_fee', 'calculate_reward'):
+            self.assertIn(action, ROUTES)
+
+    def test_account_action(self):
+        self.mock_cursor.fetchall.return_value = [{'account_id': 1, 'customer_name': 'John Doe', 'customer_id': 100}]
+
+        result = lambda_handler({'body': '{"action": "get_accounts"}'}, None)
+
+        self.assertEqual(result, [{'account_id': 1, 'customer_name': 'John Doe', 'customer_id': 100}])
+        self.mock_conn.close.assert_called_once()
+
+    def test_fee_and_reward_actions_share_the_pool(self):
+        self.mock_cursor.fetchone.side_effect = [
+            {'balance': Decimal('7500.00'), 'customer_tier': 'gold'},
+            {'balance': Decimal('15000.00')}
+        ]
+
+        fee = lambda_handler({'action': 'calculate_fee', 'account_id': 1}, None)
+        reward = lambda_handler({'action': 'calculate_reward', 'account_id': 2}, None)
+
+        self.assertEqual(fee['calculated_fee'], 5.00)
+        self.assertEqual(reward['calculated_reward'], 300.00)
+        self.assertEqual(self.mock_get_pooled.call_count, 2)
+        self.assertEqual(self.mock_conn.close.call_count, 2)
+
+    @patch('AWS_Lambda_Microservices.db.POOL_SIZE', 3)
+    def test_warmup_fills_the_pool(self):
+        """Test that warmup holds POOL_SIZE connections at once and primes every service"""
+        self.mock_cursor.fetchall.return_value = []
+
+        result = lambda_handler({'action': 'warmup'}, None)
+
+        self.assertTrue(result['warmed'])
+        self.assertEqual(result['connections'], 3)
+        self.assertEqual(self.mock_get_pooled.call_count, 3)
+        self.assertEqual(self.mock_conn.close.call_count, 3)
+        self.assertEqual(result['statements'], 6)
+
+    def test_concurrent_identical_reads_share_one_query(self):
+        """Test that users looking at the same account at once trigger one lookup"""
+        self.mock_cursor.fetchone.side_effect = lambda: time.sleep(0.1) or {'balance': Decimal('7500.00'), 'customer_tier': 'gold'}
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            fees = list(executor.map(lambda _: lambda_handler({'action': 'calculate_fee', 'account_id': 1}, None), range(6)))
+
+        self.assertEqual([fee['calculated_fee'] for fee in fees], [5.00] * 6)
+        self.assertEqual(self.mock_get_pooled.call_count, 1)
+        self.mock_conn.close.assert_called_once()
+
+    def test_coalescing_key(self):
+        self.assertEqual(coalescing_key('get_account_details', {'account_id': 7}), ('get_account_details', '7'))
+        self.assertEqual(coalescing_key('calculate_fee', {'account_id': 7, 'if_none_match': '"abc"'}),
+                         ('calculate_fee', '7', '"abc"'))
+        self.assertIsNone(coalescing_key('update_balance', {'account_id': 7}))
+        self.assertIsNone(coalescing_key('get_account_details', {}))
+        with patch.object(router, 'COALESCING_ENABLED', False):
+            self.assertIsNone(coalescing_key('get_account_details', {'account_id': 7}))
+
+    def test_invalid_action(self):
+        result = lambda_handler({'action': 'calculate_tax'}, None)
+
+        self.assertIn('Invalid action: calculate_tax', result['error'])
+        self.assertIn('calculate_reward', result['error'])
+        self.mock_get_pooled.assert_not_called()
+
+    def test_connection_returned_to_pool_on_error(self):
+        """Test that a failing operation still hands its connection back"""
+        self.mock_cursor.execute.side_effect = mysql.connector.Error("Lost connection")
+
+        result = lambda_handler({'action': 'get_account_details', 'account_id': 1}, None)
+
+        self.assertEqual(result['error'], 'Database error: Lost connection')
+        self.mock_conn.close.assert_called_once()
+
+    def test_connection_returned_once_when_error_follows_close(self):
+        """Test that a connection the operation already closed is not handed back twice"""
+        self.mock_cursor.fetchone.return_value = {'balance': Decimal('100.00'), 'customer_tier': 'gold'}
+
+        with patch('AWS_Lambda_Microservices.Fee_Calculation_Service.fee_cache') as mock_cache:
+            mock_cache.fresh.return_value = None
+            mock_cache.validate.return_value = None
+            mock_cache.store.side_effect = RuntimeError('cache full')
+            result = lambda_handler({'action': 'calculate_fee', 'account_id': 1}, None)
+
+        self.assertIn('cache full', result['error'])
+        self.mock_conn.close.assert_called_once()
+
+    def test_router_waits_no_longer_than_the_remaining_time(self):
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = 800
+        self.mock_cursor.fetchone.return_value = None
+
+        lambda_handler({'action': 'calculate_reward', 'account_id': 1}, context)
+
+        self.mock_get_pooled.assert_called_once_with(300)
+
+class TestSharedPool(unittest.TestCase):
+
+    def setUp(self):
+        db._pool = None
+
+    def tearDown(self):
+        db._pool = None
+
+    @patch('AWS_Lambda_Microservices.db.pooling.MySQLConnectionPool')
+    def test_pool_created_once_per_container(self, mock_pool_class):
+        db.get_pooled_connection()
+        db.get_pooled_connection()
+
+        mock_pool_class.assert_called_once()
+        self.assertEqual(mock_pool_class.return_value.get_connection.call_count, 2)
+        self.assertEqual(mock_pool_class.call_args.kwargs['pool_size'], db.POOL_SIZE)
+
+    @patch('AWS_Lambda_Microservices.db.time.sleep')
+    @patch('AWS_Lambda_Microservices.db.pooling.MySQLConnectionPool')
+    def test_exhausted_pool_is_retried(self, mock_pool_class, mock_sleep):
+        """Test that a request waits for a connection to come back instead of failing at once"""
+        conn = MagicMock()
+        mock_pool_class.return_value.get_connection.side_effect = [
+            mysql.connector.errors.PoolError('Failed getting connection; pool exhausted'),
+            conn
+        ]
+
+        self.assertIs(db.get_pooled_connection(wait_ms=1000), conn)
+        mock_sleep.assert_called_once()
+
+    @patch('AWS_Lambda_Microservices.db.pooling.MySQLConnectionPool')
+    def test_exhausted_pool_gives_up_after_wait(self, mock_pool_class):
+        mock_pool_class.return_value.get_connection.side_effect = mysql.connector.errors.PoolError('pool exhausted')
+
+        with self.assertRaises(mysql.connector.errors.PoolError):
+            db.get_pooled_connection(wait_ms=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices.db import DeadlineExceeded
+from AWS_Lambda_Microservices.singleflight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+
+    def run_concurrently(self, func, count):
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [executor.submit(func) for _ in range(count)]
+            return [future.exception() or future.result() for future in futures]
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def lookup():
+            calls.append(1)
+            release.wait(1)
+            return {'account_id': 1}
+
+        def caller():
+            return flight.do(('get_account_details', '1'), lookup)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(caller) for _ in range(8)]
+            while flight.metrics['coalesced'] < 7:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.metrics, {'executed': 1, 'coalesced': 7})
+        self.assertEqual(flight.calls, {})
+
+    def test_different_keys_run_separately(self):
+        flight = SingleFlight()
+
+        self.assertEqual(flight.do(('calculate_fee', '1'), lambda: 1), 1)
+        self.assertEqual(flight.do(('calculate_fee', '2'), lambda: 2), 2)
+        self.assertEqual(flight.do(('calculate_fee', '1'), lambda: 3), 3)
+        self.assertEqual(flight.metrics['executed'], 3)
+
+    def test_error_is_shared(self):
+        flight = SingleFlight()
+
+        def failing():
+            time.sleep(0.05)
+            raise RuntimeError('Lost connection')
+
+        results = self.run_concurrently(lambda: flight.do('key', failing), 4)
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(flight.metrics['executed'], 1)
+        self.assertEqual(flight.do('key', lambda: 'recovered'), 'recovered')
+
+    def test_waiter_gives_up_at_timeout(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        leader = threading.Thread(target=flight.do, args=('key', lambda: release.wait(1)))
+        leader.start()
+        while 'key' not in flight.calls:
+            time.sleep(0.001)
+
+        with self.assertRaises(DeadlineExceeded):
+            flight.do('key', lambda: None, timeout=0.05)
+
+        release.set()
+        leader.join()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices import Fee_Calculation_Service
+from AWS_Lambda_Microservices.tier_map import (
+    DENSE_ID_LIMIT, GET_TIER_SQL, LOAD_TIERS_SQL, REFRESH_TIERS_SQL, TIER_MAP_OVERLAP_SECONDS, TierMap
+)
+
+# When the bulk load's statement started
+LOADED_AT = datetime(2026, 10, 4, 0, 0)
+
+CUSTOMERS = [
+    {'customer_id': 100, 'tier': 'premium', 'updated_at': datetime(2026, 10, 1, 9, 0), 'read_at': LOADED_AT},
+    {'customer_id': 200, 'tier': 'gold', 'updated_at': datetime(2026, 10, 3, 12, 0), 'read_at': LOADED_AT},
+    {'customer_id': 300, 'tier': 'basic', 'updated_at': None, 'read_at': LOADED_AT},
+]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def tier_cursor(*result_sets):
+    """Dictionary cursor whose fetchmany serves each result set, then an empty batch"""
+    cursor = MagicMock()
+    batches = []
+    for rows in result_sets:
+        batches.extend([rows, []])
+    cursor.fetchmany.side_effect = batches
+    return cursor
+
+class TestTierMap(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tiers = TierMap(refresh_seconds=5, clock=self.clock)
+
+    def test_bulk_load_then_lookups_without_queries(self):
+        cursor = tier_cursor(CUSTOMERS)
+
+        self.assertEqual(self.tiers.tier(100, cursor), 'premium')
+        self.assertEqual(self.tiers.tier(300, cursor), 'basic')
+        self.assertEqual(self.tiers.tier(200, cursor), 'gold')
+
+        cursor.execute.assert_called_once_with(LOAD_TIERS_SQL)
+        self.assertEqual(len(self.tiers), 3)
+        self.assertEqual(self.tiers.watermark, LOADED_AT)
+        # One byte per customer id, three distinct tiers
+        self.assertEqual(self.tiers.codes.itemsize, 1)
+        self.assertEqual(self.tiers.tiers, [None, 'premium', 'gold', 'basic'])
+
+    def test_incremental_refresh_from_watermark(self):
+        refreshed_at = datetime(2026, 10, 5, 8, 0, 30)
+        changed = [{'customer_id': 100, 'tier': 'gold', 'updated_at': datetime(2026, 10, 5, 8, 0), 'read_at': refreshed_at}]
+        cursor = tier_cursor(CUSTOMERS, changed)
+        self.tiers.tier(100, cursor)
+
+        self.clock.now += 5
+        self.assertEqual(self.tiers.tier(100, cursor), 'gold')
+
+        cursor.execute.assert_called_with(REFRESH_TIERS_SQL, (LOADED_AT - timedelta(seconds=TIER_MAP_OVERLAP_SECONDS),))
+        self.assertEqual(self.tiers.watermark, refreshed_at)
+        self.assertEqual(len(self.tiers), 3)
+        self.assertEqual(self.tiers.metrics['rows_refreshed'], 1)
+
+    def test_refresh_starts_from_the_previous_read_not_the_newest_row(self):
+        """Test that a change committed after the load, with an older updated_at, is still read"""
+        late = [{'customer_id': 300, 'tier': 'premium', 'updated_at': LOADED_AT - timedelta(seconds=1),
+                 'read_at': LOADED_AT + timedelta(seconds=5)}]
+        newest = [{'customer_id': 200, 'tier': 'gold', 'updated_at': LOADED_AT, 'read_at': LOADED_AT}]
+        cursor = tier_cursor(CUSTOMERS[:2] + newest, late)
+        self.tiers.tier(200, cursor)
+
+        self.clock.now += 5
+        self.assertEqual(self.tiers.tier(300, cursor), 'premium')
+
+        (watermark,) = cursor.execute.call_args.args[1]
+        self.assertLessEqual(watermark, late[0]['updated_at'])
+
+    def test_empty_refresh_keeps_watermark(self):
+        cursor = tier_cursor(CUSTOMERS, [])
+        self.tiers.tier(100, cursor)
+
+        self.clock.now += 5
+        self.tiers.tier(100, cursor)
+
+        self.assertEqual(self.tiers.watermark, LOADED_AT)
+
+    def test_codes_widen_past_255_tiers(self):
+        rows = [{'customer_id': i, 'tier': f'tier-{i}', 'updated_at': None, 'read_at': LOADED_AT} for i in range(1, 301)]
+        cursor = tier_cursor(rows)
+
+        self.assertEqual(self.tiers.tier(300, cursor), 'tier-300')
+        self.assertEqual(self.tiers.tier(7, cursor), 'tier-7')
+        self.assertEqual(self.tiers.codes.itemsize, 2)
+        self.assertEqual(len(self.tiers.codes), 301)
+        self.assertEqual(len(self.tiers), 300)
+
+    def test_unknown_customer_looked_up_by_primary_key(self):
+        cursor = tier_cursor(CUSTOMERS)
+        cursor.fetchone.side_effect = [{'customer_id': 400, 'tier': 'premium', 'updated_at': None}, None]
+
+        self.assertEqual(self.tiers.tier(400, cursor), 'premium')
+        self.assertEqual(self.tiers.tier(400, cursor), 'premium')
+        with self.assertRaises(KeyError):
+            self.tiers.tier(500, cursor)
+
+        cursor.execute.assert_called_with(GET_TIER_SQL, (500,))
+        self.assertEqual(self.tiers.metrics['misses'], 2)
+
+    def test_large_ids_kept_sparse(self):
+        cursor = tier_cursor([{'customer_id': DENSE_ID_LIMIT + 7, 'tier': 'gold', 'updated_at': None, 'read_at': LOADED_AT}])
+
+        self.assertEqual(self.tiers.tier(DENSE_ID_LIMIT + 7, cursor), 'gold')
+        self.assertEqual(len(self.tiers.codes), 0)
+
+class TestFeeWithTierMap(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_conn.cursor.return_value = self.mock_cursor
+        patcher = patch('AWS_Lambda_Microservices.db.mysql.connector.connect', return_value=self.mock_conn)
+        self.mock_connect = patcher.start()
+        self.addCleanup(patcher.stop)
+        for target in (patch.dict(os.environ, {'USE_TIER_MAP': 'true'}),
+                       patch.object(Fee_Calculation_Service, 'tier_map', TierMap(refresh_seconds=60))):
+            target.start()
+            self.addCleanup(target.stop)
+        self.mock_cursor.fetchmany.side_effect = [CUSTOMERS, []]
+
+    def test_fee_is_a_single_account_lookup(self):
+        self.mock_cursor.fetchone.side_effect = [
+            {'balance': Decimal('7500.00'), 'customer_id': 200},
+            {'balance': Decimal('7500.00'), 'customer_id': 100},
+        ]
+
+        gold = Fee_Calculation_Service.lambda_handler({'account_id': 1}, None)
+        premium = Fee_Calculation_Service.lambda_handler({'account_id': 2}, None)
+
+        self.assertEqual((gold['calculated_fee'], gold['customer_tier']), (5.00, 'gold'))
+        self.assertEqual((premium['calculated_fee'], premium['customer_tier']), (0.00, 'premium'))
+        executed = [call.args[0] for call in self.mock_cursor.execute.call_args_list]
+        self.assertEqual(executed, [Fee_Calculation_Service.GET_FEE_ACCOUNT_SQL, LOAD_TIERS_SQL,
+                                    Fee_Calculation_Service.GET_FEE_ACCOUNT_SQL])
+
+    def test_account_without_customer_not_found(self):
+        self.mock_cursor.fetchone.return_value = {'balance': Decimal('10.00'), 'customer_id': None}
+
+        result = Fee_Calculation_Service.lambda_handler({'account_id': 9}, None)
+
+        self.assertEqual(result, {'error': 'Account not found'})
+
+    def test_warmup_loads_the_map(self):
+        self.mock_cursor.fetchall.return_value = []
+
+        report = Fee_Calculation_Service.lambda_handler({'action': 'warmup'}, None)
+
+        self.assertEqual(report['tier_map_customers'], 3)
+        self.assertIn(Fee_Calculation_Service.GET_FEE_ACCOUNT_SQL,
+                      [call.args[0] for call in self.mock_cursor.execute.call_args_list])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from AWS_Lambda_Microservices import Account_Service, Fee_Calculation_Service, Rewards_Calculation_Service, warmup
+from AWS_Lambda_Microservices.warmup import WARMUP_KEY, is_warmup, warm_up
+
+# EventBridge scheduled event, as sent by a keep-warm rule
+WARMUP_RULE_ARN = 'arn:aws:events:us-west-2:123456789012:rule/keep-warm'
+SCHEDULED_EVENT = {'source': 'aws.events', 'detail-type': 'Scheduled Event',
+                   'resources': [WARMUP_RULE_ARN], 'detail': {}}
+
+class TestWarmup(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.mock_conn.cursor.return_value = self.mock_cursor
+        self.mock_cursor.fetchall.return_value = []
+        patcher = patch('AWS_Lambda_Microservices.db.mysql.connector.connect', return_value=self.mock_conn)
+        self.mock_connect = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch.dict(os.environ, {'WARMUP_RULE_ARNS': f'arn:aws:events:us-west-2:123456789012:rule/other, {WARMUP_RULE_ARN}'})
+    def test_is_warmup(self):
+        self.assertTrue(is_warmup({}, {'action': 'warmup'}))
+        self.assertTrue(is_warmup(SCHEDULED_EVENT, SCHEDULED_EVENT))
+        self.assertFalse(is_warmup({}, {'action': 'get_accounts'}))
+
+    @patch.dict(os.environ, {'WARMUP_RULE_ARNS': WARMUP_RULE_ARN})
+    def test_only_the_keep_warm_rule_is_a_warmup(self):
+        """Test that other EventBridge events are not swallowed as warmups"""
+        other_rule = {**SCHEDULED_EVENT, 'resources': ['arn:aws:events:us-west-2:123456789012:rule/nightly-report']}
+        other_event = {**SCHEDULED_EVENT, 'detail-type': 'EC2 Instance State-change Notification'}
+
+        self.assertFalse(is_warmup(other_rule, other_rule))
+        self.assertFalse(is_warmup(other_event, other_event))
+        with patch.dict(os.environ, {'WARMUP_RULE_ARNS': ''}):
+            self.assertFalse(is_warmup(SCHEDULED_EVENT, SCHEDULED_EVENT))
+
+    def test_warm_up_holds_connections_and_runs_statements(self):
+        statements = [('SELECT 1 FROM Accounts WHERE account_id = %s', (WARMUP_KEY,)), ('SELECT 2', ())]
+
+        report = warm_up(self.mock_connect, statements, connections=3)
+
+        self.assertEqual(self.mock_connect.call_count, 3)
+        self.assertEqual([call.args for call in self.mock_cursor.execute.call_args_list], statements)
+        self.assertEqual(self.mock_conn.close.call_count, 3)
+        self.assertEqual(report['connections'], 3)
+        self.assertEqual(report['statements'], 2)
+        for key in ('import_ms', 'connect_ms', 'statements_ms', 'total_ms'):
+            self.assertGreaterEqual(report[key], 0)
+        self.assertIn('mysql.connector.locales.eng.client_error', sys.modules)
+
+    def test_first_warmup_is_reported(self):
+        with patch.object(warmup, '_warmups', 0):
+            first = warm_up(self.mock_connect, [])
+            second = warm_up(self.mock_connect, [])
+
+        self.assertTrue(first['first_warmup'])
+        self.assertFalse(second['first_warmup'])
+
+    def test_account_service_warmup_skips_business_logic(self):
+        result = Account_Service.lambda_handler({'body': '{"action": "warmup"}'}, None)
+
+        self.assertTrue(result['warmed'])
+        executed = [call.args for call in self.mock_cursor.execute.call_args_list]
+        self.assertEqual(executed, Account_Service.warmup_statements())
+        self.assertTrue(all(params in ((WARMUP_KEY,), ()) for _, params in executed))
+        self.mock_conn.commit.assert_not_called()
+
+    @patch.dict(os.environ, {'WARMUP_RULE_ARNS': WARMUP_RULE_ARN})
+    def test_scheduled_event_is_a_warmup(self):
+        """Test that a keep-warm rule without an action does not hit the error path"""
+        account = Account_Service.lambda_handler(SCHEDULED_EVENT, None)
+        fee = Fee_Calculation_Service.lambda_handler(SCHEDULED_EVENT, None)
+        reward = Rewards_Calculation_Service.lambda_handler(SCHEDULED_EVENT, None)
+
+        self.assertTrue(account['warmed'])
+        self.assertTrue(fee['warmed'])
+        self.assertTrue(reward['warmed'])
+
+    @patch.dict(os.environ, {'USE_ACCOUNT_CHARGES': 'true'})
+    def test_fee_and_reward_warm_the_snapshot_lookup(self):
+        fee = Fee_Calculation_Service.lambda_handler({'action': 'warmup'}, None)
+        reward = Rewards_Calculation_Service.lambda_handler({'action': 'warmup'}, None)
+
+        self.assertEqual(fee['statements'], 2)
+        self.assertEqual(reward['statements'], 2)
+        executed = [call.args[0] for call in self.mock_cursor.execute.call_args_list]
+        self.assertIn(Fee_Calculation_Service.GET_FEE_SNAPSHOT_SQL, executed)
+        self.assertIn(Rewards_Calculation_Service.GET_REWARD_SNAPSHOT_SQL, executed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,14 @@
 import streamlit as st
 import requests
 import json
+import base64
+import gzip
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import pandas as pd
 
 # AWS Lambda Function URLs - REPLACE WITH YOUR ACTUAL LAMBDA FUNCTION URLs
@@ -9,28 +17,253 @@ ACCOUNT_SERVICE_URL = "https://h4s7q404t9.execute-api.us-west-2.amazonaws.com/de
 FEE_CALCULATION_URL = "https://31ex1bcgtg.execute-api.us-west-2.amazonaws.com/default/Fee_Calculation_Service"
 REWARDS_CALCULATION_URL = "https://we5fvnijya.execute-api.us-west-2.amazonaws.com/default/Rewards_Calculation_Service"
 
+# ---- Resilient Service Client ----
+SERVICE_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("SERVICE_CONNECT_TIMEOUT_SECONDS", "3.05"))
+SERVICE_READ_TIMEOUT_SECONDS = float(os.environ.get("SERVICE_READ_TIMEOUT_SECONDS", "10"))
+# Total budget for one call, hedge included
+SERVICE_DEADLINE_SECONDS = float(os.environ.get("SERVICE_DEADLINE_SECONDS", "10"))
+
+# Idempotent reads get a duplicate request once the first one is slower than
+# the service's recent p95; writes are never duplicated
+HEDGING_ENABLED = os.environ.get("HEDGING_ENABLED", "true").lower() == "true"
+HEDGE_DEFAULT_DELAY_SECONDS = 1.0
+HEDGE_MIN_DELAY_SECONDS = 0.05
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+HEDGED_ACTIONS = ("get_accounts", "search_accounts", "get_account_details", "get_account_overview",
+                  "get_customer_portfolio", "get_balance_distribution")
+
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.environ.get("BREAKER_RESET_SECONDS", "30"))
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open"""
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures (errors, timeouts,
+    5xx). After reset_seconds one trial request is let through: success
+    closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                return True
+            return self.state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+class ServiceClient:
+    """requests.post for one service with timeouts, a deadline, a circuit breaker and hedged reads"""
+
+    def __init__(self, name, url, executor, breaker=None):
+        self.name = name
+        self.url = url
+        self.executor = executor
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.metrics = {"requests": 0, "failures": 0, "timeouts": 0, "rejected": 0,
+                        "hedges_issued": 0, "hedges_won": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, metric):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def latency_p95(self):
+        with self._lock:
+            ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95)] if ordered else None
+
+    def hedge_delay(self):
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY_SECONDS
+        return max(HEDGE_MIN_DELAY_SECONDS, self.latency_p95())
+
+    def _attempt(self, payload, deadline, **kwargs):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise requests.Timeout(f"{self.name} deadline exceeded")
+        started = time.monotonic()
+        response = requests.post(self.url, json=payload, timeout=(
+            min(SERVICE_CONNECT_TIMEOUT_SECONDS, remaining), min(SERVICE_READ_TIMEOUT_SECONDS, remaining)
+        ), **kwargs)
+        if response.status_code < 500:
+            with self._lock:
+                self.latencies.append(time.monotonic() - started)
+        return response
+
+    def _hedged(self, payload, deadline, **kwargs):
+        primary = self.executor.submit(self._attempt, payload, deadline, **kwargs)
+        done, _ = wait([primary], timeout=min(self.hedge_delay(), max(0.0, deadline - time.monotonic())))
+        if done:
+            return primary.result()
+
+        self._count("hedges_issued")
+        hedge = self.executor.submit(self._attempt, payload, deadline, **kwargs)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except requests.RequestException as e:
+                    # The other request may still succeed
+                    error = e
+                    continue
+                if future is hedge:
+                    self._count("hedges_won")
+                # The slower request finishes in the background; its answer is dropped
+                return response
+        raise error
+
+    def post(self, payload, idempotent=False, **kwargs):
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.name} is unavailable, retrying in {self.breaker.reset_seconds:.0f}s")
+        self._count("requests")
+        deadline = time.monotonic() + SERVICE_DEADLINE_SECONDS
+        try:
+            if idempotent and HEDGING_ENABLED:
+                response = self._hedged(payload, deadline, **kwargs)
+            else:
+                response = self._attempt(payload, deadline, **kwargs)
+        except requests.Timeout:
+            self._count("timeouts")
+            self.breaker.record_failure()
+            raise
+        except requests.RequestException:
+            self._count("failures")
+            self.breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            self._count("failures")
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+@st.cache_resource
+def get_service_clients():
+    """One client (breaker, latency window, metrics) per service, shared by sessions"""
+    executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="service-call")
+    return {
+        "account": ServiceClient("Account Service", ACCOUNT_SERVICE_URL, executor),
+        "fee": ServiceClient("Fee Calculation Service", FEE_CALCULATION_URL, executor),
+        "reward": ServiceClient("Rewards Calculation Service", REWARDS_CALCULATION_URL, executor),
+    }
+
+def service_health():
+    """Breaker state, counters and recent p95 latency per service"""
+    rows = []
+    for client in get_service_clients().values():
+        p95 = client.latency_p95()
+        rows.append({
+            'Service': client.name,
+            'Circuit': client.breaker.state,
+            **{metric.replace('_', ' ').capitalize(): count for metric, count in client.metrics.items()},
+            'p95 ms': round(p95 * 1000) if p95 is not None else None
+        })
+    return pd.DataFrame(rows)
+
 # ---- Lambda Service Calls ----
+def decode_compressed_body(response_data):
+    """Decode a base64, gzip/deflate-compressed proxy-integration body passed through as JSON"""
+    data = base64.b64decode(response_data['body'])
+    headers = {name.lower(): value for name, value in (response_data.get('headers') or {}).items()}
+    encoding = headers.get('content-encoding', '').lower()
+    if encoding == 'gzip':
+        data = gzip.decompress(data)
+    elif encoding == 'deflate':
+        data = zlib.decompress(data)
+    return json.loads(data)
+
+# Reads the Account Service can answer with 304 Not Modified
+CONDITIONAL_ACTIONS = ("get_accounts", "get_account_details")
+MAX_CACHED_RESPONSES = 256
+
+@st.cache_resource
+def get_response_cache():
+    """Last (ETag, body) per conditional request; survives reruns and is shared by sessions"""
+    return {}
+
+def response_etag(response, response_data):
+    """ETag from the HTTP response, or from a proxy response passed through as JSON"""
+    etag = response.headers.get("ETag")
+    if not isinstance(etag, str) and isinstance(response_data, dict) and isinstance(response_data.get('headers'), dict):
+        etag = response_data['headers'].get('ETag')
+    return etag if isinstance(etag, str) else None
+
+def extract_account_body(response_data):
+    """Unwrap the different Account Service response formats"""
+    # If it's a direct array/object (like your current setup)
+    if isinstance(response_data, list) or (isinstance(response_data, dict) and 'body' not in response_data):
+        return response_data
+    
+    # If it's AWS Lambda format with 'body' key
+    if isinstance(response_data, dict) and 'body' in response_data:
+        # requests already sends Accept-Encoding: gzip, deflate and decodes
+        # binary compressed responses; this covers the pass-through format
+        if response_data.get('isBase64Encoded'):
+            return decode_compressed_body(response_data)
+        if isinstance(response_data['body'], str):
+            return json.loads(response_data['body'])
+        else:
+            return response_data['body']
+    
+    return response_data
+
 def call_account_service(action, **kwargs):
     """Call the Account Service Lambda function"""
     payload = {"action": action, **kwargs}
+    cache = get_response_cache()
+    cache_key = json.dumps(payload, sort_keys=True) if action in CONDITIONAL_ACTIONS else None
+    cached = cache.get(cache_key) if cache_key else None
     try:
-        response = requests.post(ACCOUNT_SERVICE_URL, json=payload)
+        client = get_service_clients()["account"]
+        idempotent = action in HEDGED_ACTIONS
+        if cached:
+            response = client.post(payload, idempotent, headers={"If-None-Match": cached[0]})
+        else:
+            response = client.post(payload, idempotent)
+        if response.status_code == 304 and cached:
+            return cached[1]
         if response.status_code == 200:
             # Handle different response formats
             response_data = response.json()
+            if cached and isinstance(response_data, dict) and response_data.get('statusCode') == 304:
+                return cached[1]
             
-            # If it's a direct array/object (like your current setup)
-            if isinstance(response_data, list) or (isinstance(response_data, dict) and 'body' not in response_data):
-                return response_data
+            result = extract_account_body(response_data)
             
-            # If it's AWS Lambda format with 'body' key
-            if isinstance(response_data, dict) and 'body' in response_data:
-                if isinstance(response_data['body'], str):
-                    return json.loads(response_data['body'])
-                else:
-                    return response_data['body']
-            
-            return response_data
+            etag = response_etag(response, response_data) if cache_key else None
+            if etag:
+                cache.pop(cache_key, None)
+                if len(cache) >= MAX_CACHED_RESPONSES:
+                    cache.pop(next(iter(cache)))
+                cache[cache_key] = (etag, result)
+            return result
         else:
             st.error(f"Account service error: {response.status_code} - {response.text}")
             return None
@@ -45,7 +278,7 @@ def call_fee_calculation_service(account_id):
     """Call the Fee Calculation Service Lambda function"""
     payload = {"account_id": account_id}
     try:
-        response = requests.post(FEE_CALCULATION_URL, json=payload)
+        response = get_service_clients()["fee"].post(payload, idempotent=True)
         if response.status_code == 200:
             response_data = response.json()
             
@@ -71,7 +304,7 @@ def call_rewards_calculation_service(account_id):
     """Call the Rewards Calculation Service Lambda function"""
     payload = {"account_id": account_id}
     try:
-        response = requests.post(REWARDS_CALCULATION_URL, json=payload)
+        response = get_service_clients()["reward"].post(payload, idempotent=True)
         if response.status_code == 200:
             response_data = response.json()
             
@@ -98,14 +331,149 @@ def get_accounts():
     """Get list of accounts from Account Service"""
     return call_account_service("get_accounts")
 
+def columns_to_dataframe(result):
+    """DataFrame from a 'columns' format result; no dict is built per row"""
+    return pd.DataFrame(result['columns'])
+
+def get_accounts_frame():
+    """Get every account as a DataFrame, using the column-oriented response format"""
+    result = call_account_service("get_accounts", format="columns")
+    if not isinstance(result, dict) or 'columns' not in result:
+        return None
+    return columns_to_dataframe(result)
+
+def search_accounts(query, limit=20):
+    """Search accounts by customer name prefix or exact account ID via Account Service"""
+    return call_account_service("search_accounts", query=query, limit=limit)
+
 def get_account_details(account_id):
     """Get account details from Account Service"""
     return call_account_service("get_account_details", account_id=account_id)
 
+def get_customer_portfolio(customer_id):
+    """Get a customer's account count, balance, fee and reward totals from Account Service"""
+    return call_account_service("get_customer_portfolio", customer_id=customer_id)
+
+def get_customer_portfolios_frame(customer_ids):
+    """Get the portfolio totals of many customers as a DataFrame (one request, column-oriented)"""
+    result = call_account_service("get_customer_portfolio", customer_ids=customer_ids, format="columns")
+    if not isinstance(result, dict) or 'portfolios' not in result:
+        return None
+    return columns_to_dataframe(result['portfolios'])
+
+def get_balance_distribution():
+    """Get per-tier balance histograms and projected fee/reward totals from Account Service"""
+    return call_account_service("get_balance_distribution")
+
+def bucket_labels(edges):
+    """Human-readable labels for the buckets returned by get_balance_distribution"""
+    labels = [f"< ${edges[0]:,.0f}"]
+    labels += [f"${low:,.0f} - ${high:,.0f}" for low, high in zip(edges, edges[1:])]
+    labels.append(f">= ${edges[-1]:,.0f}")
+    return labels
+
 def update_account_balance(account_id, new_balance):
     """Update account balance via Account Service"""
     return call_account_service("update_balance", account_id=account_id, new_balance=new_balance)
 
+def update_account_balances(updates):
+    """Update many balances at once via Account Service; updates is a list of (account_id, new_balance)"""
+    return call_account_service("update_balances", updates=[
+        {"account_id": account_id, "new_balance": new_balance} for account_id, new_balance in updates
+    ])
+
+# ---- Local Snapshot (read-only) ----
+# Arrow IPC file written by `python -m AWS_Lambda_Microservices.account_export <path>.arrow`
+SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH", "accounts_snapshot.arrow")
+# Rebuild it from the database in the background every N seconds (0 = never)
+SNAPSHOT_REFRESH_SECONDS = int(os.environ.get("SNAPSHOT_REFRESH_SECONDS", "0"))
+SNAPSHOT_SEARCH_LIMIT = 20
+
+def open_snapshot(path):
+    """
+    Memory-map an Arrow IPC snapshot. Nothing is deserialized up front: the
+    columns point into the mapping and the OS pages in only what a view reads.
+    """
+    import pyarrow as pa
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+@st.cache_resource(max_entries=2)
+def load_snapshot(path, modified):
+    """Mapped snapshot shared by sessions; a refreshed file has a new mtime and is mapped again"""
+    return open_snapshot(path)
+
+def current_snapshot(path=SNAPSHOT_PATH):
+    """Latest snapshot table and its modification time, or (None, None) if there is none yet"""
+    try:
+        modified = os.path.getmtime(path)
+    except OSError:
+        return None, None
+    return load_snapshot(path, modified), modified
+
+def snapshot_tier_summary(table):
+    """Account count and balance, fee and reward totals per tier (reads five columns)"""
+    summary = table.group_by('tier').aggregate([
+        ('account_id', 'count'),
+        ('balance', 'sum'),
+        ('monthly_fee', 'sum'),
+        ('monthly_reward', 'sum')
+    ]).sort_by('tier').to_pandas()
+    summary['balance_sum'] = summary['balance_sum'].astype(float)
+    return summary.rename(columns={
+        'tier': 'Tier',
+        'account_id_count': 'Accounts',
+        'balance_sum': 'Total Balance',
+        'monthly_fee_sum': 'Monthly Fees',
+        'monthly_reward_sum': 'Monthly Rewards'
+    })[['Tier', 'Accounts', 'Total Balance', 'Monthly Fees', 'Monthly Rewards']]
+
+def search_snapshot(table, query, limit=SNAPSHOT_SEARCH_LIMIT):
+    """
+    Exact account_id match first, then customer-name prefix matches, like
+    search_accounts; the prefix ignores case, as the database's collation does
+    """
+    import pyarrow.compute as pc
+    names = pc.utf8_lower(table['customer_name'])
+    by_name = table.filter(pc.starts_with(names, query.lower())).sort_by('customer_name').slice(0, limit)
+    matches = by_name.to_pandas()
+    if query.isascii() and query.isdigit():
+        by_id = table.filter(pc.equal(table['account_id'], int(query))).to_pandas()
+        matches = pd.concat([by_id, matches]).drop_duplicates('account_id')
+    matches['balance'] = matches['balance'].astype(float)
+    return matches.head(limit).reset_index(drop=True)
+
+def refresh_snapshot(path=SNAPSHOT_PATH):
+    """Rebuild the snapshot from the database; the new file replaces the old one only when complete"""
+    from AWS_Lambda_Microservices.account_export import export_accounts
+    from AWS_Lambda_Microservices.db import get_connection
+    conn = get_connection()
+    try:
+        return export_accounts(conn, path, 'arrow')
+    finally:
+        conn.close()
+
+def snapshot_refresh_loop(path, interval):
+    # A snapshot younger than the interval is kept until it is due
+    try:
+        time.sleep(max(0.0, interval - (time.time() - os.path.getmtime(path))))
+    except OSError:
+        pass
+    while True:
+        try:
+            report = refresh_snapshot(path)
+            print(f"Snapshot refreshed: {report['rows']} accounts in {report['seconds']:.2f}s")
+        except Exception as e:
+            # Views keep using the previous snapshot until the database is back
+            print(f"Snapshot refresh failed: {e}")
+        time.sleep(interval)
+
+@st.cache_resource
+def start_snapshot_refresher(path, interval):
+    """One background refresh thread per app process"""
+    thread = threading.Thread(target=snapshot_refresh_loop, args=(path, interval), name="snapshot-refresh", daemon=True)
+    thread.start()
+    return thread
+
 # ---- Streamlit UI ----
 st.title("Banking Rewards & Fees Demo (Microservices Version)")
 
@@ -115,9 +483,81 @@ if 'calculated_fee' not in st.session_state:
 if 'calculated_reward' not in st.session_state:
     st.session_state.calculated_reward = None
 
-accounts = get_accounts()
+def render_analytics_page():
+    """Charts built from the server-side summary arrays; no account rows are downloaded"""
+    st.header("Balance Distribution by Tier")
+    distribution = get_balance_distribution()
+    if not distribution or 'error' in distribution:
+        st.error("Unable to load analytics. Please check the Account Service.")
+        return
+    
+    labels = bucket_labels(distribution['bucket_edges'])
+    tiers = distribution['tiers']
+    counts = pd.DataFrame({tier: series['account_count'] for tier, series in tiers.items()}, index=labels)
+    st.bar_chart(counts)
+    
+    st.subheader("Projected Monthly Revenue by Tier")
+    revenue = pd.DataFrame([
+        {
+            'Tier': tier,
+            'Accounts': series['totals']['account_count'],
+            'Total Balance': series['totals']['total_balance'],
+            'Monthly Fees': series['totals']['total_fees'],
+            'Monthly Rewards': series['totals']['total_rewards']
+        }
+        for tier, series in tiers.items()
+    ])
+    st.write(revenue)
+    
+    totals = distribution['totals']
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Accounts", f"{totals['account_count']:,}")
+    col2.metric("Monthly Fees", f"${totals['total_fees']:,.2f}")
+    col3.metric("Monthly Rewards", f"${totals['total_rewards']:,.2f}")
+
+def render_snapshot_page():
+    """Read-only views over the memory-mapped local snapshot; no service is called"""
+    st.header("Local Snapshot")
+    table, modified = current_snapshot()
+    if table is None:
+        st.info(f"No snapshot found at {SNAPSHOT_PATH}. Create one with "
+                f"`python -m AWS_Lambda_Microservices.account_export {SNAPSHOT_PATH}` "
+                "or set SNAPSHOT_REFRESH_SECONDS.")
+        return
+    
+    st.caption(f"{table.num_rows:,} accounts as of "
+               f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(modified))} (read-only)")
+    
+    st.subheader("Totals by Tier")
+    st.write(snapshot_tier_summary(table))
+    
+    query = st.text_input("Search snapshot", placeholder="Customer name or account ID").strip()
+    if query:
+        matches = search_snapshot(table, query)
+        if matches.empty:
+            st.info(f"No accounts match \"{query}\".")
+        else:
+            st.write(matches)
+
+if SNAPSHOT_REFRESH_SECONDS > 0:
+    start_snapshot_refresher(SNAPSHOT_PATH, SNAPSHOT_REFRESH_SECONDS)
 
-if accounts:
+view = st.sidebar.radio("View", ["Accounts", "Analytics", "Snapshot"])
+with st.sidebar.expander("Service health"):
+    st.write(service_health())
+if view == "Analytics":
+    render_analytics_page()
+    st.stop()
+if view == "Snapshot":
+    render_snapshot_page()
+    st.stop()
+
+# Typeahead search instead of listing every account in the selectbox
+search_query = st.text_input("Search accounts", placeholder="Customer name or account ID").strip()
+
+accounts = search_accounts(search_query) if search_query else []
+
+if search_query and accounts is not None:
     # Handle case where accounts might be a list or dict
     if isinstance(accounts, list) and len(accounts) > 0:
         account_options = {f"{a.get('customer_name', 'Unknown')} (ID: {a.get('account_id', 'N/A')})": a.get('account_id') for a in accounts if a.get('account_id')}
@@ -187,14 +627,28 @@ if accounts:
                 
                 display_df = pd.DataFrame([display_data])
                 st.write(display_df)
+                
+                portfolio = get_customer_portfolio(account_details.get('customer_id'))
+                if portfolio and 'error' not in portfolio:
+                    st.subheader("Customer Portfolio")
+                    st.write(pd.DataFrame([{
+                        'Accounts': portfolio.get('account_count'),
+                        'Total Balance': f"${portfolio.get('total_balance', 0):.2f}",
+                        'Total Monthly Fees': f"${portfolio.get('total_fees', 0):.2f}",
+                        'Total Monthly Rewards': f"${portfolio.get('total_rewards', 0):.2f}"
+                    }]))
             else:
                 st.warning("Could not load account details. Please check the Account Service.")
         else:
             st.error("No valid accounts found in the response.")
+    elif isinstance(accounts, list):
+        st.info(f"No accounts match \"{search_query}\".")
     else:
         st.error("Invalid accounts data format received from service.")
+elif search_query:
+    st.error("Unable to search accounts. Please check the Account Service.")
 else:
-    st.error("Unable to load accounts. Please check the Account Service.")
+    st.info("Type a customer name or account ID to find an account.")
 
 # Add footer with architecture info
 st.markdown("---")
@@ -0,0 +1,130 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from customer_dedup import (
+    customer_key_digest,
+    assign_customer_ids,
+    CustomerDeduplicator,
+    build_customer_map
+)
+
+class TestCustomerDedup(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [
+            (1, 'John Doe', 'gold'),
+            (2, 'Jane Smith', 'premium'),
+            (3, 'John Doe', 'gold'),
+            (4, 'John Doe', 'silver'),
+            (5, 'Jane Smith', 'premium'),
+            (6, None, 'gold'),
+            (7, 'None', 'gold'),
+        ]
+        self.expected = {1: 1, 2: 2, 3: 1, 4: 4, 5: 2, 6: 6, 7: 7}
+
+    def _resolve(self, dedup):
+        mapping = {}
+        for account_ids, customer_ids in dedup.iter_assignments():
+            mapping.update(zip(account_ids.tolist(), customer_ids.tolist()))
+        return mapping
+
+    def test_digest_is_stable_and_fixed_width(self):
+        digest = customer_key_digest('John Doe', 'gold')
+        self.assertEqual(digest, customer_key_digest('John Doe', 'gold'))
+        self.assertLess(digest, 2 ** 64)
+
+    def test_digest_distinguishes_null_from_text(self):
+        self.assertNotEqual(customer_key_digest(None, 'gold'), customer_key_digest('None', 'gold'))
+        self.assertNotEqual(customer_key_digest('', 'gold'), customer_key_digest(None, 'gold'))
+
+    def test_digest_is_tier_sensitive(self):
+        """Test that the same name in a different tier is a different customer"""
+        self.assertNotEqual(customer_key_digest('John Doe', 'gold'), customer_key_digest('John Doe', 'Gold'))
+
+    def test_assign_uses_smallest_account_id(self):
+        """Test that customer_id is the first account_id regardless of input order"""
+        digests = np.array([9, 7, 9, 7], dtype=np.uint64)
+        account_ids = np.array([30, 20, 10, 40], dtype=np.int64)
+
+        ids, customers = assign_customer_ids(digests, account_ids)
+
+        self.assertEqual(dict(zip(ids.tolist(), customers.tolist())), {10: 10, 30: 10, 20: 20, 40: 20})
+
+    def test_assign_empty(self):
+        ids, customers = assign_customer_ids(np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64))
+        self.assertEqual(len(ids), 0)
+        self.assertEqual(len(customers), 0)
+
+    def test_in_memory_dedup(self):
+        dedup = CustomerDeduplicator(expected_rows=len(self.rows))
+        dedup.add_rows(self.rows[:3])
+        dedup.add_rows(self.rows[3:])
+
+        self.assertFalse(dedup.spilled)
+        self.assertEqual(self._resolve(dedup), self.expected)
+        dedup.close()
+
+    def test_spilled_dedup_matches_in_memory(self):
+        """Test that partitioned spill files produce the same assignment"""
+        with tempfile.TemporaryDirectory() as spill_dir:
+            # A tiny budget forces several partitions for a small input
+            dedup = CustomerDeduplicator(expected_rows=100000, memory_budget_mb=1, spill_dir=spill_dir)
+            self.assertTrue(dedup.spilled)
+            self.assertGreater(dedup.partitions, 1)
+
+            dedup.add_rows(self.rows[:4])
+            dedup.add_rows(self.rows[4:])
+
+            self.assertEqual(self._resolve(dedup), self.expected)
+            dedup.close()
+            self.assertEqual(os.listdir(spill_dir), [])
+
+    def test_build_customer_map_streams_and_persists(self):
+        """Test that rows are streamed in batches and the map is written in bulk"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (len(self.rows),)
+        mock_cursor.fetchmany.side_effect = [self.rows[:4], self.rows[4:], []]
+        mock_cursor.fetchall.return_value = []
+
+        rows, customers, collisions = build_customer_map(mock_conn)
+
+        self.assertEqual(rows, 7)
+        self.assertEqual(customers, 5)
+        self.assertEqual(collisions, 0)
+        mock_conn.cursor.assert_any_call(buffered=False)
+        written = {}
+        for call in mock_cursor.executemany.call_args_list:
+            self.assertIn('INSERT INTO MigrationCustomerMap', call[0][0])
+            written.update(dict(call[0][1]))
+        self.assertEqual(written, self.expected)
+        mock_conn.commit.assert_called()
+
+    def test_build_customer_map_reports_collisions(self):
+        """Test that merged accounts whose stored name or tier differ are reported"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (2,)
+        mock_cursor.fetchmany.side_effect = [self.rows[:2], []]
+        mock_cursor.fetchall.return_value = [(2, 1)]
+
+        with patch('builtins.print') as mock_print:
+            _, _, collisions = build_customer_map(mock_conn)
+
+        self.assertEqual(collisions, 1)
+        check_sql = mock_cursor.execute.call_args_list[-1][0][0]
+        self.assertIn('Accounts c ON c.account_id = m.customer_id', check_sql)
+        self.assertIn('<=>', check_sql)
+        self.assertIn('digest collision', mock_print.call_args[0][0])
+
+if __name__ == '__main__':
+    unittest.main()
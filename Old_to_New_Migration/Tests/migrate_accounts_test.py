@@ -0,0 +1,249 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import mysql.connector
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migrate_accounts
+from migrate_accounts import (
+    ChunkMismatch,
+    plan_chunks,
+    get_pending_chunks,
+    customer_map_is_stale,
+    migrate_chunk,
+    reset_migration,
+    run_migration
+)
+
+class TestMigrateAccounts(unittest.TestCase):
+
+    def test_plan_chunks_even_split(self):
+        """Test that the id range is split into inclusive, non-overlapping chunks"""
+        self.assertEqual(plan_chunks(1, 30, 10), [(1, 10), (11, 20), (21, 30)])
+
+    def test_plan_chunks_partial_last_chunk(self):
+        """Test that the last chunk is truncated at max_id"""
+        self.assertEqual(plan_chunks(5, 27, 10), [(5, 14), (15, 24), (25, 27)])
+
+    def test_plan_chunks_single_row(self):
+        self.assertEqual(plan_chunks(7, 7, 100), [(7, 7)])
+
+    def test_plan_chunks_invalid_size(self):
+        with self.assertRaises(ValueError):
+            plan_chunks(1, 10, 0)
+
+    def test_pending_chunks_skip_completed(self):
+        """Test that checkpointed chunks are not replayed"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (1, 30)
+        mock_cursor.fetchall.return_value = [(1, 10), (21, 30)]
+
+        pending = get_pending_chunks(mock_conn, 10)
+
+        self.assertEqual(pending, [(11, 20)])
+
+    def test_pending_chunks_empty_source(self):
+        """Test that an empty legacy table yields no work"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (None, None)
+
+        self.assertEqual(get_pending_chunks(mock_conn, 10), [])
+
+    def test_migrate_chunk_commits_with_checkpoint(self):
+        """Test that data copy and checkpoint happen in one committed transaction"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (10,)
+
+        rows = migrate_chunk(mock_conn, 1, 10)
+
+        self.assertEqual(rows, 10)
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        self.assertIn('INSERT INTO Customers', statements[0])
+        self.assertIn('INSERT INTO Accounts', statements[1])
+        self.assertIn('INSERT INTO MigrationCheckpoints', statements[4])
+        self.assertEqual(mock_cursor.execute.call_args_list[4][0][1], (1, 10, 10))
+        mock_conn.commit.assert_called_once()
+        mock_conn.rollback.assert_not_called()
+        mock_cursor.close.assert_called_once()
+
+    def test_migrate_chunk_is_idempotent_upsert(self):
+        """Test that replaying a chunk upserts instead of failing on duplicate keys"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (0,)
+
+        migrate_chunk(mock_conn, 1, 10)
+
+        for call in mock_cursor.execute.call_args_list:
+            if call[0][0].strip().startswith('INSERT'):
+                self.assertIn('ON DUPLICATE KEY UPDATE', call[0][0])
+
+    def test_migrate_chunk_uses_customer_map(self):
+        """Test that accounts take their customer_id from the de-duplication map"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (0,)
+
+        migrate_chunk(mock_conn, 1, 10)
+
+        customers_sql = mock_cursor.execute.call_args_list[0][0][0]
+        accounts_sql = mock_cursor.execute.call_args_list[1][0][0]
+        self.assertIn('MigrationCustomerMap', customers_sql)
+        self.assertIn('m.customer_id', accounts_sql)
+        self.assertIn('JOIN MigrationCustomerMap', accounts_sql)
+
+    def test_migrate_chunk_records_rows_in_target(self):
+        """Test that the checkpoint holds the target's count, not the legacy one"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.side_effect = [(10,), (10,)]
+
+        migrate_chunk(mock_conn, 1, 10)
+
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        self.assertIn('FROM Accounts WHERE', statements[3])
+        self.assertNotIn(migrate_accounts.OLD_DB_NAME, statements[3])
+
+    def test_migrate_chunk_fails_when_rows_are_dropped(self):
+        """Test that legacy rows the copy did not write fail the chunk instead of being checkpointed"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.side_effect = [(10,), (8,)]
+
+        with self.assertRaises(ChunkMismatch):
+            migrate_chunk(mock_conn, 1, 10)
+
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        self.assertFalse(any('MigrationCheckpoints' in sql for sql in statements))
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+    def test_migrate_chunk_rolls_back_on_error(self):
+        """Test that a failing chunk leaves neither data nor checkpoint behind"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.execute.side_effect = [None, mysql.connector.Error("Lock wait timeout")]
+
+        with self.assertRaises(mysql.connector.Error):
+            migrate_chunk(mock_conn, 1, 10)
+
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+        mock_cursor.close.assert_called_once()
+
+    def test_customer_map_staleness(self):
+        """Test that the map is rebuilt when empty or when legacy accounts outgrew it"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+
+        for ranges, stale in (((None, 50), True), ((50, 50), False), ((50, 75), True), ((50, None), False)):
+            mock_cursor.fetchone.return_value = ranges
+            self.assertEqual(customer_map_is_stale(mock_conn), stale, ranges)
+
+    def test_reset_clears_charges_before_accounts(self):
+        """Test that AccountCharges rows, which reference Accounts, are deleted first"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+
+        reset_migration(mock_conn, clear_target=True)
+
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        self.assertLess(statements.index("DELETE FROM AccountCharges"), statements.index("DELETE FROM Accounts"))
+        self.assertLess(statements.index("DELETE FROM Accounts"), statements.index("DELETE FROM Customers"))
+        self.assertIn("DELETE FROM RecalcWatermarks", statements)
+        mock_conn.commit.assert_called_once()
+
+    @patch('migrate_accounts.time.sleep')
+    def test_migrate_chunk_retries_deadlock(self, mock_sleep):
+        """Test that a deadlock victim is rolled back and run again"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        deadlock = mysql.connector.Error("Deadlock found when trying to get lock", errno=1213)
+        mock_cursor.execute.side_effect = [deadlock] + [None] * 5
+        mock_cursor.fetchone.return_value = (10,)
+
+        self.assertEqual(migrate_chunk(mock_conn, 1, 10), 10)
+
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_called_once()
+        mock_sleep.assert_called_once()
+
+    @patch('migrate_accounts.time.sleep')
+    def test_migrate_chunk_gives_up_after_retries(self, mock_sleep):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.execute.side_effect = mysql.connector.Error("Deadlock found when trying to get lock", errno=1213)
+
+        with self.assertRaises(mysql.connector.Error):
+            migrate_chunk(mock_conn, 1, 10, retries=2)
+
+        self.assertEqual(mock_conn.rollback.call_count, 3)
+        mock_conn.commit.assert_not_called()
+
+    @patch.dict(os.environ, {}, clear=True)
+    @patch('migrate_accounts.mysql.connector.connect')
+    def test_benchmark_refuses_default_host(self, mock_connect):
+        """Test that the destructive benchmark never runs against the production endpoint by default"""
+        for argv in (['migrate_accounts.py', '--benchmark'],
+                     ['migrate_accounts.py', '--benchmark', '--confirm-clear-target'],
+                     ['migrate_accounts.py', '--benchmark', '--host', 'localhost']):
+            with patch.object(sys, 'argv', argv), patch('sys.stderr'):
+                with self.assertRaises(SystemExit):
+                    migrate_accounts.main()
+        mock_connect.assert_not_called()
+
+    @patch('migrate_accounts.migrate_chunk')
+    @patch('migrate_accounts.get_pending_chunks')
+    @patch('migrate_accounts.mysql.connector.connect')
+    def test_run_migration_single_worker(self, mock_connect, mock_pending, mock_migrate_chunk):
+        """Test that a single-worker run migrates pending chunks in-process"""
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+        mock_pending.return_value = [(11, 20), (31, 40)]
+        mock_migrate_chunk.return_value = 10
+
+        chunks, rows = run_migration(workers=1, chunk_size=10)
+
+        self.assertEqual((chunks, rows), (2, 20))
+        mock_migrate_chunk.assert_any_call(mock_conn, 11, 20)
+        mock_migrate_chunk.assert_any_call(mock_conn, 31, 40)
+        mock_conn.close.assert_called_once()
+
+    @patch.dict(os.environ, {
+        'DB_HOST': 'test-host',
+        'DB_USER': 'test-user',
+        'DB_PASSWORD': 'test-pass'
+    })
+    @patch('migrate_accounts.mysql.connector.connect')
+    def test_connection_uses_environment(self, mock_connect):
+        """Test that connections use env configuration and explicit transactions"""
+        migrate_accounts.get_connection()
+
+        mock_connect.assert_called_once_with(
+            host='test-host',
+            user='test-user',
+            password='test-pass',
+            database=migrate_accounts.NEW_DB_NAME,
+            autocommit=False
+        )
+
+if __name__ == '__main__':
+    unittest.main()
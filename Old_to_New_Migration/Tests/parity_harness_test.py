@@ -0,0 +1,149 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+from decimal import Decimal
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import customer_dedup
+import migrate_accounts
+from parity_harness import (
+    OLD_APP_DIR,
+    PARITY_OLD_DB,
+    PARITY_NEW_DB,
+    migrate_and_diff_chunk,
+    use_scratch_schemas,
+    BOUNDARY_BALANCES,
+    load_procedure_sql,
+    read_sql_file,
+    generate_accounts,
+    classify_case,
+    diff_results,
+    merge_reports
+)
+
+class TestParityHarness(unittest.TestCase):
+
+    def test_load_procedure_sql_strips_delimiters_and_definer(self):
+        """Test that the repo's legacy procedure files become installable statements"""
+        text = read_sql_file(OLD_APP_DIR, 'Database', 'Stored Procedures', 'calculate_monthly_fees.sql')
+
+        statement = load_procedure_sql(text)
+
+        self.assertTrue(statement.startswith('CREATE PROCEDURE `CalculateMonthlyFees`'))
+        self.assertNotIn('DELIMITER', statement)
+        self.assertNotIn('$$', statement)
+        self.assertNotIn('DEFINER', statement)
+        self.assertTrue(statement.endswith('END'))
+
+    def test_generate_accounts_is_deterministic(self):
+        self.assertEqual(generate_accounts(1, 500, seed=7), generate_accounts(1, 500, seed=7))
+        self.assertNotEqual(generate_accounts(1, 500, seed=7), generate_accounts(1, 500, seed=8))
+
+    def test_generate_accounts_covers_boundaries(self):
+        rows = generate_accounts(1, 5000)
+
+        self.assertEqual([r[0] for r in rows], list(range(1, 5001)))
+        balances = {f"{r[3]:.2f}" for r in rows}
+        for boundary in ('5000.00', '10000.00'):
+            self.assertIn(boundary, balances)
+        self.assertIn('Premium', {r[2] for r in rows})
+
+    def test_generate_accounts_shares_customers_across_chunks(self):
+        """Test that some names recur in other chunks, so de-duplication has work to do"""
+        first = {r[1] for r in generate_accounts(1, 5000)}
+        second = {r[1] for r in generate_accounts(5001, 10000)}
+
+        self.assertTrue(any(name.startswith('Parity Shared Customer') for name in first & second))
+
+    @patch('parity_harness.get_connection')
+    @patch('parity_harness.migrate_accounts.migrate_chunk')
+    def test_chunks_are_migrated_by_the_migration_stage(self, mock_migrate_chunk, mock_get_connection):
+        """Test that the harness copies data with migrate_chunk instead of its own SQL"""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_get_connection.return_value = mock_conn
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.side_effect = [
+            [(1, Decimal('15.00'), Decimal('50.00'))],
+            [(1, Decimal('5000.00'), 'gold')]
+        ]
+
+        report = migrate_and_diff_chunk((1, 10))
+
+        mock_get_connection.assert_called_once_with(PARITY_NEW_DB, autocommit=False)
+        mock_migrate_chunk.assert_called_once_with(mock_conn, 1, 10)
+        for call in mock_cursor.execute.call_args_list:
+            self.assertFalse(call[0][0].strip().startswith('INSERT'))
+        self.assertEqual((report['accounts'], report['fee_mismatches']), (1, 0))
+
+    def test_stages_use_scratch_schemas(self):
+        with patch.object(customer_dedup, 'OLD_DB_NAME'), patch.object(migrate_accounts, 'OLD_DB_NAME'), \
+             patch.object(migrate_accounts, 'NEW_DB_NAME'):
+            use_scratch_schemas()
+
+            self.assertEqual(customer_dedup.OLD_DB_NAME, PARITY_OLD_DB)
+            self.assertEqual(migrate_accounts.OLD_DB_NAME, PARITY_OLD_DB)
+            self.assertEqual(migrate_accounts.NEW_DB_NAME, PARITY_NEW_DB)
+
+    def test_classify_case(self):
+        self.assertEqual(classify_case(Decimal('5000.00'), 'gold'), 'balance=5000.00')
+        self.assertEqual(classify_case(Decimal('10000.00'), 'premium'), 'balance=10000.00')
+        self.assertEqual(classify_case(Decimal('123.45'), 'Premium'), 'tier=Premium')
+        self.assertEqual(classify_case(Decimal('123.45'), None), 'tier=NULL')
+        self.assertEqual(classify_case(Decimal('123.45'), 'gold'), 'other')
+
+    def test_diff_results_matching_rows(self):
+        new_rows = [
+            (1, Decimal('5000.00'), 'gold'),
+            (2, Decimal('5000.01'), 'gold'),
+            (3, Decimal('10000.00'), 'premium'),
+            (4, Decimal('10000.01'), 'silver'),
+        ]
+        legacy_rows = {
+            1: (Decimal('15.00'), Decimal('50.00')),
+            2: (Decimal('5.00'), Decimal('50.00')),
+            3: (Decimal('0.00'), Decimal('100.00')),
+            4: (Decimal('5.00'), Decimal('200.00')),
+        }
+
+        report = diff_results(new_rows, legacy_rows)
+
+        self.assertEqual(report['accounts'], 4)
+        self.assertEqual(report['fee_mismatches'], 0)
+        self.assertEqual(report['reward_mismatches'], 0)
+        self.assertEqual(report['cases']['balance=5000.00']['accounts'], 1)
+        self.assertEqual(report['samples'], [])
+
+    def test_diff_results_reports_mismatches_by_case(self):
+        """Test that a case-insensitive legacy tier match is surfaced as a fee mismatch"""
+        new_rows = [(1, Decimal('100.00'), 'Premium'), (2, Decimal('100.00'), 'gold')]
+        legacy_rows = {1: (Decimal('0.00'), Decimal('1.00'))}
+
+        report = diff_results(new_rows, legacy_rows)
+
+        self.assertEqual(report['fee_mismatches'], 1)
+        self.assertEqual(report['cases']['tier=Premium']['fee_mismatches'], 1)
+        self.assertEqual(report['missing_legacy'], 1)
+        self.assertEqual(report['samples'][0]['account_id'], 1)
+        self.assertEqual(report['samples'][0]['python_fee'], 15.00)
+
+    def test_merge_reports(self):
+        first = diff_results([(1, Decimal('5000.00'), 'gold')], {1: (Decimal('15.00'), Decimal('50.00'))})
+        second = diff_results([(2, Decimal('5000.00'), 'gold')], {2: (Decimal('5.00'), Decimal('50.00'))})
+
+        merged = merge_reports([first, second])
+
+        self.assertEqual(merged['accounts'], 2)
+        self.assertEqual(merged['fee_mismatches'], 1)
+        self.assertEqual(merged['cases']['balance=5000.00'], {'accounts': 2, 'fee_mismatches': 1, 'reward_mismatches': 0})
+        self.assertEqual(len(merged['samples']), 1)
+
+    def test_boundary_balances_include_rule_thresholds(self):
+        self.assertIn('5000.00', BOUNDARY_BALANCES)
+        self.assertIn('10000.00', BOUNDARY_BALANCES)
+
+if __name__ == '__main__':
+    unittest.main()
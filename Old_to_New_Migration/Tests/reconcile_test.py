@@ -0,0 +1,117 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import zlib
+
+# Add the parent directory to sys.path to allow importing the module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reconcile import diff_rows, reconcile, fetch_bucket_hashes
+
+def _row_hash(row):
+    return zlib.crc32('|'.join(str(v) for v in row).encode('utf-8'))
+
+class FakeSchemas:
+    """In-memory stand-in for the SQL aggregates on both sides"""
+
+    def __init__(self, old_rows, new_rows):
+        self.rows = {'old': old_rows, 'new': new_rows}
+        self.bucket_queries = 0
+        self.row_queries = []
+
+    def bucket_hashes(self, cursor, side, range_start, range_end, bucket_width):
+        self.bucket_queries += 1
+        buckets = {}
+        for account_id, row in self.rows[side].items():
+            if range_start <= account_id <= range_end:
+                bucket = (account_id - range_start) // bucket_width
+                count, total = buckets.get(bucket, (0, 0))
+                buckets[bucket] = (count + 1, total + _row_hash(row))
+        return buckets
+
+    def row_hashes(self, cursor, side, range_start, range_end):
+        self.row_queries.append((side, range_start, range_end))
+        return {account_id: _row_hash(row) for account_id, row in self.rows[side].items()
+                if range_start <= account_id <= range_end}
+
+    def id_range(self, cursor):
+        ids = set(self.rows['old']) | set(self.rows['new'])
+        return (min(ids), max(ids)) if ids else None
+
+class TestReconcile(unittest.TestCase):
+
+    def setUp(self):
+        self.old_rows = {i: (i, f"{i * 10}.00", f"Customer {i}", 'gold') for i in range(1, 10001)}
+
+    def _run(self, new_rows, **kwargs):
+        fake = FakeSchemas(self.old_rows, new_rows)
+        with patch('reconcile.fetch_bucket_hashes', side_effect=fake.bucket_hashes), \
+             patch('reconcile.fetch_row_hashes', side_effect=fake.row_hashes), \
+             patch('reconcile.get_id_range', side_effect=fake.id_range):
+            report = reconcile(MagicMock(), **kwargs)
+        return report, fake
+
+    def test_diff_rows(self):
+        differences = diff_rows({1: 10, 2: 20, 3: 30}, {2: 20, 3: 31, 4: 40})
+        self.assertEqual(differences, [
+            {'account_id': 1, 'issue': 'missing_in_new'},
+            {'account_id': 3, 'issue': 'mismatch'},
+            {'account_id': 4, 'issue': 'missing_in_old'},
+        ])
+
+    def test_identical_schemas_match_without_row_transfer(self):
+        report, fake = self._run(dict(self.old_rows), chunk_size=1000, fanout=10, leaf_size=10)
+
+        self.assertTrue(report['matched'])
+        self.assertEqual(report['buckets_mismatched'], 0)
+        self.assertEqual(fake.row_queries, [])
+        self.assertEqual(fake.bucket_queries, 2)
+
+    def test_drills_down_only_into_mismatching_chunks(self):
+        new_rows = dict(self.old_rows)
+        new_rows[4321] = (4321, '99.99', 'Customer 4321', 'gold')
+        new_rows[8765] = (8765, '87650.00', 'Customer 8765', 'premium')
+        del new_rows[15]
+
+        report, fake = self._run(new_rows, chunk_size=1000, fanout=10, leaf_size=10)
+
+        self.assertFalse(report['matched'])
+        self.assertEqual(report['differences'], [
+            {'account_id': 15, 'issue': 'missing_in_new'},
+            {'account_id': 4321, 'issue': 'mismatch'},
+            {'account_id': 8765, 'issue': 'mismatch'},
+        ])
+        # Rows are only fetched for the three leaf ranges that contain differences
+        self.assertEqual(report['leaf_ranges'], 3)
+        for side, range_start, range_end in fake.row_queries:
+            self.assertLessEqual(range_end - range_start + 1, 10)
+
+    def test_detects_extra_rows_in_new_schema(self):
+        new_rows = dict(self.old_rows)
+        new_rows[10001] = (10001, '5.00', 'Stray', 'basic')
+
+        report, _ = self._run(new_rows, chunk_size=1000, fanout=10, leaf_size=10)
+
+        self.assertEqual(report['differences'], [{'account_id': 10001, 'issue': 'missing_in_old'}])
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            reconcile(MagicMock(), chunk_size=1000, fanout=1)
+
+    def test_bucket_query_is_server_side_aggregate(self):
+        """Test that bucket checksums are grouped in SQL over a primary-key range"""
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(0, 5, 12345), (1, 3, 678)]
+
+        buckets = fetch_bucket_hashes(mock_cursor, 'new', 1, 200, 100)
+
+        self.assertEqual(buckets, {0: (5, 12345), 1: (3, 678)})
+        sql, params = mock_cursor.execute.call_args[0]
+        self.assertIn('GROUP BY bucket', sql)
+        self.assertIn('SUM(CRC32', sql)
+        self.assertIn('a.account_id BETWEEN %s AND %s', sql)
+        self.assertEqual(params, (1, 100, 1, 200))
+
+if __name__ == '__main__':
+    unittest.main()
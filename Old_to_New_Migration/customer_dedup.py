@@ -0,0 +1,210 @@
+# customer_dedup.py - Customer De-duplication Stage for the Migration
+import hashlib
+import math
+import os
+import shutil
+import tempfile
+import numpy as np
+
+OLD_DB_NAME = os.environ.get('OLD_DB_NAME', 'BankingRewardsFees_Old')
+
+DEFAULT_MEMORY_BUDGET_MB = 256
+FETCH_BATCH_SIZE = 50000
+INSERT_BATCH_SIZE = 10000
+
+# Working set per source row while a partition is resolved: uint64 digest,
+# int64 account_id, int64 sort order, int64 customer_id plus temporaries.
+BYTES_PER_ROW = 48
+
+CUSTOMER_MAP_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS MigrationCustomerMap (
+        account_id INT NOT NULL,
+        customer_id INT NOT NULL,
+        PRIMARY KEY (account_id),
+        KEY idx_customer_map_customer (customer_id)
+    )
+"""
+
+INSERT_CUSTOMER_MAP_SQL = """
+    INSERT INTO MigrationCustomerMap (account_id, customer_id)
+    VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE customer_id = VALUES(customer_id)
+"""
+
+# Accounts whose chosen customer (the account the customer_id points at)
+# carries a different name or tier: two keys shared a 64-bit digest and were
+# merged. Compared as bytes, exactly like the digest, and NULL-safe.
+KEY_COLLISIONS_SQL = """
+    SELECT m.account_id, m.customer_id
+    FROM MigrationCustomerMap m
+    JOIN `{old_db}`.Accounts a ON a.account_id = m.account_id
+    JOIN `{old_db}`.Accounts c ON c.account_id = m.customer_id
+    WHERE NOT (CAST(a.customer_name AS BINARY) <=> CAST(c.customer_name AS BINARY)
+               AND CAST(a.customer_tier AS BINARY) <=> CAST(c.customer_tier AS BINARY))
+    ORDER BY m.account_id
+"""
+
+def customer_key_digest(customer_name, customer_tier):
+    """
+    Return a 64-bit digest of the exact (customer_name, customer_tier) pair.
+    NULLs are encoded distinctly from the string 'None' and from ''.
+    """
+    parts = [b'\x00' if value is None else b'\x01' + str(value).encode('utf-8')
+             for value in (customer_name, customer_tier)]
+    digest = hashlib.blake2b(b'\x1f'.join(parts), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def assign_customer_ids(digests, account_ids):
+    """
+    Given parallel arrays of key digests and account ids, return
+    (account_ids, customer_ids) where every account is mapped to the smallest
+    account_id sharing its key. Using the first account as the customer_id
+    keeps ids stable across re-runs regardless of input order.
+    """
+    if len(digests) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    order = np.lexsort((account_ids, digests))
+    sorted_digests = digests[order]
+    sorted_ids = account_ids[order]
+    group_starts = np.ones(len(sorted_digests), dtype=bool)
+    group_starts[1:] = sorted_digests[1:] != sorted_digests[:-1]
+    group_index = np.cumsum(group_starts) - 1
+    customer_ids = sorted_ids[group_starts][group_index]
+    return sorted_ids, customer_ids
+
+class CustomerDeduplicator:
+    """
+    Collects (account_id, key digest) pairs in fixed-width numpy arrays and
+    resolves them to customer_ids. If the expected row count does not fit in
+    the memory budget, pairs are hash-partitioned into spill files on disk so
+    that only one partition is ever resolved in memory at a time.
+    """
+
+    def __init__(self, expected_rows, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, spill_dir=None):
+        budget_bytes = memory_budget_mb * 1024 * 1024
+        self.partitions = max(1, math.ceil(expected_rows * BYTES_PER_ROW / budget_bytes))
+        self.rows = 0
+        self._spill_path = None
+        self._digest_chunks = []
+        self._id_chunks = []
+        if self.partitions > 1:
+            self._spill_path = tempfile.mkdtemp(prefix='customer_dedup_', dir=spill_dir)
+            print(f"Customer de-duplication spilling to {self.partitions} partitions in {self._spill_path}")
+
+    @property
+    def spilled(self):
+        return self._spill_path is not None
+
+    def _partition_file(self, partition, kind):
+        return os.path.join(self._spill_path, f"part_{partition:04d}.{kind}")
+
+    def add_rows(self, rows):
+        """Add an iterable of (account_id, customer_name, customer_tier) rows"""
+        rows = list(rows)
+        if not rows:
+            return
+        digests = np.fromiter((customer_key_digest(r[1], r[2]) for r in rows),
+                              dtype=np.uint64, count=len(rows))
+        account_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        self.rows += len(rows)
+
+        if not self.spilled:
+            self._digest_chunks.append(digests)
+            self._id_chunks.append(account_ids)
+            return
+
+        partition_of = digests % np.uint64(self.partitions)
+        for partition in np.unique(partition_of):
+            mask = partition_of == partition
+            with open(self._partition_file(int(partition), 'digest'), 'ab') as f:
+                digests[mask].tofile(f)
+            with open(self._partition_file(int(partition), 'id'), 'ab') as f:
+                account_ids[mask].tofile(f)
+
+    def _load_partition(self, partition):
+        digest_file = self._partition_file(partition, 'digest')
+        if not os.path.exists(digest_file):
+            return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+        digests = np.fromfile(digest_file, dtype=np.uint64)
+        account_ids = np.fromfile(self._partition_file(partition, 'id'), dtype=np.int64)
+        return digests, account_ids
+
+    def iter_assignments(self):
+        """Yield (account_ids, customer_ids) arrays, one pair per partition"""
+        if not self.spilled:
+            digests = np.concatenate(self._digest_chunks) if self._digest_chunks else np.empty(0, dtype=np.uint64)
+            account_ids = np.concatenate(self._id_chunks) if self._id_chunks else np.empty(0, dtype=np.int64)
+            self._digest_chunks, self._id_chunks = [], []
+            yield assign_customer_ids(digests, account_ids)
+            return
+
+        # Keys never cross partitions, so each partition resolves independently.
+        for partition in range(self.partitions):
+            digests, account_ids = self._load_partition(partition)
+            yield assign_customer_ids(digests, account_ids)
+
+    def close(self):
+        if self._spill_path:
+            shutil.rmtree(self._spill_path, ignore_errors=True)
+            self._spill_path = None
+
+def build_customer_map(conn, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, spill_dir=None):
+    """
+    Stream legacy Accounts rows, de-duplicate customers on the exact
+    (customer_name, customer_tier) pair and persist the account_id ->
+    customer_id assignment to MigrationCustomerMap in the target schema.
+    Returns (rows_seen, distinct_customers, digest_collisions).
+    """
+    cursor = conn.cursor()
+    cursor.execute(CUSTOMER_MAP_TABLE_DDL)
+    cursor.execute(f"SELECT COUNT(*) FROM `{OLD_DB_NAME}`.Accounts")
+    expected_rows = cursor.fetchone()[0]
+    cursor.close()
+
+    dedup = CustomerDeduplicator(expected_rows, memory_budget_mb, spill_dir)
+    try:
+        # Unbuffered cursor so the source rows are streamed, not materialized
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(f"""
+            SELECT account_id, customer_name, customer_tier
+            FROM `{OLD_DB_NAME}`.Accounts
+            ORDER BY account_id
+        """)
+        while True:
+            rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                break
+            dedup.add_rows(rows)
+        cursor.close()
+
+        customers = 0
+        cursor = conn.cursor()
+        for account_ids, customer_ids in dedup.iter_assignments():
+            customers += int(np.count_nonzero(account_ids == customer_ids))
+            for start in range(0, len(account_ids), INSERT_BATCH_SIZE):
+                batch = zip(account_ids[start:start + INSERT_BATCH_SIZE].tolist(),
+                            customer_ids[start:start + INSERT_BATCH_SIZE].tolist())
+                cursor.executemany(INSERT_CUSTOMER_MAP_SQL, list(batch))
+                conn.commit()
+        cursor.close()
+
+        collisions = find_key_collisions(conn)
+        if collisions:
+            print(f"WARNING: {len(collisions)} account(s) merged into a customer with a different name or tier "
+                  f"(64-bit digest collision), e.g. (account_id, customer_id) {collisions[:10]}")
+        return dedup.rows, customers, len(collisions)
+    finally:
+        dedup.close()
+
+def find_key_collisions(conn):
+    """
+    Check the finished map against the legacy rows: return the
+    (account_id, customer_id) pairs whose customer's stored name and tier
+    differ from the account's own. Empty unless digests collided.
+    """
+    cursor = conn.cursor()
+    cursor.execute(KEY_COLLISIONS_SQL.format(old_db=OLD_DB_NAME))
+    collisions = [tuple(row) for row in cursor.fetchall()]
+    cursor.close()
+    return collisions
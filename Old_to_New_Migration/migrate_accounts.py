@@ -0,0 +1,333 @@
+# migrate_accounts.py - Parallel, Resumable Old -> New Migration
+import argparse
+import mysql.connector
+import os
+import time
+import traceback
+from multiprocessing import Pool
+from customer_dedup import DEFAULT_MEMORY_BUDGET_MB, CUSTOMER_MAP_TABLE_DDL, build_customer_map
+
+OLD_DB_NAME = os.environ.get('OLD_DB_NAME', 'BankingRewardsFees_Old')
+NEW_DB_NAME = os.environ.get('NEW_DB_NAME', 'BankingRewardsFees_New')
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_WORKERS = 4
+
+DEFAULT_DB_HOST = 'database-2.crq7shsasjo0.us-west-2.rds.amazonaws.com'
+
+# Parallel chunks upsert the same customers, so InnoDB occasionally picks
+# one of them as a deadlock victim; the victim's transaction is rolled back
+# whole and can simply run again
+ER_LOCK_DEADLOCK = 1213
+DEADLOCK_RETRIES = 3
+DEADLOCK_BACKOFF_SECONDS = 0.2
+
+CHECKPOINT_TABLE_DDL = """
+    CREATE TABLE IF NOT EXISTS MigrationCheckpoints (
+        chunk_start INT NOT NULL,
+        chunk_end INT NOT NULL,
+        rows_copied INT NOT NULL,
+        completed_at DATETIME NOT NULL,
+        PRIMARY KEY (chunk_start, chunk_end)
+    )
+"""
+
+# Customer ids come from the de-duplication stage (customer_dedup.py), which
+# maps every legacy account to the first account_id sharing its customer. A
+# chunk upserts the customers its accounts reference (read from that first
+# account) and then the accounts themselves, so replaying a chunk any number
+# of times gives the same end result.
+MIGRATE_CUSTOMERS_SQL = """
+    INSERT INTO Customers (customer_id, name, tier, created_at, updated_at)
+    SELECT r.account_id, r.customer_name, r.customer_tier, r.created_at, r.updated_at
+    FROM (
+        SELECT DISTINCT m.customer_id
+        FROM MigrationCustomerMap m
+        WHERE m.account_id BETWEEN %s AND %s
+    ) c
+    JOIN `{old_db}`.Accounts r ON r.account_id = c.customer_id
+    ORDER BY r.account_id
+    ON DUPLICATE KEY UPDATE
+        name = VALUES(name),
+        tier = VALUES(tier),
+        created_at = VALUES(created_at),
+        updated_at = VALUES(updated_at)
+"""
+
+MIGRATE_ACCOUNTS_SQL = """
+    INSERT INTO Accounts (account_id, customer_id, balance, created_at, updated_at)
+    SELECT o.account_id, m.customer_id, o.balance, o.created_at, o.updated_at
+    FROM `{old_db}`.Accounts o
+    JOIN MigrationCustomerMap m ON m.account_id = o.account_id
+    WHERE o.account_id BETWEEN %s AND %s
+    ON DUPLICATE KEY UPDATE
+        customer_id = VALUES(customer_id),
+        balance = VALUES(balance),
+        created_at = VALUES(created_at),
+        updated_at = VALUES(updated_at)
+"""
+
+RECORD_CHECKPOINT_SQL = """
+    INSERT INTO MigrationCheckpoints (chunk_start, chunk_end, rows_copied, completed_at)
+    VALUES (%s, %s, %s, NOW())
+    ON DUPLICATE KEY UPDATE
+        rows_copied = VALUES(rows_copied),
+        completed_at = VALUES(completed_at)
+"""
+
+COUNT_LEGACY_ROWS_SQL = "SELECT COUNT(*) FROM `{old_db}`.Accounts WHERE account_id BETWEEN %s AND %s"
+COUNT_TARGET_ROWS_SQL = "SELECT COUNT(*) FROM Accounts WHERE account_id BETWEEN %s AND %s"
+
+class ChunkMismatch(Exception):
+    """The target does not hold the same number of accounts as the legacy chunk"""
+
+def get_connection(database=NEW_DB_NAME):
+    return mysql.connector.connect(
+        host=os.environ.get('DB_HOST', DEFAULT_DB_HOST),
+        user=os.environ.get('DB_USER', 'admin'),
+        password=os.environ.get('DB_PASSWORD', 'demo1234!'),
+        database=database,
+        autocommit=False
+    )
+
+def ensure_checkpoint_table(conn):
+    """Create the checkpoint and customer map tables in the target schema if missing"""
+    cursor = conn.cursor()
+    cursor.execute(CHECKPOINT_TABLE_DDL)
+    cursor.execute(CUSTOMER_MAP_TABLE_DDL)
+    conn.commit()
+    cursor.close()
+
+def customer_map_is_stale(conn):
+    """
+    True when the customer map is empty or does not reach the newest legacy
+    account. Accounts beyond it would be dropped by the chunks' JOIN.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT (SELECT MAX(account_id) FROM MigrationCustomerMap),
+               (SELECT MAX(account_id) FROM `{OLD_DB_NAME}`.Accounts)
+    """)
+    map_max_id, legacy_max_id = cursor.fetchone()
+    cursor.close()
+    if map_max_id is None:
+        return True
+    return legacy_max_id is not None and legacy_max_id > map_max_id
+
+def get_account_id_range(conn):
+    """Return (min_id, max_id) of the legacy Accounts table, or None if empty"""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT MIN(account_id), MAX(account_id) FROM `{OLD_DB_NAME}`.Accounts")
+    min_id, max_id = cursor.fetchone()
+    cursor.close()
+    if min_id is None:
+        return None
+    return min_id, max_id
+
+def plan_chunks(min_id, max_id, chunk_size):
+    """Split the inclusive account_id range into (start, end) chunks"""
+    if chunk_size <= 0:
+        raise ValueError('chunk_size must be positive')
+    chunks = []
+    start = min_id
+    while start <= max_id:
+        end = min(start + chunk_size - 1, max_id)
+        chunks.append((start, end))
+        start = end + 1
+    return chunks
+
+def get_completed_chunks(conn):
+    """Return the set of (start, end) chunks already recorded as done"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT chunk_start, chunk_end FROM MigrationCheckpoints")
+    completed = {(row[0], row[1]) for row in cursor.fetchall()}
+    cursor.close()
+    return completed
+
+def get_pending_chunks(conn, chunk_size):
+    """
+    Plan the chunks for the current legacy id range and drop the ones that a
+    previous run already checkpointed. Changing chunk_size between runs simply
+    replays chunks, which is safe because every chunk is idempotent.
+    """
+    id_range = get_account_id_range(conn)
+    if id_range is None:
+        return []
+    completed = get_completed_chunks(conn)
+    return [chunk for chunk in plan_chunks(id_range[0], id_range[1], chunk_size)
+            if chunk not in completed]
+
+def migrate_chunk(conn, chunk_start, chunk_end, retries=DEADLOCK_RETRIES):
+    """
+    Copy one account_id range and record its checkpoint in a single
+    transaction, so a chunk is either fully migrated and checkpointed or not
+    at all. Returns the number of accounts the target holds for the chunk,
+    which must equal the legacy count: a legacy row the copy dropped (e.g.
+    one missing from the customer map) fails the chunk with ChunkMismatch.
+    A deadlock victim is retried up to `retries` times.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return _copy_chunk(conn, chunk_start, chunk_end)
+        except mysql.connector.Error as e:
+            if e.errno != ER_LOCK_DEADLOCK or attempt == retries:
+                raise
+            print(f"Deadlock on chunk {chunk_start}-{chunk_end}, retrying ({attempt + 1}/{retries})")
+            time.sleep(DEADLOCK_BACKOFF_SECONDS * (attempt + 1))
+
+def _copy_chunk(conn, chunk_start, chunk_end):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(MIGRATE_CUSTOMERS_SQL.format(old_db=OLD_DB_NAME), (chunk_start, chunk_end))
+        cursor.execute(MIGRATE_ACCOUNTS_SQL.format(old_db=OLD_DB_NAME), (chunk_start, chunk_end))
+        # rowcount of an upsert counts updated rows twice and unchanged rows
+        # not at all, so count what the chunk's range holds afterwards instead
+        cursor.execute(COUNT_LEGACY_ROWS_SQL.format(old_db=OLD_DB_NAME), (chunk_start, chunk_end))
+        legacy_rows = cursor.fetchone()[0]
+        cursor.execute(COUNT_TARGET_ROWS_SQL, (chunk_start, chunk_end))
+        rows_copied = cursor.fetchone()[0]
+        if rows_copied != legacy_rows:
+            raise ChunkMismatch(
+                f"chunk {chunk_start}-{chunk_end}: {legacy_rows} legacy rows but {rows_copied} in the target"
+            )
+        cursor.execute(RECORD_CHECKPOINT_SQL, (chunk_start, chunk_end, rows_copied))
+        conn.commit()
+        return rows_copied
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+# ---- Worker process state ----
+# Each worker keeps one connection for all of the chunks it is handed.
+_worker_conn = None
+
+def _init_worker():
+    global _worker_conn
+    _worker_conn = get_connection()
+
+def _migrate_chunk_in_worker(chunk):
+    return chunk, migrate_chunk(_worker_conn, chunk[0], chunk[1])
+
+def run_migration(workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Migrate every pending chunk using `workers` processes. Returns
+    (chunks_migrated, rows_migrated). Safe to re-run after a crash: chunks that
+    were checkpointed are skipped and partially applied chunks were rolled back.
+    """
+    conn = get_connection()
+    try:
+        ensure_checkpoint_table(conn)
+        pending = get_pending_chunks(conn, chunk_size)
+        print(f"{len(pending)} chunk(s) pending (chunk_size={chunk_size}, workers={workers})")
+
+        rows_migrated = 0
+        if workers <= 1:
+            for chunk_start, chunk_end in pending:
+                rows_migrated += migrate_chunk(conn, chunk_start, chunk_end)
+        else:
+            with Pool(processes=workers, initializer=_init_worker) as pool:
+                for chunk, rows in pool.imap_unordered(_migrate_chunk_in_worker, pending):
+                    rows_migrated += rows
+        return len(pending), rows_migrated
+    finally:
+        conn.close()
+
+def reset_migration(conn, clear_target=False):
+    """Forget all checkpoints; optionally empty the target tables as well"""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM MigrationCheckpoints")
+    if clear_target:
+        # AccountCharges references Accounts, and a stale watermark would make
+        # the next incremental recompute skip the freshly migrated rows
+        cursor.execute("DELETE FROM AccountCharges")
+        cursor.execute("DELETE FROM RecalcWatermarks")
+        cursor.execute("DELETE FROM Accounts")
+        cursor.execute("DELETE FROM Customers")
+    conn.commit()
+    cursor.close()
+
+def run_benchmark(worker_counts=(1, 2, 4, 8), chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Run a full migration from an empty target once per worker count and print
+    rows/sec for each. Destructive: clears the target Accounts/Customers tables and the
+    AccountCharges read model.
+    """
+    results = []
+    for workers in worker_counts:
+        conn = get_connection()
+        ensure_checkpoint_table(conn)
+        reset_migration(conn, clear_target=True)
+        conn.close()
+
+        started = time.perf_counter()
+        _, rows = run_migration(workers=workers, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - started
+        results.append((workers, rows, elapsed))
+
+    print(f"{'workers':>8} {'rows':>12} {'seconds':>10} {'rows/sec':>12} {'speedup':>8}")
+    baseline = None
+    for workers, rows, elapsed in results:
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        baseline = baseline or rate
+        speedup = rate / baseline if baseline else 0.0
+        print(f"{workers:>8} {rows:>12} {elapsed:>10.2f} {rate:>12.0f} {speedup:>7.2f}x")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate BankingRewardsFees_Old.Accounts to the new schema')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--reset', action='store_true', help='forget checkpoints and start over')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='time full runs with 1/2/4/8 workers (clears the target tables)')
+    parser.add_argument('--host', default=None, help='database host (overrides DB_HOST)')
+    parser.add_argument('--confirm-clear-target', action='store_true',
+                        help='required with --benchmark, which deletes all data in the target tables')
+    parser.add_argument('--rebuild-customer-map', action='store_true',
+                        help='re-run customer de-duplication even if a map already exists')
+    parser.add_argument('--memory-budget-mb', type=int, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help='memory budget for customer de-duplication before spilling to disk')
+    parser.add_argument('--spill-dir', default=None, help='directory for de-duplication spill files')
+    args = parser.parse_args()
+
+    if args.host:
+        # Set in the environment so worker processes connect to the same host
+        os.environ['DB_HOST'] = args.host
+    if args.benchmark:
+        if not args.confirm_clear_target:
+            parser.error('--benchmark deletes the target data; pass --confirm-clear-target to proceed')
+        if os.environ.get('DB_HOST', DEFAULT_DB_HOST) == DEFAULT_DB_HOST:
+            parser.error('--benchmark needs an explicit --host (or DB_HOST) other than the default RDS endpoint')
+
+    try:
+        conn = get_connection()
+        ensure_checkpoint_table(conn)
+        if args.reset:
+            reset_migration(conn)
+        # Rebuilding keeps existing ids: a customer_id is the smallest account_id
+        # of its key, and new legacy accounts only come after the mapped ones
+        if args.rebuild_customer_map or customer_map_is_stale(conn):
+            rows, customers, collisions = build_customer_map(conn, args.memory_budget_mb, args.spill_dir)
+            print(f"De-duplicated {rows} legacy rows into {customers} customers ({collisions} digest collisions)")
+        conn.close()
+
+        if args.benchmark:
+            run_benchmark(chunk_size=args.chunk_size)
+            return
+
+        started = time.perf_counter()
+        chunks, rows = run_migration(workers=args.workers, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - started
+        print(f"Migrated {rows} rows in {chunks} chunk(s) in {elapsed:.2f}s")
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        raise SystemExit(1)
+    except ChunkMismatch as e:
+        print(f"Chunk verification failed: {e}")
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+# parity_harness.py - Legacy Stored Procedures vs Python Services Parity Harness
+import argparse
+import json
+import mysql.connector
+import os
+import random
+import re
+import sys
+import time
+import traceback
+from decimal import Decimal
+from multiprocessing import Pool
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OLD_APP_DIR = os.path.join(REPO_ROOT, 'BankingRewardsFees_Old')
+NEW_APP_DIR = os.path.join(REPO_ROOT, 'BankingRewardsFees_New')
+
+# Import the business rules exactly as deployed in the Lambda functions
+sys.path.append(NEW_APP_DIR)
+from AWS_Lambda_Microservices.Fee_Calculation_Service import calculate_fee
+from AWS_Lambda_Microservices.Rewards_Calculation_Service import calculate_reward
+
+# ...and move the data with the real migration stages
+import customer_dedup
+import migrate_accounts
+
+# Scratch schemas; the harness drops and recreates both on every run.
+PARITY_OLD_DB = os.environ.get('PARITY_OLD_DB', 'BankingRewardsFees_Old_Parity')
+PARITY_NEW_DB = os.environ.get('PARITY_NEW_DB', 'BankingRewardsFees_New_Parity')
+
+DEFAULT_ACCOUNTS = 1000000
+DEFAULT_CHUNK_SIZE = 20000
+DEFAULT_WORKERS = 4
+DEFAULT_SEED = 20240101
+
+# Balances right on and around the rule thresholds, plus tier spellings that
+# the legacy collation may treat differently from Python string comparison.
+BOUNDARY_BALANCES = ['0.00', '0.50', '4999.99', '5000.00', '5000.01',
+                     '9999.99', '10000.00', '10000.01']
+TIERS = ['premium', 'gold', 'silver', 'basic', 'Premium', 'PREMIUM', None]
+TIER_WEIGHTS = [25, 25, 20, 20, 4, 2, 4]
+BOUNDARY_SHARE = 0.10
+
+# Accounts that reuse a name from a small pool shared by all chunks, so the
+# de-duplication stage merges customers across chunk boundaries
+SHARED_NAME_SHARE = 0.20
+SHARED_NAMES = 1000
+
+LEGACY_PROCEDURES = ['calculate_monthly_fees.sql', 'calculate_rewards.sql']
+
+# Runs the untouched legacy procedures for a whole id range in one call so
+# no per-account round trips are needed.
+RUN_LEGACY_RANGE_SQL = """
+    CREATE PROCEDURE ParityRunLegacyRange(IN first_id INT, IN last_id INT)
+    BEGIN
+        DECLARE acc_id INT DEFAULT first_id;
+        WHILE acc_id <= last_id DO
+            CALL CalculateMonthlyFees(acc_id);
+            CALL CalculateRewards(acc_id);
+            SET acc_id = acc_id + 1;
+        END WHILE;
+    END
+"""
+
+INSERT_LEGACY_ACCOUNT_SQL = """
+    INSERT INTO Accounts (account_id, customer_name, customer_tier, balance, legacy_flag, created_at, updated_at)
+    VALUES (%s, %s, %s, %s, 'N', NOW(), NOW())
+"""
+
+def get_connection(database=None, autocommit=True):
+    # Defaults point at a local MySQL: the harness never needs the shared RDS
+    return mysql.connector.connect(
+        host=os.environ.get('PARITY_DB_HOST', 'localhost'),
+        user=os.environ.get('PARITY_DB_USER', 'root'),
+        password=os.environ.get('PARITY_DB_PASSWORD', ''),
+        database=database,
+        autocommit=autocommit
+    )
+
+def read_sql_file(*path_parts):
+    with open(os.path.join(*path_parts), encoding='utf-8') as f:
+        return f.read()
+
+def load_procedure_sql(text):
+    """
+    Turn a mysqldump-style procedure file (DELIMITER $$ ... $$) into a single
+    executable CREATE PROCEDURE statement without the DEFINER clause, so it
+    can be installed by whatever local user runs the harness.
+    """
+    lines = [line for line in text.splitlines() if not line.strip().upper().startswith('DELIMITER')]
+    statement = '\n'.join(lines).replace('$$', '').strip()
+    return re.sub(r'DEFINER\s*=\s*`[^`]*`@`[^`]*`\s*', '', statement)
+
+def create_scratch_schemas(conn):
+    """(Re)create both scratch schemas from the DDL and procedures in the repo"""
+    cursor = conn.cursor()
+    for database in (PARITY_OLD_DB, PARITY_NEW_DB):
+        cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+        cursor.execute(f"CREATE DATABASE `{database}`")
+
+    cursor.execute(f"USE `{PARITY_OLD_DB}`")
+    cursor.execute(read_sql_file(OLD_APP_DIR, 'Database', 'Tables', 'accounts_table.sql'))
+    for procedure_file in LEGACY_PROCEDURES:
+        cursor.execute(load_procedure_sql(read_sql_file(OLD_APP_DIR, 'Database', 'Stored Procedures', procedure_file)))
+    cursor.execute(RUN_LEGACY_RANGE_SQL)
+
+    cursor.execute(f"USE `{PARITY_NEW_DB}`")
+    cursor.execute(read_sql_file(NEW_APP_DIR, 'Database', 'Tables', 'Customers.sql'))
+    cursor.execute(read_sql_file(NEW_APP_DIR, 'Database', 'Tables', 'Accounts.sql'))
+    cursor.close()
+
+def generate_accounts(first_id, last_id, seed=DEFAULT_SEED):
+    """
+    Deterministically generate synthetic legacy rows for an id range as
+    (account_id, customer_name, customer_tier, balance) tuples.
+    """
+    rng = random.Random(seed * 1000003 + first_id)
+    rows = []
+    for account_id in range(first_id, last_id + 1):
+        tier = rng.choices(TIERS, weights=TIER_WEIGHTS)[0]
+        if rng.random() < BOUNDARY_SHARE:
+            balance = Decimal(rng.choice(BOUNDARY_BALANCES))
+        elif rng.random() < 0.05:
+            balance = Decimal(rng.randint(0, 500000000)) / 100
+        else:
+            balance = Decimal(rng.randint(0, 2500000)) / 100
+        if rng.random() < SHARED_NAME_SHARE:
+            name = f"Parity Shared Customer {rng.randint(1, SHARED_NAMES)}"
+        else:
+            name = f"Parity Customer {account_id}"
+        rows.append((account_id, name, tier, balance))
+    return rows
+
+def classify_case(balance, customer_tier):
+    """Label a row for the boundary report"""
+    if customer_tier is not None and customer_tier != 'premium' and customer_tier.lower() == 'premium':
+        return f"tier={customer_tier}"
+    if customer_tier is None:
+        return 'tier=NULL'
+    balance_text = f"{Decimal(balance):.2f}"
+    if balance_text in BOUNDARY_BALANCES:
+        return f"balance={balance_text}"
+    return 'other'
+
+def diff_results(new_rows, legacy_rows):
+    """
+    Compare Python results for migrated rows against legacy procedure output.
+    new_rows: [(account_id, balance, customer_tier)] from the new schema.
+    legacy_rows: {account_id: (monthly_fees, monthly_rewards)} from the old copy.
+    Returns a partial report that merge_reports() can combine.
+    """
+    report = empty_report()
+    for account_id, balance, customer_tier in new_rows:
+        report['accounts'] += 1
+        case = classify_case(balance, customer_tier)
+        case_stats = report['cases'].setdefault(case, {'accounts': 0, 'fee_mismatches': 0, 'reward_mismatches': 0})
+        case_stats['accounts'] += 1
+
+        legacy = legacy_rows.get(account_id)
+        if legacy is None:
+            report['missing_legacy'] += 1
+            continue
+
+        fee = calculate_fee(customer_tier, float(balance))
+        reward = calculate_reward(float(balance))
+        fee_matches = Decimal(str(fee)) == legacy[0]
+        reward_matches = Decimal(str(reward)) == legacy[1]
+        if not fee_matches:
+            report['fee_mismatches'] += 1
+            case_stats['fee_mismatches'] += 1
+        if not reward_matches:
+            report['reward_mismatches'] += 1
+            case_stats['reward_mismatches'] += 1
+        if not (fee_matches and reward_matches) and len(report['samples']) < 20:
+            report['samples'].append({
+                'account_id': account_id,
+                'balance': str(balance),
+                'customer_tier': customer_tier,
+                'legacy_fee': str(legacy[0]),
+                'python_fee': fee,
+                'legacy_reward': str(legacy[1]),
+                'python_reward': reward
+            })
+    return report
+
+def empty_report():
+    return {'accounts': 0, 'fee_mismatches': 0, 'reward_mismatches': 0,
+            'missing_legacy': 0, 'cases': {}, 'samples': []}
+
+def merge_reports(reports):
+    merged = empty_report()
+    for report in reports:
+        for key in ('accounts', 'fee_mismatches', 'reward_mismatches', 'missing_legacy'):
+            merged[key] += report[key]
+        for case, stats in report['cases'].items():
+            target = merged['cases'].setdefault(case, {'accounts': 0, 'fee_mismatches': 0, 'reward_mismatches': 0})
+            for key, value in stats.items():
+                target[key] += value
+        merged['samples'].extend(report['samples'][:20 - len(merged['samples'])])
+    return merged
+
+def use_scratch_schemas():
+    """Point the migration stages at the scratch schemas (also run in every worker)"""
+    customer_dedup.OLD_DB_NAME = PARITY_OLD_DB
+    migrate_accounts.OLD_DB_NAME = PARITY_OLD_DB
+    migrate_accounts.NEW_DB_NAME = PARITY_NEW_DB
+
+def seed_legacy_chunk(chunk, seed=DEFAULT_SEED):
+    """Fill the legacy copy for one id range and run the legacy procedures on it server-side"""
+    first_id, last_id = chunk
+    conn = get_connection(PARITY_OLD_DB, autocommit=False)
+    try:
+        cursor = conn.cursor()
+        cursor.executemany(INSERT_LEGACY_ACCOUNT_SQL, generate_accounts(first_id, last_id, seed))
+        conn.commit()
+
+        cursor.callproc('ParityRunLegacyRange', [first_id, last_id])
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+def build_scratch_customer_map():
+    """Run the de-duplication stage over the whole legacy copy, as a real migration does before its chunks"""
+    conn = get_connection(PARITY_NEW_DB, autocommit=False)
+    try:
+        migrate_accounts.ensure_checkpoint_table(conn)
+        return customer_dedup.build_customer_map(conn)
+    finally:
+        conn.close()
+
+def migrate_and_diff_chunk(chunk):
+    """Migrate one id range with migrate_chunk() and diff the result against the legacy output"""
+    first_id, last_id = chunk
+    conn = get_connection(PARITY_NEW_DB, autocommit=False)
+    try:
+        migrate_accounts.migrate_chunk(conn, first_id, last_id)
+
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT account_id, monthly_fees, monthly_rewards
+            FROM `{PARITY_OLD_DB}`.Accounts WHERE account_id BETWEEN %s AND %s
+        """, (first_id, last_id))
+        legacy_rows = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+        cursor.execute("""
+            SELECT a.account_id, a.balance, c.tier
+            FROM Accounts a
+            JOIN Customers c ON a.customer_id = c.customer_id
+            WHERE a.account_id BETWEEN %s AND %s
+        """, (first_id, last_id))
+        new_rows = cursor.fetchall()
+        conn.commit()
+        cursor.close()
+        return diff_results(new_rows, legacy_rows)
+    finally:
+        conn.close()
+
+def run_chunks(func, chunk_args, workers):
+    if workers <= 1:
+        return [func(*args) for args in chunk_args]
+    with Pool(processes=workers, initializer=use_scratch_schemas) as pool:
+        return pool.starmap(func, chunk_args)
+
+def run_parity(accounts=DEFAULT_ACCOUNTS, chunk_size=DEFAULT_CHUNK_SIZE, workers=DEFAULT_WORKERS, seed=DEFAULT_SEED):
+    """
+    Seed the legacy copy and run the procedures, then migrate it exactly as
+    migrate_accounts.py would (customer de-duplication first, then chunked
+    copies with their checks) and compare every migrated account.
+    """
+    use_scratch_schemas()
+    conn = get_connection()
+    create_scratch_schemas(conn)
+    conn.close()
+
+    chunks = [(start, min(start + chunk_size - 1, accounts)) for start in range(1, accounts + 1, chunk_size)]
+    run_chunks(seed_legacy_chunk, [(chunk, seed) for chunk in chunks], workers)
+    rows, customers, collisions = build_scratch_customer_map()
+    print(f"De-duplicated {rows} legacy rows into {customers} customers ({collisions} digest collisions)")
+    return merge_reports(run_chunks(migrate_and_diff_chunk, [(chunk,) for chunk in chunks], workers))
+
+def print_report(report, elapsed):
+    print(f"Compared {report['accounts']} accounts in {elapsed:.1f}s")
+    print(f"  fee mismatches:    {report['fee_mismatches']}")
+    print(f"  reward mismatches: {report['reward_mismatches']}")
+    print(f"  missing legacy:    {report['missing_legacy']}")
+    print(f"{'case':<22} {'accounts':>10} {'fee diff':>10} {'reward diff':>12}")
+    for case in sorted(report['cases']):
+        stats = report['cases'][case]
+        print(f"{case:<22} {stats['accounts']:>10} {stats['fee_mismatches']:>10} {stats['reward_mismatches']:>12}")
+    for sample in report['samples']:
+        print(f"  sample: {sample}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare legacy stored procedures with the Python fee/reward services')
+    parser.add_argument('--accounts', type=int, default=DEFAULT_ACCOUNTS)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--report', help='write the full report as JSON to this path')
+    args = parser.parse_args()
+
+    try:
+        started = time.perf_counter()
+        report = run_parity(args.accounts, args.chunk_size, args.workers, args.seed)
+        elapsed = time.perf_counter() - started
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        raise SystemExit(2)
+    except migrate_accounts.ChunkMismatch as e:
+        print(f"Migration check failed: {e}")
+        raise SystemExit(2)
+
+    print_report(report, elapsed)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+    if report['fee_mismatches'] or report['reward_mismatches'] or report['missing_legacy']:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+# reconcile.py - Chunked Checksum Reconciliation Between Old and New Schemas
+import argparse
+import mysql.connector
+import os
+import time
+import traceback
+
+OLD_DB_NAME = os.environ.get('OLD_DB_NAME', 'BankingRewardsFees_Old')
+NEW_DB_NAME = os.environ.get('NEW_DB_NAME', 'BankingRewardsFees_New')
+
+DEFAULT_CHUNK_SIZE = 100000
+DEFAULT_FANOUT = 16
+DEFAULT_LEAF_SIZE = 256
+
+# Both sides hash the same canonical string per account. NULLs are spelled
+# out because CONCAT_WS silently skips them.
+OLD_ROW_HASH = """CRC32(CONCAT_WS('|', o.account_id,
+        IFNULL(CAST(o.balance AS CHAR), '<null>'),
+        IFNULL(o.customer_name, '<null>'),
+        IFNULL(o.customer_tier, '<null>')))"""
+
+NEW_ROW_HASH = """CRC32(CONCAT_WS('|', a.account_id,
+        IFNULL(CAST(a.balance AS CHAR), '<null>'),
+        IFNULL(c.name, '<null>'),
+        IFNULL(c.tier, '<null>')))"""
+
+OLD_FROM = "`{old_db}`.Accounts o"
+NEW_FROM = "`{new_db}`.Accounts a LEFT JOIN `{new_db}`.Customers c ON c.customer_id = a.customer_id"
+
+SIDES = {
+    'old': {'row_hash': OLD_ROW_HASH, 'source': OLD_FROM, 'id_column': 'o.account_id'},
+    'new': {'row_hash': NEW_ROW_HASH, 'source': NEW_FROM, 'id_column': 'a.account_id'},
+}
+
+def get_connection():
+    return mysql.connector.connect(
+        host=os.environ.get('DB_HOST', 'database-2.crq7shsasjo0.us-west-2.rds.amazonaws.com'),
+        user=os.environ.get('DB_USER', 'admin'),
+        password=os.environ.get('DB_PASSWORD', 'demo1234!'),
+        database=NEW_DB_NAME,
+        autocommit=True
+    )
+
+def _side_sql(side):
+    spec = SIDES[side]
+    source = spec['source'].format(old_db=OLD_DB_NAME, new_db=NEW_DB_NAME)
+    return spec['row_hash'], source, spec['id_column']
+
+def fetch_bucket_hashes(cursor, side, range_start, range_end, bucket_width):
+    """
+    Aggregate one side over [range_start, range_end] into buckets of
+    bucket_width ids with a single primary-key range scan. Returns
+    {bucket_index: (row_count, hash_sum)}; only the aggregates leave MySQL.
+    """
+    row_hash, source, id_column = _side_sql(side)
+    cursor.execute(f"""
+        SELECT FLOOR(({id_column} - %s) / %s) AS bucket,
+               COUNT(*) AS row_count,
+               SUM({row_hash}) AS hash_sum
+        FROM {source}
+        WHERE {id_column} BETWEEN %s AND %s
+        GROUP BY bucket
+    """, (range_start, bucket_width, range_start, range_end))
+    return {int(bucket): (int(row_count), int(hash_sum))
+            for bucket, row_count, hash_sum in cursor.fetchall()}
+
+def fetch_row_hashes(cursor, side, range_start, range_end):
+    """Return {account_id: row_hash} for a (small) leaf range on one side"""
+    row_hash, source, id_column = _side_sql(side)
+    cursor.execute(f"""
+        SELECT {id_column}, {row_hash}
+        FROM {source}
+        WHERE {id_column} BETWEEN %s AND %s
+    """, (range_start, range_end))
+    return {int(account_id): int(value) for account_id, value in cursor.fetchall()}
+
+def get_id_range(cursor):
+    """Return the (min, max) account_id across both schemas, or None if both are empty"""
+    bounds = []
+    for side in ('old', 'new'):
+        _, source, id_column = _side_sql(side)
+        cursor.execute(f"SELECT MIN({id_column}), MAX({id_column}) FROM {source}")
+        min_id, max_id = cursor.fetchone()
+        if min_id is not None:
+            bounds.append((min_id, max_id))
+    if not bounds:
+        return None
+    return min(b[0] for b in bounds), max(b[1] for b in bounds)
+
+def diff_rows(old_rows, new_rows):
+    """Compare leaf row hashes and describe every differing account"""
+    differences = []
+    for account_id in sorted(set(old_rows) | set(new_rows)):
+        if account_id not in new_rows:
+            differences.append({'account_id': account_id, 'issue': 'missing_in_new'})
+        elif account_id not in old_rows:
+            differences.append({'account_id': account_id, 'issue': 'missing_in_old'})
+        elif old_rows[account_id] != new_rows[account_id]:
+            differences.append({'account_id': account_id, 'issue': 'mismatch'})
+    return differences
+
+def reconcile_range(cursor, range_start, range_end, bucket_width, fanout, leaf_size, stats):
+    """
+    Compare bucket checksums for a range and recurse into mismatching buckets
+    with bucket_width / fanout until buckets are at most leaf_size ids wide,
+    at which point individual row hashes are compared.
+    """
+    if range_end - range_start + 1 <= leaf_size:
+        stats['leaf_ranges'] += 1
+        return diff_rows(fetch_row_hashes(cursor, 'old', range_start, range_end),
+                         fetch_row_hashes(cursor, 'new', range_start, range_end))
+
+    old_buckets = fetch_bucket_hashes(cursor, 'old', range_start, range_end, bucket_width)
+    new_buckets = fetch_bucket_hashes(cursor, 'new', range_start, range_end, bucket_width)
+    stats['buckets_compared'] += len(set(old_buckets) | set(new_buckets))
+
+    differences = []
+    for bucket in sorted(set(old_buckets) | set(new_buckets)):
+        if old_buckets.get(bucket) == new_buckets.get(bucket):
+            continue
+        stats['buckets_mismatched'] += 1
+        bucket_start = range_start + bucket * bucket_width
+        bucket_end = min(bucket_start + bucket_width - 1, range_end)
+        child_width = max(bucket_width // fanout, 1)
+        differences.extend(reconcile_range(cursor, bucket_start, bucket_end,
+                                           child_width, fanout, leaf_size, stats))
+    return differences
+
+def reconcile(conn, chunk_size=DEFAULT_CHUNK_SIZE, fanout=DEFAULT_FANOUT, leaf_size=DEFAULT_LEAF_SIZE):
+    """
+    Reconcile balances and customer attributes between the old and new
+    schemas. Returns a report dict with the list of differing accounts.
+    """
+    if chunk_size <= 0 or fanout < 2 or leaf_size <= 0:
+        raise ValueError('chunk_size and leaf_size must be positive and fanout at least 2')
+
+    stats = {'buckets_compared': 0, 'buckets_mismatched': 0, 'leaf_ranges': 0}
+    cursor = conn.cursor()
+    try:
+        id_range = get_id_range(cursor)
+        differences = []
+        if id_range is not None:
+            differences = reconcile_range(cursor, id_range[0], id_range[1],
+                                          chunk_size, fanout, leaf_size, stats)
+    finally:
+        cursor.close()
+
+    return {
+        'id_range': id_range,
+        'differences': differences,
+        'matched': not differences,
+        **stats
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Reconcile BankingRewardsFees_Old against BankingRewardsFees_New')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--fanout', type=int, default=DEFAULT_FANOUT)
+    parser.add_argument('--leaf-size', type=int, default=DEFAULT_LEAF_SIZE)
+    parser.add_argument('--show', type=int, default=50, help='number of differing accounts to print')
+    args = parser.parse_args()
+
+    try:
+        conn = get_connection()
+        started = time.perf_counter()
+        report = reconcile(conn, args.chunk_size, args.fanout, args.leaf_size)
+        elapsed = time.perf_counter() - started
+        conn.close()
+    except mysql.connector.Error as e:
+        print(f"Database error: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        raise SystemExit(2)
+
+    print(f"Compared account_id range {report['id_range']} in {elapsed:.2f}s: "
+          f"{report['buckets_compared']} buckets, {report['buckets_mismatched']} mismatched, "
+          f"{report['leaf_ranges']} leaf ranges inspected")
+    if report['matched']:
+        print("Old and new schemas match")
+        return
+
+    print(f"{len(report['differences'])} differing account(s):")
+    for difference in report['differences'][:args.show]:
+        print(f"  account_id={difference['account_id']} {difference['issue']}")
+    raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()